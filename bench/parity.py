@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sqlite3
+import sys
+import time
+from typing import Iterator
+
+from bench.stand_in import FIXTURES_DIR, Corpus
+from scrapper.html_parse import BS4, LXML, parse_article, parse_bing_items, resolve_html_parser
+from scrapper.search import build_queries
+from scrapper.config import DEFAULT_RELATED_KEYWORDS
+from scrapper.text_extract import _decode_html
+
+SAVED_PAGES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "html"
+
+
+def _stand_in_pages(size: int) -> Iterator[tuple[str, str]]:
+    queries = build_queries("sh 공사 마곡 분양", DEFAULT_RELATED_KEYWORDS)
+    corpus = Corpus(size, queries, "http://127.0.0.1:1")
+    for article_id in range(size):
+        content, charset = corpus.article_page(article_id)
+        html, _ = _decode_html(content, f"text/html; charset={charset}")
+        yield f"stand_in/news/{article_id}", html
+    for query in queries:
+        yield f"stand_in/search/{query}", corpus.search_page(query, 1).decode("utf-8")
+
+
+def _cached_pages(path: Path, limit: int) -> Iterator[tuple[str, str]]:
+    # Real pages from an earlier run's HTTP cache, decoded as the pipeline does.
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute(
+            """
+            SELECT url, content_type, content
+            FROM http_cache
+            WHERE content_type LIKE '%html%'
+            ORDER BY accessed_at DESC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+    for url, content_type, content in rows:
+        yield str(url), _decode_html(bytes(content), str(content_type))[0]
+
+
+def collect_pages(args: argparse.Namespace) -> Iterator[tuple[str, str]]:
+    for path in sorted(FIXTURES_DIR.glob("*.html")) + sorted(SAVED_PAGES_DIR.glob("*.html")):
+        yield f"fixture/{path.name}", path.read_text(encoding="utf-8")
+    yield from _stand_in_pages(args.size)
+    if args.http_cache is not None:
+        yield from _cached_pages(args.http_cache, args.limit)
+    if args.html_dir is not None:
+        for path in sorted(args.html_dir.rglob("*.htm*")):
+            yield str(path), path.read_bytes().decode("utf-8", errors="replace")
+
+
+def _timed(function, html: str) -> tuple[object, float]:  # type: ignore[no-untyped-def]
+    started = time.perf_counter()
+    result = function(html)
+    return result, time.perf_counter() - started
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare the lxml and html.parser backends on saved pages and time both"
+    )
+    parser.add_argument("--size", type=int, default=300, help="Stand-in article pages to check")
+    parser.add_argument("--http-cache", type=Path, default=None, help="http_cache.db to sample")
+    parser.add_argument("--html-dir", type=Path, default=None, help="Directory of saved pages")
+    parser.add_argument("--limit", type=int, default=2000, help="Max pages from --http-cache")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if resolve_html_parser(LXML) != LXML:
+        print("lxml is not installed; nothing to compare")
+        return 1
+
+    checked = 0
+    mismatches: list[str] = []
+    seconds = {BS4: 0.0, LXML: 0.0}
+    for name, html in collect_pages(args):
+        for label, parse in (("article", parse_article), ("bing", parse_bing_items)):
+            expected, bs4_seconds = _timed(lambda page: parse(page, BS4), html)
+            actual, lxml_seconds = _timed(lambda page: parse(page, LXML), html)
+            seconds[BS4] += bs4_seconds
+            seconds[LXML] += lxml_seconds
+            checked += 1
+            if actual != expected:
+                mismatches.append(
+                    f"{name} [{label}]\n  html.parser: {expected!r:.300}\n"
+                    f"  lxml:        {actual!r:.300}"
+                )
+
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+    speedup = seconds[BS4] / seconds[LXML] if seconds[LXML] else 0.0
+    print(
+        f"checked={checked} mismatches={len(mismatches)} "
+        f"html.parser={seconds[BS4]:.2f}s lxml={seconds[LXML]:.2f}s speedup={speedup:.1f}x"
+    )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
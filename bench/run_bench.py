@@ -0,0 +1,492 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+import json
+import logging
+import math
+import os
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Iterator
+
+from scrapper.config import DEFAULT_RELATED_KEYWORDS, Settings, load_settings
+from scrapper.models import StageTiming
+from scrapper.pipeline import (
+    _collect_candidates,
+    configure_http,
+    crawl_queries,
+    open_candidate_selector,
+    release_http,
+    run_daily_pipeline,
+)
+from scrapper.storage import Storage
+from scrapper.tracing import Tracer, set_tracer
+
+DEFAULT_SIZES = (50, 500, 5000)
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = ROOT / "bench" / "baseline.json"
+SCENARIOS = ("collect", "pipeline")
+# A baseline entry is only compared when these match the current run.
+ENVIRONMENT_KEYS = ("python", "platform", "machine", "cpu_count", "extraction", "latency_ms")
+
+# Pinned so a local .env cannot change what is measured. The corpus served by
+# bench.stand_in is written against this keyword set and these thresholds.
+_BENCH_ENV = {
+    "KEYWORD": "sh 공사 마곡 분양",
+    "RELATED_KEYWORDS": ",".join(DEFAULT_RELATED_KEYWORDS),
+    "PROFILES_PATH": "",
+    "PRE_SCORE_THRESHOLD": "24",
+    "FINAL_SCORE_THRESHOLD": "36",
+    "CONTENT_DEDUPE_ENABLED": "true",
+    "SEARCH_PROVIDERS": "bing",
+    "SEARCH_WORKERS": "4",
+    "SEARCH_MIN_INTERVAL_MS": "0",
+    "FETCH_WORKERS": "8",
+    # Every page is served from one local host.
+    "FETCH_PER_HOST_LIMIT": "8",
+    "HTTP_POOL_PER_HOST": "16",
+    "HTTP_CACHE_ENABLED": "true",
+    "EXTRACT_CACHE_ENABLED": "true",
+    "SUMMARY_CACHE_ENABLED": "true",
+    "SUMMARY_MODE": "sync",
+    "SUMMARY_WORKERS": "4",
+    "SUMMARY_REQUESTS_PER_MINUTE": "0",
+    "SUMMARY_TOKENS_PER_MINUTE": "0",
+    "TRACE_ENABLED": "false",
+    "OPENAI_API_KEY": "bench",
+    "OPENAI_MODEL": "gpt-4.1-mini",
+    "RECIPIENT_EMAILS": "bench@example.com",
+    "SMTP_USERNAME": "bench@example.com",
+    "SMTP_APP_PASSWORD": "bench",
+}
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    engine: str
+    scenario: str
+    size: int
+    wall_seconds: float
+    peak_mb: float
+    searched: int
+    candidates: int
+    fetched: int
+    selected: int
+    candidates_per_second: float
+    fetches_per_second: float
+    stages: tuple[StageTiming, ...]
+
+    @property
+    def key(self) -> str:
+        return f"{self.engine}/{self.scenario}/{self.size}"
+
+
+@contextmanager
+def _pinned_env(values: dict[str, str]) -> Iterator[None]:
+    # Only load_settings() needs these. load_dotenv() copies .env into the
+    # environment as well, so the whole mapping is put back afterwards.
+    saved = dict(os.environ)
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+
+def bench_settings(engine: str, size: int, extraction: str = "inline") -> Settings:
+    with _pinned_env(
+        {**_BENCH_ENV, "PIPELINE_ENGINE": engine, "EXTRACTION_EXECUTOR": extraction}
+    ):
+        settings = load_settings()
+    queries = crawl_queries([settings])
+    return replace(
+        settings,
+        # MAX_ITEMS scales with the corpus so early stop does not cut the
+        # larger runs short; the fetch budget is five times this.
+        max_items=max(10, size // 10),
+        search_results_per_query=max(5, math.ceil(size / len(queries))),
+    )
+
+
+@contextmanager
+def stand_in(size: int, queries: list[str], latency_ms: int) -> Iterator[str]:
+    command = [
+        sys.executable,
+        "-m",
+        "bench.stand_in",
+        "--size",
+        str(size),
+        "--latency-ms",
+        str(latency_ms),
+    ]
+    for query in queries:
+        command.extend(("--query", query))
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    try:
+        assert process.stdout is not None
+        line = process.stdout.readline().strip()
+        if not line.startswith("READY "):
+            raise RuntimeError(f"Stand-in server did not start: {line!r}")
+        yield line.split(" ", 1)[1]
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _collect(settings: Settings) -> tuple[int, int, int, int]:
+    storage = Storage(settings.db_path)
+    selector = open_candidate_selector(settings, storage)
+    configure_http(settings)
+    try:
+        if settings.pipeline_engine == "async":
+            from scrapper.async_pipeline import _collect_candidates_async
+            from scrapper.http_client import open_async_client
+
+            async def _run() -> None:
+                async with open_async_client() as client:
+                    await _collect_candidates_async(settings, client, [selector])
+
+            asyncio.run(_run())
+        else:
+            _collect_candidates(settings, [selector])
+    finally:
+        release_http()
+        storage.close()
+    searched, candidates, selected = selector.finish()
+    return searched, candidates, selector.judged_count, len(selected)
+
+
+def _run_once(
+    settings: Settings,
+    scenario: str,
+    size: int,
+    base_url: str,
+    trace_memory: bool,
+) -> BenchResult:
+    # Every pass starts from empty history and cold caches.
+    with tempfile.TemporaryDirectory(prefix="scrapper-bench-", ignore_cleanup_errors=True) as tmp:
+        workdir = Path(tmp)
+        settings = replace(
+            settings,
+            bing_search_url=f"{base_url}/search",
+            openai_base_url=f"{base_url}/v1",
+            db_path=workdir / "scrapper.db",
+            http_cache_path=workdir / "http_cache.db",
+            trace_dir=workdir / "traces",
+        )
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        if scenario == "collect":
+            tracer = Tracer()
+            set_tracer(tracer)
+            try:
+                searched, candidates, fetched, selected = _collect(settings)
+            finally:
+                set_tracer(None)
+            stages = tracer.stage_timings()
+        else:
+            report = run_daily_pipeline(settings, dry_run=True)
+            stages = report.stage_timings
+            searched, candidates, selected = (
+                report.searched_count,
+                report.candidates_count,
+                report.selected_count,
+            )
+            fetched = next((stage.count for stage in stages if stage.stage == "fetch"), 0)
+        wall_seconds = time.perf_counter() - started
+        peak = 0
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    return BenchResult(
+        engine=settings.pipeline_engine,
+        scenario=scenario,
+        size=size,
+        wall_seconds=wall_seconds,
+        peak_mb=peak / (1024 * 1024),
+        searched=searched,
+        candidates=candidates,
+        fetched=fetched,
+        selected=selected,
+        candidates_per_second=candidates / wall_seconds if wall_seconds else 0.0,
+        fetches_per_second=fetched / wall_seconds if wall_seconds else 0.0,
+        stages=stages,
+    )
+
+
+def run_scenario(
+    settings: Settings,
+    scenario: str,
+    size: int,
+    base_url: str,
+    memory: bool = True,
+) -> BenchResult:
+    result = _run_once(settings, scenario, size, base_url, trace_memory=False)
+    if memory:
+        # tracemalloc slows Python code down about four times, so the peak
+        # comes from a second pass whose timings are thrown away.
+        peak = _run_once(settings, scenario, size, base_url, trace_memory=True).peak_mb
+        result = replace(result, peak_mb=peak)
+    return result
+
+
+def warm_up(engine: str, extraction: str, scenarios: list[str], latency_ms: int) -> None:
+    # Lazy imports and first-use setup in trafilatura, openai and httpx would
+    # otherwise be charged to whichever scenario runs first.
+    settings = bench_settings(engine, 50, extraction)
+    with stand_in(50, crawl_queries([settings]), latency_ms) as base_url:
+        for scenario in scenarios:
+            _run_once(settings, scenario, 50, base_url, trace_memory=False)
+
+
+def calibrate(rounds: int = 5) -> float:
+    # Best-of time for a fixed pure-Python loop, a rough measure of CPU speed.
+    best = math.inf
+    for _ in range(rounds):
+        started = time.perf_counter()
+        total = 0
+        for index in range(2_000_000):
+            total += index * index % 7
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_environment(extraction: str, latency_ms: int) -> dict[str, object]:
+    return {
+        "python": ".".join(platform.python_version_tuple()[:2]),
+        "platform": sys.platform,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "extraction": extraction,
+        "latency_ms": latency_ms,
+        "calibration_seconds": calibrate(),
+    }
+
+
+def environment_mismatch(environment: dict[str, object], baseline: dict[str, object]) -> list[str]:
+    previous = baseline.get("environment")
+    if not isinstance(previous, dict) or not previous.get("calibration_seconds"):
+        return ["no environment recorded"]
+    return [
+        f"{name} {previous.get(name)!r} != {environment[name]!r}"
+        for name in ENVIRONMENT_KEYS
+        if previous.get(name) != environment[name]
+    ]
+
+
+def speed_change(environment: dict[str, object], baseline: dict[str, object]) -> float:
+    # Calibration time now relative to when the baseline was saved. Shared
+    # and throttled machines drift by tens of percent within minutes, so this
+    # only warns; rescaling timings by it would add that noise to every check.
+    previous = baseline["environment"]
+    assert isinstance(previous, dict)
+    return float(environment["calibration_seconds"]) / float(previous["calibration_seconds"]) - 1
+
+
+def load_baseline(path: Path) -> dict[str, dict[str, object]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("results", {})
+
+
+def save_baseline(
+    path: Path,
+    results: list[BenchResult],
+    environment: dict[str, object],
+) -> None:
+    # Merged by key so thread and async baselines can live in one file; each
+    # entry keeps the machine and options it was recorded with.
+    baseline = load_baseline(path)
+    for result in results:
+        baseline[result.key] = {**asdict(result), "environment": environment}
+    payload = {"results": dict(sorted(baseline.items()))}
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def regressions(
+    result: BenchResult,
+    baseline: dict[str, object],
+    tolerance: float,
+    min_stage_seconds: float,
+) -> list[str]:
+    found: list[str] = []
+
+    def _check(name: str, current: float, previous: float) -> None:
+        if previous > 0 and current > previous * (1 + tolerance):
+            found.append(
+                f"{result.key} {name}: {previous:.3f} -> {current:.3f} "
+                f"(+{(current / previous - 1) * 100:.0f}%)"
+            )
+
+    _check("wall_seconds", result.wall_seconds, float(baseline["wall_seconds"]))
+    _check("peak_mb", result.peak_mb, float(baseline["peak_mb"]))
+    previous_stages = {str(stage["stage"]): stage for stage in baseline.get("stages", [])}
+    for stage in result.stages:
+        previous = previous_stages.get(stage.stage)
+        if previous is None or float(previous["total_seconds"]) < min_stage_seconds:
+            continue
+        _check(f"stage {stage.stage}", stage.total_seconds, float(previous["total_seconds"]))
+    return found
+
+
+def print_result(result: BenchResult) -> None:
+    print(
+        f"{result.key:<24} wall={result.wall_seconds:8.2f}s peak={result.peak_mb:8.1f}MB "
+        f"searched={result.searched:<5} candidates={result.candidates:<5} "
+        f"fetched={result.fetched:<5} selected={result.selected:<4} "
+        f"candidates/s={result.candidates_per_second:8.1f} "
+        f"fetches/s={result.fetches_per_second:7.1f}"
+    )
+    for stage in result.stages:
+        print(
+            f"    {stage.stage:<22} n={stage.count:<6} total={stage.total_seconds:8.3f}s "
+            f"p50={stage.p50_seconds * 1000:8.1f}ms p95={stage.p95_seconds * 1000:8.1f}ms "
+            f"bytes={stage.bytes}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmark against a local stand-in")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated corpus sizes (search results served)",
+    )
+    parser.add_argument("--engine", choices=("thread", "async"), default="thread")
+    parser.add_argument(
+        "--extraction",
+        choices=("inline", "process"),
+        default="inline",
+        help="EXTRACTION_EXECUTOR; process runs spawn one worker per CPU",
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="collect = _collect_candidates only; pipeline = run_daily_pipeline dry run",
+    )
+    parser.add_argument("--latency-ms", type=int, default=0, help="Stand-in delay per response")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run as the baseline instead of comparing against it",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown ratio")
+    parser.add_argument(
+        "--min-stage-seconds",
+        type=float,
+        default=0.5,
+        help="Stages shorter than this in the baseline are not compared",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Skip the tracemalloc pass that measures peak memory",
+    )
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON")
+    return parser.parse_args()
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s | %(message)s")
+    logging.getLogger("trafilatura").setLevel(logging.CRITICAL)
+    logging.getLogger("htmldate").setLevel(logging.CRITICAL)
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenarios: {unknown}", file=sys.stderr)
+        return 2
+
+    environment = bench_environment(args.extraction, args.latency_ms)
+    print(
+        f"cpus={environment['cpu_count']} machine={environment['machine']} "
+        f"python={environment['python']} "
+        f"calibration={float(environment['calibration_seconds']):.3f}s"
+    )
+    warm_up(args.engine, args.extraction, scenarios, args.latency_ms)
+    results: list[BenchResult] = []
+    for size in sizes:
+        settings = bench_settings(args.engine, size, args.extraction)
+        with stand_in(size, crawl_queries([settings]), args.latency_ms) as base_url:
+            for scenario in scenarios:
+                result = run_scenario(
+                    settings,
+                    scenario,
+                    size,
+                    base_url,
+                    memory=not args.no_memory,
+                )
+                print_result(result)
+                results.append(result)
+
+    if args.output is not None:
+        args.output.write_text(
+            json.dumps([asdict(result) for result in results], ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+    if args.save_baseline:
+        save_baseline(args.baseline, results, environment)
+        print(f"Baseline saved | path={args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    missing = [result.key for result in results if result.key not in baseline]
+    if missing:
+        # Without a baseline there is nothing to compare, which must not
+        # pass as "no regressions".
+        print(
+            f"No baseline for {', '.join(missing)} in {args.baseline}; "
+            "run with --save-baseline first",
+            file=sys.stderr,
+        )
+        return 2
+    found: list[str] = []
+    compared = 0
+    for result in results:
+        mismatch = environment_mismatch(environment, baseline[result.key])
+        if mismatch:
+            print(
+                f"SKIPPED {result.key}: baseline recorded elsewhere ({'; '.join(mismatch)})",
+                file=sys.stderr,
+            )
+            continue
+        change = speed_change(environment, baseline[result.key])
+        if abs(change) > args.tolerance:
+            print(
+                f"WARNING {result.key}: calibration loop {change * 100:+.0f}% against the "
+                "baseline; this machine is running at a different speed",
+                file=sys.stderr,
+            )
+        compared += 1
+        found.extend(
+            regressions(result, baseline[result.key], args.tolerance, args.min_stage_seconds)
+        )
+    for line in found:
+        print(f"REGRESSION {line}")
+    if found:
+        return 1
+    if not compared:
+        print(
+            f"No baseline in {args.baseline} matches this machine; "
+            "run with --save-baseline here first",
+            file=sys.stderr,
+        )
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
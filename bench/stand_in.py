@@ -0,0 +1,503 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from email.parser import BytesParser
+from email.policy import HTTP
+from functools import lru_cache
+import html
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import math
+from pathlib import Path
+import random
+import sys
+from string import Template
+import threading
+import time
+from urllib.parse import parse_qs, quote_plus, urlsplit
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+SEED = 20240601
+
+# Titles and snippets only carry 마곡 + 공급, which clears PRE_SCORE_THRESHOLD
+# but not FINAL_SCORE_THRESHOLD; a page passes only when its body adds the
+# housing terms. That keeps fetching busy well past MAX_ITEMS selections.
+_PLACES = ("마곡", "마곡지구", "마곡동", "마곡나루", "마곡역", "강서 마곡", "마곡엠밸리", "마곡 산업단지")
+_SUBJECTS = (
+    "공공주택",
+    "장기전세",
+    "역세권 단지",
+    "신혼희망타운",
+    "오피스텔",
+    "지식산업센터",
+    "상업용지",
+    "임대주택",
+    "도시형 생활주택",
+    "주상복합",
+)
+_EVENTS = (
+    "일정 윤곽",
+    "세부 계획 공개",
+    "주민 설명회 개최",
+    "사업 속도",
+    "시장 반응",
+    "추진 현황",
+    "변경안 확정",
+    "착공 앞둬",
+    "수요 조사 결과",
+    "심의 통과",
+)
+_DETAILS = (
+    "전문가 전망",
+    "관심 집중",
+    "쟁점 정리",
+    "주변 시세 비교",
+    "교통 호재 점검",
+    "현장 분위기",
+    "예상 경쟁률",
+    "주요 조건 요약",
+    "질의응답",
+    "체크포인트",
+)
+_REPORTERS = ("김민준", "이서연", "박지호", "최유나", "정하늘", "강도윤", "윤소희", "임재현")
+_FILLER = (
+    "지역 상권은 직장인 유입이 늘면서 점심시간 매출이 꾸준히 증가하고 있다.",
+    "인근 공원과 식물원을 찾는 방문객이 주말마다 몰리며 주차 문제가 제기됐다.",
+    "구청은 하반기 중 보행 환경 개선 사업을 마무리할 계획이라고 밝혔다.",
+    "연구개발 기업 입주가 이어지면서 출퇴근 시간대 버스 증차 요구가 커졌다.",
+    "주민들은 생활 편의시설 확충과 어린이 보호구역 정비를 함께 요청했다.",
+    "업계 관계자는 금리 흐름과 경기 상황을 지켜봐야 한다고 말했다.",
+    "지하철 역과 연결되는 보행로 설계안은 다음 달 확정될 예정이다.",
+    "인근 중개업소에는 문의 전화가 평소보다 두 배가량 늘었다.",
+    "시는 관련 예산을 추가로 확보해 사업 기간을 단축하겠다는 입장이다.",
+    "일부 주민은 일조권과 소음 문제를 이유로 보완 대책을 요구하고 있다.",
+)
+_HOUSING = (
+    "서울주택도시공사는 이번 분양 물량 가운데 절반을 특별공급으로 배정했다.",
+    "입주자모집 공고는 다음 달 초 게시되고 청약 접수는 일주일 뒤 시작된다.",
+    "SH 측은 분양가가 주변 시세의 70% 수준에서 책정될 것이라고 설명했다.",
+    "청약 자격은 무주택 세대 구성원으로 소득과 자산 기준을 함께 충족해야 한다.",
+    "공고에 따르면 당첨자 발표 이후 계약까지 약 한 달의 기간이 주어진다.",
+    "사전 청약 당첨자는 본 청약 일정에 맞춰 다시 신청 절차를 밟아야 한다.",
+)
+
+
+@dataclass(frozen=True)
+class Article:
+    article_id: int
+    title: str
+    snippet: str
+    lead: str
+    paragraphs: tuple[str, ...]
+    published_at: str
+    reporter: str
+    layout: str
+
+
+def _rng(article_id: int) -> random.Random:
+    return random.Random(SEED * 1_000_003 + article_id)
+
+
+def _body(article_id: int) -> tuple[str, ...]:
+    rng = _rng(article_id)
+    # About a third of the pages are about the housing supply itself.
+    relevant = rng.random() < 0.35
+    # Every 23rd page reposts the previous body under its own title.
+    if article_id % 23 == 0 and article_id > 0:
+        return _body(article_id - 1)
+    # A few pages have almost nothing extractable.
+    if rng.random() < 0.04:
+        return ("본문을 불러올 수 없습니다.",)
+    paragraphs: list[str] = []
+    for _ in range(rng.randint(5, 11)):
+        sentences = rng.sample(_FILLER, rng.randint(2, 4))
+        if relevant and rng.random() < 0.5:
+            sentences.append(rng.choice(_HOUSING))
+        paragraphs.append(" ".join(sentences))
+    return tuple(paragraphs)
+
+
+@lru_cache(maxsize=8192)
+def article(article_id: int) -> Article:
+    rng = _rng(article_id)
+    title = " ".join(
+        (
+            rng.choice(_PLACES),
+            rng.choice(_SUBJECTS),
+            rng.choice(_EVENTS),
+            f"{rng.randint(1, 12)}단지",
+            rng.choice(_DETAILS),
+        )
+    )
+    published = time.gmtime(1_760_000_000 - article_id * 1_800)
+    return Article(
+        article_id=article_id,
+        title=title,
+        snippet=f"{title} 관련 공급 계획과 주변 여건을 정리했다. {rng.choice(_FILLER)}",
+        lead=rng.choice(_FILLER),
+        paragraphs=_body(article_id),
+        published_at=time.strftime("%Y-%m-%dT%H:%M:%S+09:00", published),
+        reporter=rng.choice(_REPORTERS),
+        layout="local" if article_id % 4 == 3 else "portal",
+    )
+
+
+@lru_cache(maxsize=None)
+def _template(name: str) -> Template:
+    return Template((FIXTURES_DIR / name).read_text(encoding="utf-8"))
+
+
+@lru_cache(maxsize=None)
+def _llm_response() -> dict[str, object]:
+    return json.loads((FIXTURES_DIR / "llm_response.json").read_text(encoding="utf-8"))
+
+
+def _response_body(request: dict[str, object]) -> dict[str, object]:
+    response = dict(_llm_response())
+    response["model"] = request.get("model", response["model"])
+    return response
+
+
+class Corpus:
+    # Query i owns article ids [i * per_query, (i + 1) * per_query); every
+    # tenth row repeats the previous query's row so cross-query dedupe has
+    # work to do, as with real search results.
+    def __init__(self, size: int, queries: list[str], base_url: str) -> None:
+        self.size = size
+        self.queries = {query: index for index, query in enumerate(queries)}
+        self.per_query = max(1, math.ceil(size / max(1, len(queries))))
+        self.base_url = base_url
+
+    def article_url(self, article_id: int) -> str:
+        return f"{self.base_url}/news/{article_id}"
+
+    def result_ids(self, query: str) -> list[int]:
+        index = self.queries.get(query)
+        if index is None:
+            return []
+        start = index * self.per_query
+        ids = list(range(start, min(self.size, start + self.per_query)))
+        if index > 0:
+            for position in range(9, len(ids), 10):
+                ids[position] = start - self.per_query + position
+        return ids
+
+    def search_page(self, query: str, first: int) -> bytes:
+        ids = self.result_ids(query)
+        page = ids[max(0, first - 1) : max(0, first - 1) + 10]
+        items = []
+        for offset, article_id in enumerate(page):
+            entry = article(article_id)
+            url = html.escape(self.article_url(article_id))
+            items.append(
+                _template("bing_item.html").substitute(
+                    position=first + offset,
+                    url=url,
+                    site="서울경제일보" if entry.layout == "portal" else "강서구민신문",
+                    site_id=article_id % 97,
+                    title=html.escape(entry.title),
+                    snippet=html.escape(entry.snippet),
+                    published_at=entry.published_at[:10],
+                )
+            )
+        return (
+            _template("bing_serp.html")
+            .substitute(
+                query=html.escape(query),
+                query_quoted=quote_plus(query),
+                total=len(ids),
+                items="\n".join(items),
+                next_first=first + 10,
+            )
+            .encode("utf-8")
+        )
+
+    def article_page(self, article_id: int) -> tuple[bytes, str]:
+        entry = article(article_id)
+        if entry.layout == "local":
+            paragraphs = "<br><br>\n".join(html.escape(text) for text in entry.paragraphs)
+            charset = "euc-kr"
+        else:
+            paragraphs = "\n".join(f"<p>{html.escape(text)}</p>" for text in entry.paragraphs)
+            charset = "utf-8"
+        page = _template(f"article_{entry.layout}.html").substitute(
+            title=html.escape(entry.title),
+            lead=html.escape(entry.lead),
+            url=html.escape(self.article_url(article_id)),
+            published_at=entry.published_at,
+            reporter=entry.reporter,
+            paragraphs=paragraphs,
+        )
+        return page.encode("cp949" if charset == "euc-kr" else charset), charset
+
+
+class BatchStore:
+    # In-memory /v1/files and /v1/batches. A batch completes on the retrieve
+    # after finish_after polls (never when None); custom ids in failing come
+    # back in the error file. A cancelled batch stays "cancelling" for
+    # cancel_polls retrieves and then keeps the first answered_on_cancel
+    # answers, as the real API keeps work finished before the cancel.
+    def __init__(
+        self,
+        finish_after: int | None = 0,
+        failing: frozenset[str] = frozenset(),
+        cancel_polls: int = 1,
+        answered_on_cancel: int = 0,
+    ) -> None:
+        self.finish_after = finish_after
+        self.failing = failing
+        self.cancel_polls = cancel_polls
+        self.answered_on_cancel = answered_on_cancel
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict[str, object]] = {}
+        self.polls: dict[str, int] = {}
+        self.cancelled_at: dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add_file(self, content: bytes, filename: str, purpose: str) -> dict[str, object]:
+        with self._lock:
+            file_id = f"file-{next(self._ids)}"
+            self.files[file_id] = content
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+
+    def create(self, request: dict[str, object]) -> dict[str, object] | None:
+        input_file_id = str(request.get("input_file_id", ""))
+        with self._lock:
+            if input_file_id not in self.files:
+                return None
+            batch_id = f"batch_{next(self._ids)}"
+            batch: dict[str, object] = {
+                "id": batch_id,
+                "object": "batch",
+                "endpoint": request.get("endpoint", "/v1/responses"),
+                "input_file_id": input_file_id,
+                "completion_window": request.get("completion_window", "24h"),
+                "status": "in_progress",
+                "created_at": int(time.time()),
+                "output_file_id": None,
+                "error_file_id": None,
+            }
+            self.batches[batch_id] = batch
+            self.polls[batch_id] = 0
+        return dict(batch)
+
+    def retrieve(self, batch_id: str) -> dict[str, object] | None:
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            self.polls[batch_id] += 1
+            polls = self.polls[batch_id]
+            if batch["status"] == "in_progress":
+                if self.finish_after is not None and polls > self.finish_after:
+                    self._finish(batch, "completed", None)
+            elif batch["status"] == "cancelling":
+                if polls - self.cancelled_at[batch_id] > self.cancel_polls:
+                    self._finish(batch, "cancelled", self.answered_on_cancel)
+            return dict(batch)
+
+    def cancel(self, batch_id: str) -> dict[str, object] | None:
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            if batch["status"] == "in_progress":
+                batch["status"] = "cancelling"
+                self.cancelled_at[batch_id] = self.polls[batch_id]
+            return dict(batch)
+
+    def _finish(self, batch: dict[str, object], status: str, answered: int | None) -> None:
+        requests = [
+            json.loads(line)
+            for line in self.files[str(batch["input_file_id"])].decode("utf-8").splitlines()
+            if line.strip()
+        ]
+        if answered is not None:
+            requests = requests[:answered]
+        outputs: list[str] = []
+        errors: list[str] = []
+        for index, request in enumerate(requests):
+            custom_id = request.get("custom_id")
+            row: dict[str, object] = {"id": f"batch_req_{index}", "custom_id": custom_id}
+            if custom_id in self.failing:
+                row["response"] = {
+                    "status_code": 500,
+                    "request_id": f"req_{index}",
+                    "body": {"error": {"message": "stand-in failure", "type": "server_error"}},
+                }
+                row["error"] = None
+                errors.append(json.dumps(row, ensure_ascii=False))
+                continue
+            row["response"] = {
+                "status_code": 200,
+                "request_id": f"req_{index}",
+                "body": _response_body(request.get("body") or {}),
+            }
+            row["error"] = None
+            outputs.append(json.dumps(row, ensure_ascii=False))
+        batch["status"] = status
+        batch["request_counts"] = {
+            "total": len(requests),
+            "completed": len(outputs),
+            "failed": len(errors),
+        }
+        for field, lines in (("output_file_id", outputs), ("error_file_id", errors)):
+            if lines:
+                file_id = f"file-{next(self._ids)}"
+                self.files[file_id] = ("\n".join(lines) + "\n").encode("utf-8")
+                batch[field] = file_id
+
+    def content(self, file_id: str) -> bytes | None:
+        with self._lock:
+            return self.files.get(file_id)
+
+
+def _upload(content_type: str, body: bytes) -> tuple[bytes, str, str]:
+    # The SDK uploads files as multipart/form-data.
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    content, filename, purpose = b"", "upload", ""
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name == "file":
+            content = part.get_payload(decode=True) or b""
+            filename = part.get_filename() or filename
+        elif name == "purpose":
+            purpose = (part.get_payload(decode=True) or b"").decode("utf-8")
+    return content, filename, purpose
+
+
+def _handler(
+    corpus: Corpus,
+    latency_seconds: float,
+    batches: BatchStore | None = None,
+) -> type[BaseHTTPRequestHandler]:
+    batches = batches or BatchStore()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: object) -> None:
+            return
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            if latency_seconds:
+                time.sleep(latency_seconds)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, payload: dict[str, object] | None) -> None:
+            if payload is None:
+                self._send(404, b'{"error": {"message": "not found"}}', "application/json")
+                return
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self._send(200, body, "application/json")
+
+        def do_GET(self) -> None:
+            parts = urlsplit(self.path)
+            segments = parts.path.strip("/").split("/")
+            if segments[:2] == ["v1", "batches"] and len(segments) == 3:
+                self._send_json(batches.retrieve(segments[2]))
+                return
+            if segments[:2] == ["v1", "files"] and segments[3:] == ["content"]:
+                content = batches.content(segments[2])
+                if content is None:
+                    self._send_json(None)
+                else:
+                    self._send(200, content, "application/octet-stream")
+                return
+            if parts.path == "/search":
+                params = parse_qs(parts.query)
+                query = params.get("q", [""])[0]
+                first = int(params.get("first", ["1"])[0] or 1)
+                self._send(200, corpus.search_page(query, first), "text/html; charset=utf-8")
+                return
+            if parts.path.startswith("/news/"):
+                article_id = parts.path.rsplit("/", 1)[-1]
+                if article_id.isdigit() and int(article_id) < corpus.size:
+                    body, charset = corpus.article_page(int(article_id))
+                    self._send(200, body, f"text/html; charset={charset}")
+                    return
+            self._send(404, b"not found", "text/plain")
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length)
+            segments = urlsplit(self.path).path.strip("/").split("/")
+            if segments == ["v1", "files"]:
+                content, filename, purpose = _upload(self.headers.get("Content-Type", ""), body)
+                self._send_json(batches.add_file(content, filename, purpose))
+                return
+            request = json.loads(body or b"{}")
+            if segments == ["v1", "responses"]:
+                self._send_json(_response_body(request))
+            elif segments == ["v1", "batches"]:
+                self._send_json(batches.create(request))
+            elif segments[:2] == ["v1", "batches"] and segments[3:] == ["cancel"]:
+                self._send_json(batches.cancel(segments[2]))
+            else:
+                self._send_json(None)
+
+    return Handler
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for Bing, news sites and the OpenAI Responses and Batch APIs"
+    )
+    parser.add_argument("--size", type=int, default=500, help="Total search results served")
+    parser.add_argument("--query", action="append", default=[], help="Query to serve (repeat)")
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Delay added to every response")
+    return parser.parse_args()
+
+
+def open_server(
+    size: int,
+    queries: list[str],
+    latency_seconds: float = 0.0,
+    batches: BatchStore | None = None,
+    port: int = 0,
+) -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", port), BaseHTTPRequestHandler)
+    server.daemon_threads = True
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    server.RequestHandlerClass = _handler(
+        Corpus(size, queries, base_url),
+        latency_seconds,
+        batches,
+    )
+    return server, base_url
+
+
+def main() -> int:
+    args = parse_args()
+    server, base_url = open_server(args.size, args.query, args.latency_ms / 1000, port=args.port)
+    # The harness waits for this line before starting a run.
+    print(f"READY {base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import replace
+from datetime import datetime
+import logging
+import time
+from zoneinfo import ZoneInfo
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from scrapper.cache import ExtractionCache
+from scrapper.checkpoint import RunCheckpoint
+from scrapper.concurrency import AsyncHostLimiter
+from scrapper.config import Settings, base_profile, profile_settings
+from scrapper.host_health import HostHealth
+from scrapper.http_client import open_async_client
+from scrapper.models import (
+    ExtractedContent,
+    HostDecision,
+    RunReport,
+    ScoredArticle,
+    SearchResult,
+    SummaryResult,
+)
+from scrapper.pipeline import (
+    CandidateSelector,
+    SharedCrawl,
+    close_tracer,
+    configure_http,
+    content_fingerprint,
+    crawl_queries,
+    finish_run,
+    open_candidate_selector,
+    open_extraction_cache,
+    close_article_corpus,
+    open_article_corpus,
+    open_checkpoint,
+    open_crawl_memory,
+    open_host_health,
+    open_storage,
+    open_summary_cache,
+    open_tracer,
+    openai_client_kwargs,
+    release_http,
+    restore_selection,
+    restored_summaries,
+    save_crawl_memory,
+    save_fetch,
+    save_host_health,
+    save_selection,
+    save_summaries,
+    summary_throttle,
+)
+from scrapper.ranking import canonicalize_url
+from scrapper.search import iter_search_async
+from scrapper.summarizer import (
+    SummaryThrottle,
+    fallback_summary,
+    summarize_article_async,
+    summarize_batch,
+)
+from scrapper.text_extract import FetchedPage, extract_page, fetch_page_async, resolve_extractor_chain
+from scrapper.tracing import trace
+
+logger = logging.getLogger(__name__)
+
+
+def _extract(
+    settings: Settings,
+    url: str,
+    page: FetchedPage,
+    extractor_chain: tuple[str, ...],
+    extraction_cache: ExtractionCache | None,
+    timings: list[tuple[str, float]],
+    checkpoint: RunCheckpoint | None,
+) -> tuple[ExtractedContent, int]:
+    extracted = extract_page(url, page, extractor_chain, extraction_cache, timings)
+    fingerprint = content_fingerprint(settings, extracted.text)
+    save_fetch(checkpoint, canonicalize_url(url), extracted, fingerprint)
+    return extracted, fingerprint
+
+
+async def _search_stream(
+    settings: Settings,
+    client: httpx.AsyncClient,
+    queries: list[str],
+    checkpoint: RunCheckpoint | None,
+) -> AsyncIterator[tuple[str, list[SearchResult]]]:
+    # Queries answered before an interruption are replayed; only the rest hit
+    # the search providers.
+    replayed = checkpoint.search_batches() if checkpoint is not None else {}
+    for query in queries:
+        if query in replayed:
+            yield query, replayed[query]
+    stream = iter_search_async(
+        client,
+        [query for query in queries if query not in replayed],
+        settings.search_results_per_query,
+        workers=settings.search_workers,
+        deadline_seconds=settings.search_deadline_seconds,
+        min_interval_seconds=settings.search_min_interval_ms / 1000,
+        cache_ttl_seconds=settings.http_cache_search_ttl_minutes * 60,
+        providers=settings.search_providers,
+        bing_url=settings.bing_search_url,
+    )
+    try:
+        async for query, rows in stream:
+            if checkpoint is not None and rows:
+                checkpoint.save_search(query, rows)
+            yield query, rows
+    finally:
+        await stream.aclose()
+
+
+async def _collect_candidates_async(
+    settings: Settings,
+    client: httpx.AsyncClient,
+    selectors: list[CandidateSelector],
+    host_health: HostHealth | None = None,
+    checkpoint: RunCheckpoint | None = None,
+) -> None:
+    # Same stream as the thread engine, on one event loop: network waits
+    # overlap on the loop and only parsing is handed to worker threads.
+    queries = crawl_queries([selector.settings for selector in selectors])
+    fetch_slots = asyncio.Semaphore(settings.async_fetch_concurrency)
+    host_limiter = AsyncHostLimiter(settings.fetch_per_host_limit)
+    extractor_chain = resolve_extractor_chain(settings.extractor_chain)
+    extraction_cache = open_extraction_cache(settings, extractor_chain)
+
+    async def _fetch(url: str) -> tuple[ExtractedContent, int]:
+        if checkpoint is not None:
+            restored = checkpoint.fetched(canonicalize_url(url))
+            if restored is not None:
+                return restored
+        timeout: float | None = settings.fetch_timeout_seconds
+        if host_health is not None:
+            timeout = host_health.check(url)
+            if timeout is None:
+                return ExtractedContent(text="", method="circuit_open"), 0
+        timings: list[tuple[str, float]] = []
+        started = time.perf_counter()
+        try:
+            async with host_limiter.hold(url), fetch_slots:
+                # Host latency counts from the moment a slot is held.
+                started = time.perf_counter()
+                page = await fetch_page_async(
+                    client,
+                    url,
+                    timeout,
+                    cache_ttl_seconds=settings.http_cache_article_ttl_hours * 3600,
+                )
+        except Exception as exc:
+            timings.append(("fetch", time.perf_counter() - started))
+            if host_health is not None:
+                host_health.observe(url, timings[-1][1], error=exc)
+            logger.debug("Fetch failed | url=%s error=%s", url, exc)
+            return ExtractedContent(text="", method="failed", timings=tuple(timings)), 0
+        timings.append(("fetch", time.perf_counter() - started))
+        if host_health is not None:
+            host_health.observe(url, timings[-1][1], from_cache=page.from_cache)
+        extraction = asyncio.ensure_future(
+            asyncio.to_thread(
+                _extract,
+                settings,
+                url,
+                page,
+                extractor_chain,
+                extraction_cache,
+                timings,
+                checkpoint,
+            )
+        )
+        try:
+            return await asyncio.shield(extraction)
+        except asyncio.CancelledError:
+            # The worker thread cannot be interrupted; let it finish before
+            # the run closes the caches and checkpoint it writes to.
+            await asyncio.wait({extraction})
+            raise
+
+    crawl = SharedCrawl(
+        selectors,
+        settings.async_fetch_concurrency * 2,
+        lambda result: asyncio.create_task(_fetch(result.url)),
+    )
+    stream = _search_stream(settings, client, queries, checkpoint)
+    next_batch: asyncio.Future[tuple[str, list[SearchResult]] | None] | None = (
+        asyncio.ensure_future(anext(stream, None))
+    )
+    try:
+        while not crawl.finished:
+            if next_batch is not None and next_batch.done():
+                batch = next_batch.result()
+                next_batch = None
+                if batch is not None:
+                    crawl.admit(batch[1])
+                    next_batch = asyncio.ensure_future(anext(stream, None))
+
+            crawl.schedule()
+            if crawl.idle:
+                if next_batch is None or crawl.starved:
+                    break
+                await asyncio.wait({next_batch})
+                continue
+
+            waiters: set[asyncio.Future[object]] = {crawl.head}
+            if next_batch is not None:
+                waiters.add(next_batch)
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            crawl.commit_ready()
+    finally:
+        cancelled = crawl.cancel()
+        if cancelled:
+            await asyncio.wait(cancelled)
+        if next_batch is not None:
+            next_batch.cancel()
+            await asyncio.wait({next_batch})
+        await stream.aclose()
+
+
+async def _summarize_selected_async(
+    settings: Settings,
+    selected: list[ScoredArticle],
+    throttle: SummaryThrottle,
+    deadline: float,
+    checkpoint: RunCheckpoint | None = None,
+) -> list[SummaryResult]:
+    if not selected:
+        return []
+    loop = asyncio.get_running_loop()
+    summary_cache = open_summary_cache(settings)
+    results = restored_summaries(checkpoint, settings.profile, selected)
+    pending = [index for index, result in enumerate(results) if result is None]
+    if settings.summary_mode == "batch" and pending:
+        # The Batch API is a handful of polling calls; a worker thread is enough.
+        batch_results = await asyncio.to_thread(
+            summarize_batch,
+            OpenAI(**openai_client_kwargs(settings)),
+            settings.openai_model,
+            settings.keyword,
+            [selected[index] for index in pending],
+            cache=summary_cache,
+            deadline_seconds=min(
+                settings.summary_batch_deadline_minutes * 60,
+                max(0.0, deadline - loop.time()),
+            ),
+            poll_seconds=settings.summary_batch_poll_seconds,
+            related_keywords=settings.related_keywords,
+            excerpt_tokens=settings.summary_excerpt_tokens,
+        )
+        save_summaries(checkpoint, settings.profile, selected, pending, batch_results, results)
+
+    slots = asyncio.Semaphore(settings.summary_workers)
+    async with AsyncOpenAI(**openai_client_kwargs(settings)) as client:
+
+        async def _summarize(article: ScoredArticle) -> SummaryResult:
+            async with slots:
+                result = await summarize_article_async(
+                    client,
+                    settings.openai_model,
+                    settings.keyword,
+                    article,
+                    cache=summary_cache,
+                    throttle=throttle,
+                    related_keywords=settings.related_keywords,
+                    excerpt_tokens=settings.summary_excerpt_tokens,
+                )
+            if checkpoint is not None:
+                checkpoint.save_summary(settings.profile, article.canonical_url, result)
+            return result
+
+        tasks = {
+            index: asyncio.create_task(_summarize(selected[index]))
+            for index, result in enumerate(results)
+            if result is None
+        }
+        done: set[asyncio.Task[SummaryResult]] = set()
+        if tasks:
+            done, not_done = await asyncio.wait(
+                tasks.values(),
+                timeout=max(0.0, deadline - loop.time()),
+            )
+            for task in not_done:
+                task.cancel()
+            if not_done:
+                logger.warning("Run deadline reached during summaries | pending=%s", len(not_done))
+                await asyncio.wait(not_done)
+
+    for index, task in tasks.items():
+        if task in done:
+            results[index] = task.result()
+        else:
+            results[index] = fallback_summary(selected[index], reason="deadline")
+    return [result for result in results if result is not None]
+
+
+async def run_profiles_async(
+    settings: Settings,
+    dry_run: bool = False,
+    resume: bool = False,
+) -> list[RunReport]:
+    run_at = datetime.now(ZoneInfo(settings.timezone))
+    storage = open_storage(settings, dry_run)
+    corpus = open_article_corpus(settings)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.run_deadline_seconds
+    profiles = [profile_settings(settings, profile) for profile in settings.profiles]
+    checkpoint = open_checkpoint(settings, run_at, resume, dry_run, profiles)
+
+    tracer = open_tracer(settings, run_at)
+    reports: list[RunReport] = []
+    try:
+        host_decisions: tuple[HostDecision, ...] = ()
+        finished = restore_selection(checkpoint, profiles)
+        if finished is None:
+            host_health = open_host_health(settings)
+            memory = open_crawl_memory(settings)
+            selectors = [
+                open_candidate_selector(profile, storage, host_health, corpus, memory)
+                for profile in profiles
+            ]
+            configure_http(settings)
+            try:
+                with trace("run.collect"):
+                    async with open_async_client() as client:
+                        try:
+                            await asyncio.wait_for(
+                                _collect_candidates_async(
+                                    settings, client, selectors, host_health, checkpoint
+                                ),
+                                timeout=deadline - loop.time(),
+                            )
+                        except asyncio.TimeoutError:
+                            logger.warning(
+                                "Run deadline reached during collection | selected=%s",
+                                sum(len(selector.selected) for selector in selectors),
+                            )
+            finally:
+                release_http()
+                save_host_health(host_health)
+                save_crawl_memory(memory)
+            host_decisions = host_health.decisions() if host_health is not None else ()
+            finished = [selector.finish() for selector in selectors]
+            save_selection(checkpoint, profiles, finished)
+
+        # Profiles share one throttle so their summaries stay within one budget.
+        throttle = summary_throttle(settings)
+        with trace("run.summarize"):
+            summary_results = await asyncio.gather(
+                *(
+                    _summarize_selected_async(profile, selected, throttle, deadline, checkpoint)
+                    for profile, (_, _, selected) in zip(profiles, finished)
+                )
+            )
+
+        for profile, (searched_count, candidates_count, selected), results in zip(
+            profiles, finished, summary_results
+        ):
+            if corpus is not None:
+                corpus.save_summaries(selected, results)
+            # SMTP and the sent-history write are blocking; keep them off the loop.
+            report = await asyncio.to_thread(
+                finish_run,
+                profile,
+                storage,
+                run_at,
+                dry_run,
+                searched_count,
+                candidates_count,
+                selected,
+                results,
+                host_decisions,
+                checkpoint,
+            )
+            reports.append(report)
+    finally:
+        storage.close()
+        close_article_corpus(corpus)
+        reports = close_tracer(tracer, reports)
+    return reports
+
+
+async def run_daily_pipeline_async(
+    settings: Settings,
+    dry_run: bool = False,
+    resume: bool = False,
+) -> RunReport:
+    single = replace(settings, profiles=(base_profile(settings),))
+    return (await run_profiles_async(single, dry_run=dry_run, resume=resume))[0]
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+import sqlite3
+import time
+from typing import Callable, TypeVar
+
+from scrapper.models import ExtractedContent
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+
+def guard_cache(key: str, action: Callable[[], T]) -> T | None:
+    # A broken or locked cache must never fail the work it is caching.
+    try:
+        return action()
+    except sqlite3.Error as exc:
+        logger.debug("Cache error | key=%s error=%s", key, exc)
+        return None
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    url: str
+    status: int
+    content_type: str
+    etag: str
+    last_modified: str
+    content: bytes
+    fetched_at: float
+
+
+class HttpCache:
+    def __init__(self, db_path: Path, max_age_seconds: int, max_bytes: int) -> None:
+        self._db_path = db_path
+        self._max_age_seconds = max_age_seconds
+        self._max_bytes = max_bytes
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    content_type TEXT NOT NULL,
+                    etag TEXT NOT NULL,
+                    last_modified TEXT NOT NULL,
+                    content BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_http_cache_accessed_at
+                ON http_cache(accessed_at)
+                """
+            )
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=30)
+
+    def get(self, url: str) -> CachedResponse | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT status, content_type, etag, last_modified, content, fetched_at
+                FROM http_cache
+                WHERE url = ?
+                """,
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE http_cache SET accessed_at = ? WHERE url = ?",
+                (time.time(), url),
+            )
+            conn.commit()
+        return CachedResponse(
+            url=url,
+            status=int(row[0]),
+            content_type=str(row[1]),
+            etag=str(row[2]),
+            last_modified=str(row[3]),
+            content=bytes(row[4]),
+            fetched_at=float(row[5]),
+        )
+
+    def put(self, entry: CachedResponse) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO http_cache(
+                    url, status, content_type, etag, last_modified,
+                    content, size, fetched_at, accessed_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    status = excluded.status,
+                    content_type = excluded.content_type,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    content = excluded.content,
+                    size = excluded.size,
+                    fetched_at = excluded.fetched_at,
+                    accessed_at = excluded.accessed_at
+                """,
+                (
+                    entry.url,
+                    entry.status,
+                    entry.content_type,
+                    entry.etag,
+                    entry.last_modified,
+                    sqlite3.Binary(entry.content),
+                    len(entry.content),
+                    entry.fetched_at,
+                    entry.fetched_at,
+                ),
+            )
+            conn.commit()
+
+    def mark_revalidated(self, url: str) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE http_cache SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+            conn.commit()
+
+    def evict(self) -> int:
+        cutoff = time.time() - self._max_age_seconds
+        with self._connect() as conn:
+            removed = conn.execute(
+                "DELETE FROM http_cache WHERE fetched_at < ?",
+                (cutoff,),
+            ).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+            if total > self._max_bytes:
+                # Least recently used first until the cache fits again.
+                doomed: list[tuple[str]] = []
+                for url, size in conn.execute(
+                    "SELECT url, size FROM http_cache ORDER BY accessed_at ASC"
+                ):
+                    if total <= self._max_bytes:
+                        break
+                    doomed.append((url,))
+                    total -= size
+                conn.executemany("DELETE FROM http_cache WHERE url = ?", doomed)
+                removed += len(doomed)
+            conn.commit()
+        return removed
+
+
+class ExtractionCache:
+    def __init__(self, db_path: Path, version: str) -> None:
+        self._db_path = db_path
+        self._version = version
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS extraction_cache (
+                    canonical_url TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    published_at TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=30)
+
+    def get(self, canonical_url: str, content_hash: str) -> ExtractedContent | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT text, method, published_at
+                FROM extraction_cache
+                WHERE canonical_url = ? AND content_hash = ? AND version = ?
+                """,
+                (canonical_url, content_hash, self._version),
+            ).fetchone()
+        if row is None:
+            return None
+        return ExtractedContent(text=str(row[0]), method=str(row[1]), published_at=str(row[2]))
+
+    def put(self, canonical_url: str, content_hash: str, content: ExtractedContent) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO extraction_cache(
+                    canonical_url, content_hash, version, text, method, published_at, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(canonical_url) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    version = excluded.version,
+                    text = excluded.text,
+                    method = excluded.method,
+                    published_at = excluded.published_at,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    canonical_url,
+                    content_hash,
+                    self._version,
+                    content.text,
+                    content.method,
+                    content.published_at,
+                    time.time(),
+                ),
+            )
+            conn.commit()
+
+    def prune(self, max_age_seconds: int) -> int:
+        cutoff = time.time() - max_age_seconds
+        with self._connect() as conn:
+            removed = conn.execute(
+                "DELETE FROM extraction_cache WHERE updated_at < ? OR version != ?",
+                (cutoff, self._version),
+            ).rowcount
+            conn.commit()
+        return removed
+
+
+class SummaryCache:
+    def __init__(self, db_path: Path, max_age_seconds: int) -> None:
+        self._db_path = db_path
+        self._max_age_seconds = max_age_seconds
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS summary_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=30)
+
+    def get(self, cache_key: str) -> str | None:
+        cutoff = time.time() - self._max_age_seconds
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT text FROM summary_cache WHERE cache_key = ? AND created_at >= ?",
+                (cache_key, cutoff),
+            ).fetchone()
+        return str(row[0]) if row else None
+
+    def put(self, cache_key: str, model: str, text: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO summary_cache(cache_key, model, text, created_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    model = excluded.model,
+                    text = excluded.text,
+                    created_at = excluded.created_at
+                """,
+                (cache_key, model, text, time.time()),
+            )
+            conn.commit()
+
+    def prune(self) -> int:
+        cutoff = time.time() - self._max_age_seconds
+        with self._connect() as conn:
+            removed = conn.execute(
+                "DELETE FROM summary_cache WHERE created_at < ?",
+                (cutoff,),
+            ).rowcount
+            conn.commit()
+        return removed
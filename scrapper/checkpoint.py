@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+import json
+from pathlib import Path
+import sqlite3
+import time
+
+from scrapper.cache import guard_cache
+from scrapper.fingerprint import from_signed, to_signed
+from scrapper.models import ExtractedContent, ScoredArticle, SearchResult, SummaryResult
+
+COLLECTED = "collected"
+SENT = "sent"
+DRY_RUN_PREFIX = "dry-run/"
+_TABLES = ("checkpoint_search", "checkpoint_fetches", "checkpoint_summaries", "checkpoint_stages")
+
+
+def run_key(run_date: str, dry_run: bool) -> str:
+    # Dry runs keep their own rows, so they never touch a real run's progress.
+    return f"{DRY_RUN_PREFIX}{run_date}" if dry_run else run_date
+
+
+class RunCheckpoint:
+    # Progress of one run date, written as the run goes: search rows per
+    # query, extracted pages per URL, successful summaries per profile, and
+    # the per-profile stages (COLLECTED, SENT). A resumed run replays these
+    # instead of paying for them again. Checkpoint errors are logged and
+    # otherwise ignored, like cache errors.
+    def __init__(self, db_path: Path, run_date: str) -> None:
+        self._db_path = db_path
+        self.run_date = run_date
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoint_search (
+                    run_date TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    rows TEXT NOT NULL,
+                    PRIMARY KEY (run_date, query)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoint_fetches (
+                    run_date TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    published_at TEXT NOT NULL,
+                    content_fingerprint INTEGER NOT NULL,
+                    PRIMARY KEY (run_date, url)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoint_summaries (
+                    run_date TEXT NOT NULL,
+                    profile TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    PRIMARY KEY (run_date, profile, url)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoint_stages (
+                    run_date TEXT NOT NULL,
+                    profile TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (run_date, profile, stage)
+                )
+                """
+            )
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=30)
+
+    @property
+    def dry_run(self) -> bool:
+        return self.run_date.startswith(DRY_RUN_PREFIX)
+
+    def _scope(self) -> tuple[str, tuple[object, ...]]:
+        # Real and dry-run rows are cleared separately.
+        return "(run_date LIKE ?) = ?", (f"{DRY_RUN_PREFIX}%", self.dry_run)
+
+    def reset(self) -> None:
+        # A fresh run starts over for its date and drops every older date.
+        scope, params = self._scope()
+
+        def _reset() -> None:
+            with self._connect() as conn:
+                for table in _TABLES:
+                    conn.execute(f"DELETE FROM {table} WHERE {scope}", params)
+                conn.commit()
+
+        guard_cache("checkpoint", _reset)
+
+    def prune(self) -> None:
+        scope, params = self._scope()
+
+        def _prune() -> None:
+            with self._connect() as conn:
+                for table in _TABLES:
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE {scope} AND run_date != ?",
+                        (*params, self.run_date),
+                    )
+                conn.commit()
+
+        guard_cache("checkpoint", _prune)
+
+    def latest_unfinished(self, profiles: list[str]) -> str | None:
+        # The newest run in this namespace that has not sent every profile's
+        # digest, which may be an earlier date when a run crossed midnight.
+        scope, params = self._scope()
+
+        def _load() -> str | None:
+            with self._connect() as conn:
+                keys: set[str] = set()
+                for table in _TABLES:
+                    query = f"SELECT DISTINCT run_date FROM {table} WHERE {scope}"
+                    keys.update(str(row[0]) for row in conn.execute(query, params))
+                sent = conn.execute(
+                    "SELECT run_date, profile FROM checkpoint_stages WHERE stage = ?",
+                    (SENT,),
+                ).fetchall()
+            finished = {(str(key), str(profile)) for key, profile in sent}
+            for key in sorted(keys, reverse=True):
+                if any((key, profile) not in finished for profile in profiles):
+                    return key
+            return None
+
+        return guard_cache("checkpoint", _load)
+
+    def search_batches(self) -> dict[str, list[SearchResult]]:
+        def _load() -> dict[str, list[SearchResult]]:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT query, rows FROM checkpoint_search WHERE run_date = ?",
+                    (self.run_date,),
+                ).fetchall()
+            return {
+                str(query): [SearchResult(**row) for row in json.loads(payload)]
+                for query, payload in rows
+            }
+
+        return guard_cache("checkpoint", _load) or {}
+
+    def save_search(self, query: str, rows: list[SearchResult]) -> None:
+        payload = json.dumps([asdict(row) for row in rows], ensure_ascii=False)
+
+        def _save() -> None:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO checkpoint_search(run_date, query, rows)
+                    VALUES (?, ?, ?)
+                    """,
+                    (self.run_date, query, payload),
+                )
+                conn.commit()
+
+        guard_cache(query, _save)
+
+    def fetched(self, url: str) -> tuple[ExtractedContent, int] | None:
+        def _load() -> tuple[ExtractedContent, int] | None:
+            with self._connect() as conn:
+                row = conn.execute(
+                    """
+                    SELECT text, method, published_at, content_fingerprint
+                    FROM checkpoint_fetches
+                    WHERE run_date = ? AND url = ?
+                    """,
+                    (self.run_date, url),
+                ).fetchone()
+            if row is None:
+                return None
+            extracted = ExtractedContent(
+                text=str(row[0]),
+                method=str(row[1]),
+                published_at=str(row[2]),
+            )
+            return extracted, from_signed(int(row[3]))
+
+        return guard_cache(url, _load)
+
+    def save_fetch(self, url: str, extracted: ExtractedContent, fingerprint: int) -> None:
+        def _save() -> None:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO checkpoint_fetches(
+                        run_date, url, text, method, published_at, content_fingerprint
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        self.run_date,
+                        url,
+                        extracted.text,
+                        extracted.method,
+                        extracted.published_at,
+                        to_signed(fingerprint),
+                    ),
+                )
+                conn.commit()
+
+        guard_cache(url, _save)
+
+    def summaries(self, profile: str) -> dict[str, SummaryResult]:
+        def _load() -> dict[str, SummaryResult]:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    """
+                    SELECT url, text
+                    FROM checkpoint_summaries
+                    WHERE run_date = ? AND profile = ?
+                    """,
+                    (self.run_date, profile),
+                ).fetchall()
+            return {
+                str(url): SummaryResult(text=str(text), success=True, reason="ok", cached=True)
+                for url, text in rows
+            }
+
+        return guard_cache(profile, _load) or {}
+
+    def save_summary(self, profile: str, url: str, result: SummaryResult) -> None:
+        # Fallback summaries are not kept, so a resumed run tries them again.
+        if not result.success:
+            return
+
+        def _save() -> None:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO checkpoint_summaries(run_date, profile, url, text)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (self.run_date, profile, url, result.text),
+                )
+                conn.commit()
+
+        guard_cache(url, _save)
+
+    def _stage(self, profile: str, stage: str) -> str | None:
+        def _load() -> str | None:
+            with self._connect() as conn:
+                row = conn.execute(
+                    """
+                    SELECT payload
+                    FROM checkpoint_stages
+                    WHERE run_date = ? AND profile = ? AND stage = ?
+                    """,
+                    (self.run_date, profile, stage),
+                ).fetchone()
+            return str(row[0]) if row else None
+
+        return guard_cache(profile, _load)
+
+    def _save_stage(self, profile: str, stage: str, payload: str) -> None:
+        def _save() -> None:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO checkpoint_stages(
+                        run_date, profile, stage, payload, updated_at
+                    )
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (self.run_date, profile, stage, payload, time.time()),
+                )
+                conn.commit()
+
+        guard_cache(profile, _save)
+
+    def selection(self, profile: str) -> tuple[int, int, list[ScoredArticle]] | None:
+        payload = self._stage(profile, COLLECTED)
+        if payload is None:
+            return None
+        data = json.loads(payload)
+        selected = [
+            ScoredArticle(**{**row, "search_result": SearchResult(**row["search_result"])})
+            for row in data["selected"]
+        ]
+        return int(data["searched"]), int(data["candidates"]), selected
+
+    def save_selection(
+        self,
+        profile: str,
+        searched_count: int,
+        candidates_count: int,
+        selected: list[ScoredArticle],
+    ) -> None:
+        payload = {
+            "searched": searched_count,
+            "candidates": candidates_count,
+            "selected": [asdict(article) for article in selected],
+        }
+        self._save_stage(profile, COLLECTED, json.dumps(payload, ensure_ascii=False))
+
+    def sent(self, profile: str) -> bool:
+        return self._stage(profile, SENT) is not None
+
+    def mark_sent(self, profile: str) -> None:
+        self._save_stage(profile, SENT, "{}")
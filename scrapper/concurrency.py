@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+import threading
+import time
+from typing import AsyncIterator, Iterator
+from urllib.parse import urlparse
+
+
+def host_of(url: str) -> str:
+    try:
+        return urlparse(url).netloc.lower()
+    except ValueError:
+        return ""
+
+
+class HostLimiter:
+    def __init__(self, per_host: int) -> None:
+        self._per_host = max(1, per_host)
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.Semaphore] = {}
+
+    def _semaphore(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.Semaphore(self._per_host)
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    @contextmanager
+    def hold(self, url: str) -> Iterator[None]:
+        semaphore = self._semaphore(host_of(url))
+        with semaphore:
+            yield
+
+
+class AsyncHostLimiter:
+    def __init__(self, per_host: int) -> None:
+        self._per_host = max(1, per_host)
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def hold(self, url: str) -> AsyncIterator[None]:
+        host = host_of(url)
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._per_host)
+            self._semaphores[host] = semaphore
+        async with semaphore:
+            yield
+
+
+class RateLimiter:
+    def __init__(self, min_interval_seconds: float) -> None:
+        self._interval = max(0.0, min_interval_seconds)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def _reserve(self) -> float:
+        if self._interval <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        return slot - now
+
+    def wait(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class MinuteBudget:
+    # Token bucket refilled continuously at `per_minute / 60` units a second.
+    def __init__(self, per_minute: int) -> None:
+        self._capacity = float(max(1, per_minute))
+        self._rate = self._capacity / 60.0
+        self._available = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _try_take(self, needed: float) -> float:
+        # Returns 0 when the units were taken, otherwise how long to wait.
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._available = min(self._capacity, self._available + elapsed * self._rate)
+            self._updated = now
+            if self._available >= needed:
+                self._available -= needed
+                return 0.0
+            return (needed - self._available) / self._rate
+
+    def acquire(self, amount: int = 1) -> None:
+        needed = min(float(max(1, amount)), self._capacity)
+        while delay := self._try_take(needed):
+            time.sleep(delay)
+
+    async def acquire_async(self, amount: int = 1) -> None:
+        needed = min(float(max(1, amount)), self._capacity)
+        while delay := self._try_take(needed):
+            await asyncio.sleep(delay)
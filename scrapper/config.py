@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
 
 from dotenv import load_dotenv
 
+DEFAULT_EXTRACTOR_CHAIN = ("trafilatura", "bs4")
+HTML_PARSERS = ("auto", "lxml", "html.parser")
+DEFAULT_PROFILE = "default"
+SEARCH_PROVIDERS = ("duckduckgo", "bing")
+DEFAULT_BING_SEARCH_URL = "https://www.bing.com/search"
+
 DEFAULT_RELATED_KEYWORDS = (
     "마곡",
     "SH",
@@ -18,20 +25,84 @@ DEFAULT_RELATED_KEYWORDS = (
 )
 
 
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    keyword: str
+    related_keywords: tuple[str, ...]
+    recipient_emails: tuple[str, ...]
+    max_items: int
+
+
 @dataclass(frozen=True)
 class Settings:
+    profile: str
+    profiles: tuple[Profile, ...]
     timezone: str
     keyword: str
     related_keywords: tuple[str, ...]
     max_items: int
     dedupe_days: int
+    sent_retention_days: int
+    sent_archive_enabled: bool
+    content_dedupe_enabled: bool
+    content_dedupe_max_distance: int
     search_results_per_query: int
+    search_workers: int
+    search_deadline_seconds: int
+    search_min_interval_ms: int
+    search_providers: tuple[str, ...]
+    bing_search_url: str
+    incremental_crawl: bool
+    incremental_max_age_days: int
     pre_score_threshold: int
     final_score_threshold: int
     fetch_timeout_seconds: int
+    fetch_workers: int
+    fetch_per_host_limit: int
+    host_health_enabled: bool
+    host_history_days: int
+    adaptive_timeout_min_samples: int
+    adaptive_timeout_p95_multiplier: int
+    adaptive_timeout_min_seconds: int
+    circuit_breaker_failures: int
+    circuit_breaker_cooldown_minutes: int
+    extractor_chain: tuple[str, ...]
+    html_parser: str
+    extraction_executor: str
+    extraction_workers: int
+    pipeline_engine: str
+    async_fetch_concurrency: int
+    run_deadline_seconds: int
+    checkpoint_enabled: bool
+    corpus_enabled: bool
+    trace_enabled: bool
+    trace_dir: Path
+    http_pool_hosts: int
+    http_pool_per_host: int
+    http_connect_retries: int
+    http_backoff_ms: int
+    http_cache_enabled: bool
+    http_cache_path: Path
+    http_cache_article_ttl_hours: int
+    http_cache_search_ttl_minutes: int
+    http_cache_max_age_days: int
+    http_cache_max_mb: int
+    extract_cache_enabled: bool
+    extract_cache_version: str
     openai_api_key: str
     openai_model: str
     openai_base_url: str
+    summary_cache_enabled: bool
+    summary_cache_ttl_days: int
+    summary_workers: int
+    summary_requests_per_minute: int
+    summary_tokens_per_minute: int
+    summary_max_retries: int
+    summary_mode: str
+    summary_excerpt_tokens: int
+    summary_batch_deadline_minutes: int
+    summary_batch_poll_seconds: int
     recipient_emails: tuple[str, ...]
     sender_email: str
     smtp_host: str
@@ -59,6 +130,33 @@ def _int_env(name: str, default: int, minimum: int = 1) -> int:
     return value
 
 
+def _bool_env(name: str, default: bool) -> bool:
+    raw = os.getenv(name, "").strip().lower()
+    if not raw:
+        return default
+    if raw in ("1", "true", "yes", "on"):
+        return True
+    if raw in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"Environment variable {name} must be boolean: {raw}")
+
+
+def _choice_env(name: str, default: str, choices: tuple[str, ...]) -> str:
+    value = os.getenv(name, default).strip().lower() or default
+    if value not in choices:
+        allowed = ", ".join(choices)
+        raise ValueError(f"Environment variable {name} must be one of {allowed}: {value}")
+    return value
+
+
+def _path_env(name: str, default: str) -> Path:
+    raw = os.getenv(name, default).strip() or default
+    path = Path(raw)
+    if not path.is_absolute():
+        path = Path.cwd() / path
+    return path
+
+
 def _list_env(name: str, default_values: tuple[str, ...]) -> tuple[str, ...]:
     raw = os.getenv(name, "").strip()
     if not raw:
@@ -67,6 +165,15 @@ def _list_env(name: str, default_values: tuple[str, ...]) -> tuple[str, ...]:
     return values if values else default_values
 
 
+def _providers_env(name: str) -> tuple[str, ...]:
+    values = tuple(dict.fromkeys(value.lower() for value in _list_env(name, SEARCH_PROVIDERS)))
+    unknown = [value for value in values if value not in SEARCH_PROVIDERS]
+    if unknown:
+        allowed = ", ".join(SEARCH_PROVIDERS)
+        raise ValueError(f"Environment variable {name} must only list {allowed}: {unknown}")
+    return values
+
+
 def _recipient_emails() -> tuple[str, ...]:
     raw_multi = os.getenv("RECIPIENT_EMAILS", "").strip()
     if raw_multi:
@@ -77,6 +184,81 @@ def _recipient_emails() -> tuple[str, ...]:
     return (_required_env("RECIPIENT_EMAIL"),)
 
 
+def _string_tuple(value: object, field: str, source: Path) -> tuple[str, ...]:
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"Profile field {field} in {source} must be a list of strings")
+    return tuple(dict.fromkeys(item.strip() for item in value if item.strip()))
+
+
+def _load_profiles(path: Path, base: Profile) -> tuple[Profile, ...]:
+    # Each entry overrides the base keyword/recipients; missing fields inherit.
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Cannot read profiles file {path}: {exc}") from exc
+    if not isinstance(raw, list) or not raw:
+        raise ValueError(f"Profiles file {path} must contain a non-empty JSON list")
+
+    profiles: list[Profile] = []
+    for entry in raw:
+        if not isinstance(entry, dict):
+            raise ValueError(f"Each profile in {path} must be a JSON object")
+        name = str(entry.get("name", "")).strip()
+        if not name:
+            raise ValueError(f"Every profile in {path} needs a name")
+        if any(profile.name == name for profile in profiles):
+            raise ValueError(f"Duplicate profile name in {path}: {name}")
+        keyword = str(entry.get("keyword", "")).strip() or base.keyword
+        related_keywords = base.related_keywords
+        if "related_keywords" in entry:
+            related_keywords = _string_tuple(entry["related_keywords"], "related_keywords", path)
+        recipient_emails = base.recipient_emails
+        if "recipient_emails" in entry:
+            recipient_emails = _string_tuple(entry["recipient_emails"], "recipient_emails", path)
+            if not recipient_emails:
+                raise ValueError(f"Profile {name} in {path} has no recipient_emails")
+        max_items = entry.get("max_items", base.max_items)
+        if not isinstance(max_items, int) or max_items < 1:
+            raise ValueError(f"Profile {name} in {path} must have max_items >= 1")
+        profiles.append(
+            Profile(
+                name=name,
+                keyword=keyword,
+                related_keywords=related_keywords,
+                recipient_emails=recipient_emails,
+                max_items=max_items,
+            )
+        )
+    return tuple(profiles)
+
+
+def profile_settings(settings: Settings, profile: Profile) -> Settings:
+    return replace(
+        settings,
+        profile=profile.name,
+        keyword=profile.keyword,
+        related_keywords=profile.related_keywords,
+        recipient_emails=profile.recipient_emails,
+        max_items=profile.max_items,
+    )
+
+
+def base_profile(settings: Settings) -> Profile:
+    return Profile(
+        name=settings.profile,
+        keyword=settings.keyword,
+        related_keywords=settings.related_keywords,
+        recipient_emails=settings.recipient_emails,
+        max_items=settings.max_items,
+    )
+
+
+def load_db_path() -> Path:
+    # For tools that only read the DB and need no credentials.
+    load_dotenv()
+    return _path_env("DB_PATH", "data/scrapper.db")
+
+
 def load_settings() -> Settings:
     load_dotenv()
 
@@ -86,14 +268,81 @@ def load_settings() -> Settings:
 
     max_items = _int_env("MAX_ITEMS", default=10, minimum=1)
     dedupe_days = _int_env("DEDUPE_DAYS", default=7, minimum=1)
+    # Pruning never reaches into the dedupe window.
+    sent_retention_days = max(
+        dedupe_days,
+        _int_env("SENT_RETENTION_DAYS", default=90, minimum=1),
+    )
+    sent_archive_enabled = _bool_env("SENT_ARCHIVE_ENABLED", default=True)
+    content_dedupe_enabled = _bool_env("CONTENT_DEDUPE_ENABLED", default=True)
+    content_dedupe_max_distance = _int_env("CONTENT_DEDUPE_MAX_DISTANCE", default=6, minimum=0)
     search_results_per_query = _int_env("SEARCH_RESULTS_PER_QUERY", default=20, minimum=5)
+    search_workers = _int_env("SEARCH_WORKERS", default=4, minimum=1)
+    search_deadline_seconds = _int_env("SEARCH_DEADLINE_SECONDS", default=120, minimum=10)
+    search_min_interval_ms = _int_env("SEARCH_MIN_INTERVAL_MS", default=500, minimum=0)
+    search_providers = _providers_env("SEARCH_PROVIDERS")
+    bing_search_url = (
+        os.getenv("BING_SEARCH_URL", DEFAULT_BING_SEARCH_URL).strip() or DEFAULT_BING_SEARCH_URL
+    )
+    incremental_crawl = _bool_env("INCREMENTAL_CRAWL", default=False)
+    incremental_max_age_days = _int_env("INCREMENTAL_MAX_AGE_DAYS", default=7, minimum=1)
     pre_score_threshold = _int_env("PRE_SCORE_THRESHOLD", default=24, minimum=1)
     final_score_threshold = _int_env("FINAL_SCORE_THRESHOLD", default=36, minimum=1)
     fetch_timeout_seconds = _int_env("FETCH_TIMEOUT_SECONDS", default=15, minimum=3)
+    fetch_workers = _int_env("FETCH_WORKERS", default=8, minimum=1)
+    fetch_per_host_limit = _int_env("FETCH_PER_HOST_LIMIT", default=2, minimum=1)
+    host_health_enabled = _bool_env("HOST_HEALTH_ENABLED", default=True)
+    host_history_days = _int_env("HOST_HISTORY_DAYS", default=14, minimum=1)
+    adaptive_timeout_min_samples = _int_env("ADAPTIVE_TIMEOUT_MIN_SAMPLES", default=5, minimum=1)
+    adaptive_timeout_p95_multiplier = _int_env(
+        "ADAPTIVE_TIMEOUT_P95_MULTIPLIER", default=3, minimum=1
+    )
+    adaptive_timeout_min_seconds = _int_env("ADAPTIVE_TIMEOUT_MIN_SECONDS", default=3, minimum=1)
+    circuit_breaker_failures = _int_env("CIRCUIT_BREAKER_FAILURES", default=3, minimum=1)
+    circuit_breaker_cooldown_minutes = _int_env(
+        "CIRCUIT_BREAKER_COOLDOWN_MINUTES", default=360, minimum=1
+    )
+    extractor_chain = _list_env("EXTRACTOR_CHAIN", DEFAULT_EXTRACTOR_CHAIN)
+    html_parser = _choice_env("HTML_PARSER", "auto", HTML_PARSERS)
+    extraction_executor = _choice_env("EXTRACTION_EXECUTOR", "process", ("process", "inline"))
+    extraction_workers = _int_env("EXTRACTION_WORKERS", default=0, minimum=0)
+    pipeline_engine = _choice_env("PIPELINE_ENGINE", "thread", ("thread", "async"))
+    async_fetch_concurrency = _int_env("ASYNC_FETCH_CONCURRENCY", default=64, minimum=1)
+    run_deadline_seconds = _int_env("RUN_DEADLINE_SECONDS", default=900, minimum=60)
+    checkpoint_enabled = _bool_env("CHECKPOINT_ENABLED", default=True)
+    corpus_enabled = _bool_env("CORPUS_ENABLED", default=True)
+    trace_enabled = _bool_env("TRACE_ENABLED", default=True)
+    trace_dir = _path_env("TRACE_DIR", "data/traces")
+    http_pool_hosts = _int_env("HTTP_POOL_HOSTS", default=32, minimum=1)
+    http_pool_per_host = _int_env("HTTP_POOL_PER_HOST", default=8, minimum=1)
+    http_connect_retries = _int_env("HTTP_CONNECT_RETRIES", default=2, minimum=0)
+    http_backoff_ms = _int_env("HTTP_BACKOFF_MS", default=500, minimum=0)
+    http_cache_enabled = _bool_env("HTTP_CACHE_ENABLED", default=True)
+    http_cache_path = _path_env("HTTP_CACHE_PATH", "data/http_cache.db")
+    http_cache_article_ttl_hours = _int_env("HTTP_CACHE_ARTICLE_TTL_HOURS", default=72, minimum=0)
+    http_cache_search_ttl_minutes = _int_env(
+        "HTTP_CACHE_SEARCH_TTL_MINUTES", default=60, minimum=0
+    )
+    http_cache_max_age_days = _int_env("HTTP_CACHE_MAX_AGE_DAYS", default=30, minimum=1)
+    http_cache_max_mb = _int_env("HTTP_CACHE_MAX_MB", default=256, minimum=1)
+    extract_cache_enabled = _bool_env("EXTRACT_CACHE_ENABLED", default=True)
+    extract_cache_version = os.getenv("EXTRACT_CACHE_VERSION", "1").strip() or "1"
 
     openai_api_key = _required_env("OPENAI_API_KEY")
     openai_model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini").strip() or "gpt-4.1-mini"
     openai_base_url = os.getenv("OPENAI_BASE_URL", "").strip()
+    summary_cache_enabled = _bool_env("SUMMARY_CACHE_ENABLED", default=True)
+    summary_cache_ttl_days = _int_env("SUMMARY_CACHE_TTL_DAYS", default=30, minimum=1)
+    summary_workers = _int_env("SUMMARY_WORKERS", default=4, minimum=1)
+    summary_requests_per_minute = _int_env("SUMMARY_REQUESTS_PER_MINUTE", default=60, minimum=0)
+    summary_tokens_per_minute = _int_env("SUMMARY_TOKENS_PER_MINUTE", default=200000, minimum=0)
+    summary_max_retries = _int_env("SUMMARY_MAX_RETRIES", default=3, minimum=0)
+    summary_mode = _choice_env("SUMMARY_MODE", "sync", ("sync", "batch"))
+    summary_excerpt_tokens = _int_env("SUMMARY_EXCERPT_TOKENS", default=2500, minimum=0)
+    summary_batch_deadline_minutes = _int_env(
+        "SUMMARY_BATCH_DEADLINE_MINUTES", default=60, minimum=1
+    )
+    summary_batch_poll_seconds = _int_env("SUMMARY_BATCH_POLL_SECONDS", default=30, minimum=1)
 
     recipient_emails = _recipient_emails()
     smtp_username = _required_env("SMTP_USERNAME")
@@ -102,24 +351,88 @@ def load_settings() -> Settings:
     smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com").strip() or "smtp.gmail.com"
     smtp_port = _int_env("SMTP_PORT", default=587, minimum=1)
 
-    db_raw = os.getenv("DB_PATH", "data/scrapper.db").strip() or "data/scrapper.db"
-    db_path = Path(db_raw)
-    if not db_path.is_absolute():
-        db_path = Path.cwd() / db_path
+    db_path = _path_env("DB_PATH", "data/scrapper.db")
+
+    default_profile = Profile(
+        name=DEFAULT_PROFILE,
+        keyword=keyword,
+        related_keywords=related_keywords,
+        recipient_emails=recipient_emails,
+        max_items=max_items,
+    )
+    profiles = (default_profile,)
+    profiles_path = os.getenv("PROFILES_PATH", "").strip()
+    if profiles_path:
+        profiles = _load_profiles(_path_env("PROFILES_PATH", profiles_path), default_profile)
 
     return Settings(
+        profile=DEFAULT_PROFILE,
+        profiles=profiles,
         timezone=timezone,
         keyword=keyword,
         related_keywords=related_keywords,
         max_items=max_items,
         dedupe_days=dedupe_days,
+        sent_retention_days=sent_retention_days,
+        sent_archive_enabled=sent_archive_enabled,
+        content_dedupe_enabled=content_dedupe_enabled,
+        content_dedupe_max_distance=content_dedupe_max_distance,
         search_results_per_query=search_results_per_query,
+        search_workers=search_workers,
+        search_deadline_seconds=search_deadline_seconds,
+        search_min_interval_ms=search_min_interval_ms,
+        search_providers=search_providers,
+        bing_search_url=bing_search_url,
+        incremental_crawl=incremental_crawl,
+        incremental_max_age_days=incremental_max_age_days,
         pre_score_threshold=pre_score_threshold,
         final_score_threshold=final_score_threshold,
         fetch_timeout_seconds=fetch_timeout_seconds,
+        fetch_workers=fetch_workers,
+        fetch_per_host_limit=fetch_per_host_limit,
+        host_health_enabled=host_health_enabled,
+        host_history_days=host_history_days,
+        adaptive_timeout_min_samples=adaptive_timeout_min_samples,
+        adaptive_timeout_p95_multiplier=adaptive_timeout_p95_multiplier,
+        adaptive_timeout_min_seconds=adaptive_timeout_min_seconds,
+        circuit_breaker_failures=circuit_breaker_failures,
+        circuit_breaker_cooldown_minutes=circuit_breaker_cooldown_minutes,
+        extractor_chain=extractor_chain,
+        html_parser=html_parser,
+        extraction_executor=extraction_executor,
+        extraction_workers=extraction_workers,
+        pipeline_engine=pipeline_engine,
+        async_fetch_concurrency=async_fetch_concurrency,
+        run_deadline_seconds=run_deadline_seconds,
+        checkpoint_enabled=checkpoint_enabled,
+        corpus_enabled=corpus_enabled,
+        trace_enabled=trace_enabled,
+        trace_dir=trace_dir,
+        http_pool_hosts=http_pool_hosts,
+        http_pool_per_host=http_pool_per_host,
+        http_connect_retries=http_connect_retries,
+        http_backoff_ms=http_backoff_ms,
+        http_cache_enabled=http_cache_enabled,
+        http_cache_path=http_cache_path,
+        http_cache_article_ttl_hours=http_cache_article_ttl_hours,
+        http_cache_search_ttl_minutes=http_cache_search_ttl_minutes,
+        http_cache_max_age_days=http_cache_max_age_days,
+        http_cache_max_mb=http_cache_max_mb,
+        extract_cache_enabled=extract_cache_enabled,
+        extract_cache_version=extract_cache_version,
         openai_api_key=openai_api_key,
         openai_model=openai_model,
         openai_base_url=openai_base_url,
+        summary_cache_enabled=summary_cache_enabled,
+        summary_cache_ttl_days=summary_cache_ttl_days,
+        summary_workers=summary_workers,
+        summary_requests_per_minute=summary_requests_per_minute,
+        summary_tokens_per_minute=summary_tokens_per_minute,
+        summary_max_retries=summary_max_retries,
+        summary_mode=summary_mode,
+        summary_excerpt_tokens=summary_excerpt_tokens,
+        summary_batch_deadline_minutes=summary_batch_deadline_minutes,
+        summary_batch_poll_seconds=summary_batch_poll_seconds,
         recipient_emails=recipient_emails,
         sender_email=sender_email,
         smtp_host=smtp_host,
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+import json
+import logging
+from pathlib import Path
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+from scrapper.config import load_db_path
+from scrapper.models import ExtractedContent, ScoredArticle, SearchResult, SummaryResult
+from scrapper.storage import connect
+
+logger = logging.getLogger(__name__)
+
+# Rows are written in batches; consider() sees one article at a time.
+_FLUSH_ROWS = 64
+# FTS5 trigram only indexes terms of three characters or more; shorter ones
+# (most Korean words: 마곡, 청약, 분양) fall back to LIKE over the same table.
+_TRIGRAM_MIN_CHARS = 3
+_DATE_RE = re.compile(r"(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})")
+_FTS_COLUMNS = ("title", "snippet", "text", "summary")
+
+
+@dataclass(frozen=True)
+class CorpusHit:
+    url: str
+    title: str
+    published_on: str
+    score: int
+    summary: str
+
+
+def published_on(published_at: str, fetched_at: float) -> str:
+    # YYYY-MM-DD for --since filters; pages without a readable date count
+    # from the day they were fetched.
+    match = _DATE_RE.search(published_at)
+    if match:
+        try:
+            return date(*(int(part) for part in match.groups())).isoformat()
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(fetched_at, timezone.utc).date().isoformat()
+
+
+class ArticleCorpus:
+    # Every fetched and scored article, kept across runs in DB_PATH with an
+    # FTS5 trigram index over title, snippet, body and summary. Rows are
+    # keyed by canonical URL; a later crawl refreshes the text and keeps the
+    # best score any profile gave it.
+    def __init__(self, db_path: Path) -> None:
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, str, str, str, str, str, int, int]] = []
+        self._conn = connect(db_path)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS corpus_articles (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL UNIQUE,
+                    title TEXT NOT NULL,
+                    snippet TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    published_at TEXT NOT NULL,
+                    published_on TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    summary TEXT NOT NULL DEFAULT '',
+                    fetched_at INTEGER NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_corpus_articles_published_on
+                ON corpus_articles(published_on)
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS corpus_fts USING fts5(
+                    title, snippet, text, summary,
+                    content='corpus_articles', content_rowid='id', tokenize='trigram'
+                )
+                """
+            )
+            # External-content FTS: the triggers keep the index in step.
+            self._conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS corpus_articles_ai AFTER INSERT ON corpus_articles
+                BEGIN
+                    INSERT INTO corpus_fts(rowid, title, snippet, text, summary)
+                    VALUES (new.id, new.title, new.snippet, new.text, new.summary);
+                END
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS corpus_articles_ad AFTER DELETE ON corpus_articles
+                BEGIN
+                    INSERT INTO corpus_fts(corpus_fts, rowid, title, snippet, text, summary)
+                    VALUES ('delete', old.id, old.title, old.snippet, old.text, old.summary);
+                END
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS corpus_articles_au
+                AFTER UPDATE OF title, snippet, text, summary ON corpus_articles
+                BEGIN
+                    INSERT INTO corpus_fts(corpus_fts, rowid, title, snippet, text, summary)
+                    VALUES ('delete', old.id, old.title, old.snippet, old.text, old.summary);
+                    INSERT INTO corpus_fts(rowid, title, snippet, text, summary)
+                    VALUES (new.id, new.title, new.snippet, new.text, new.summary);
+                END
+                """
+            )
+
+    def add(
+        self,
+        canonical_url: str,
+        result: SearchResult,
+        extracted: ExtractedContent,
+        score: int,
+    ) -> None:
+        if not extracted.text:
+            return
+        fetched_at = time.time()
+        published_at = extracted.published_at or result.published_at
+        row = (
+            canonical_url,
+            result.title,
+            result.snippet,
+            extracted.text,
+            published_at,
+            published_on(published_at, fetched_at),
+            score,
+            int(fetched_at),
+        )
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) < _FLUSH_ROWS:
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            rows, self._pending = self._pending, []
+            if not rows:
+                return
+            with self._conn:
+                # The FTS row is rewritten only when the indexed text changed.
+                self._conn.executemany(
+                    """
+                    INSERT INTO corpus_articles(
+                        url, title, snippet, text, published_at, published_on, score, fetched_at
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        title = excluded.title,
+                        snippet = excluded.snippet,
+                        text = excluded.text,
+                        published_at = excluded.published_at,
+                        published_on = excluded.published_on,
+                        score = MAX(score, excluded.score),
+                        fetched_at = excluded.fetched_at
+                    WHERE text != excluded.text
+                        OR title != excluded.title
+                        OR snippet != excluded.snippet
+                        OR score < excluded.score
+                    """,
+                    rows,
+                )
+
+    def save_summaries(
+        self,
+        selected: list[ScoredArticle],
+        summary_results: list[SummaryResult],
+    ) -> None:
+        rows = [
+            (result.text, article.canonical_url)
+            for article, result in zip(selected, summary_results)
+            if result.success
+        ]
+        self.flush()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE corpus_articles SET summary = ? WHERE url = ? AND summary != ?",
+                [(text, url, text) for text, url in rows],
+            )
+
+    def search(self, query: str, since: str = "", limit: int = 20) -> list[CorpusHit]:
+        # Every term must appear somewhere in title, snippet, body or summary.
+        where: list[str] = []
+        params: list[object] = []
+        long_terms = [term for term in query.split() if len(term) >= _TRIGRAM_MIN_CHARS]
+        if long_terms:
+            where.append("corpus_fts MATCH ?")
+            params.append(" ".join('"' + term.replace('"', '""') + '"' for term in long_terms))
+        for term in query.split():
+            if len(term) >= _TRIGRAM_MIN_CHARS:
+                continue
+            pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            likes = [f"corpus_fts.{column} LIKE ? ESCAPE '\\'" for column in _FTS_COLUMNS]
+            where.append("(" + " OR ".join(likes) + ")")
+            params.extend([pattern] * len(_FTS_COLUMNS))
+        if since:
+            where.append("a.published_on >= ?")
+            params.append(since)
+        sql = """
+            SELECT a.url, a.title, a.published_on, a.score, a.summary
+            FROM corpus_fts
+            JOIN corpus_articles AS a ON a.id = corpus_fts.rowid
+        """
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY a.published_on DESC, a.score DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            CorpusHit(
+                url=str(url),
+                title=str(title),
+                published_on=str(day),
+                score=int(score),
+                summary=str(summary),
+            )
+            for url, title, day, score, summary in rows
+        ]
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+def open_corpus(db_path: Path) -> ArticleCorpus | None:
+    try:
+        return ArticleCorpus(db_path)
+    except sqlite3.Error as exc:
+        # Typically an SQLite build without FTS5 or the trigram tokenizer (3.34+).
+        logger.warning("Article corpus unavailable | error=%s", exc)
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Search articles kept from earlier runs")
+    parser.add_argument("query", help="Words that must all appear, e.g. '마곡 청약'")
+    parser.add_argument("--since", default="", help="Only articles published on/after YYYY-MM-DD")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="One JSON object per line")
+    parser.add_argument("--db-path", type=Path, default=None, help="Defaults to DB_PATH")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    corpus = open_corpus(args.db_path or load_db_path())
+    if corpus is None:
+        return 1
+    started = time.perf_counter()
+    try:
+        hits = corpus.search(args.query, since=args.since, limit=args.limit)
+    finally:
+        corpus.close()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for hit in hits:
+        if args.json:
+            print(json.dumps(asdict(hit), ensure_ascii=False))
+        else:
+            print(f"{hit.published_on}  {hit.score:>3}  {hit.title}\n            {hit.url}")
+    print(f"{len(hits)} result(s) in {elapsed_ms:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,7 @@ from html import escape
 
 from scrapper.config import Settings
 from scrapper.models import SummarizedArticle
+from scrapper.tracing import trace
 
 
 def _nl2br(text: str) -> str:
@@ -67,8 +68,11 @@ def send_digest_email(
     html_body = build_html_body(run_at, settings.timezone, settings.keyword, articles)
     message.attach(MIMEText(html_body, "html", "utf-8"))
 
-    with smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=30) as smtp:
-        smtp.starttls()
-        smtp.login(settings.smtp_username, settings.smtp_app_password)
-        smtp.sendmail(settings.sender_email, list(settings.recipient_emails), message.as_string())
+    payload = message.as_string()
+    with trace("smtp", settings.profile) as span:
+        span.bytes = len(payload.encode("utf-8"))
+        with smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=30) as smtp:
+            smtp.starttls()
+            smtp.login(settings.smtp_username, settings.smtp_app_password)
+            smtp.sendmail(settings.sender_email, list(settings.recipient_emails), payload)
 
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from collections import Counter
+import hashlib
+import re
+from typing import Iterable
+
+FINGERPRINT_BITS = 64
+_MASK = (1 << FINGERPRINT_BITS) - 1
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int:
+    # Word bigrams are enough to tie reposted press releases together while
+    # staying cheap enough to run on every extracted article.
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < 2:
+        return 0
+    shingles = Counter(f"{left} {right}" for left, right in zip(tokens, tokens[1:]))
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle, count in shingles.items():
+        hashed = _hash64(shingle)
+        for bit in range(FINGERPRINT_BITS):
+            if hashed >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(left: int, right: int) -> int:
+    return ((left ^ right) & _MASK).bit_count()
+
+
+def to_signed(fingerprint: int) -> int:
+    # SQLite INTEGER is a signed 64-bit value.
+    if fingerprint >> (FINGERPRINT_BITS - 1):
+        return fingerprint - (1 << FINGERPRINT_BITS)
+    return fingerprint
+
+
+def from_signed(value: int) -> int:
+    return value & _MASK
+
+
+class SimHashIndex:
+    # LSH banding: split the fingerprint into max_distance + 1 bands. Two
+    # fingerprints within max_distance bits differ in at most max_distance
+    # bands, so they always share one band exactly (pigeonhole).
+    def __init__(self, fingerprints: Iterable[int] = (), max_distance: int = 3) -> None:
+        self._max_distance = max_distance
+        bands = max_distance + 1
+        width = FINGERPRINT_BITS // bands
+        self._bands = [
+            (index * width, FINGERPRINT_BITS if index == bands - 1 else (index + 1) * width)
+            for index in range(bands)
+        ]
+        self._buckets: list[dict[int, list[int]]] = [{} for _ in self._bands]
+        for fingerprint in fingerprints:
+            self.add(fingerprint)
+
+    def _band_keys(self, fingerprint: int) -> list[int]:
+        return [
+            (fingerprint >> start) & ((1 << (end - start)) - 1)
+            for start, end in self._bands
+        ]
+
+    def add(self, fingerprint: int) -> None:
+        if not fingerprint:
+            return
+        for buckets, key in zip(self._buckets, self._band_keys(fingerprint)):
+            buckets.setdefault(key, []).append(fingerprint)
+
+    def find(self, fingerprint: int) -> int | None:
+        if not fingerprint:
+            return None
+        for buckets, key in zip(self._buckets, self._band_keys(fingerprint)):
+            for candidate in buckets.get(key, ()):
+                if hamming_distance(candidate, fingerprint) <= self._max_distance:
+                    return candidate
+        return None
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+import logging
+import math
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+import httpx
+import requests
+
+from scrapper.concurrency import host_of
+from scrapper.models import HostDecision
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+# Only the most recent successes feed the p95, so a host that got faster
+# (or slower) is picked up within a few runs.
+_P95_WINDOW = 100
+
+
+def is_host_failure(exc: BaseException) -> bool:
+    # 4xx means the host answered; only silence and server errors count.
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, httpx.TransportError)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return False
+
+
+@dataclass
+class _HostState:
+    latencies: list[float] = field(default_factory=list)
+    consecutive_failures: int = 0
+    last_failure_at: float = 0.0
+    circuit: str = CLOSED
+    trial_in_flight: bool = False
+    skipped: int = 0
+    failures: int = 0
+    tripped: bool = False
+
+
+class HostHealth:
+    # Per-host fetch history kept in the main DB. Timeouts shrink to a multiple
+    # of the host's historical p95 (never above FETCH_TIMEOUT_SECONDS), and a
+    # host failing CIRCUIT_BREAKER_FAILURES times in a row is skipped until the
+    # cooldown has passed; then a single trial fetch decides whether it stays
+    # open.
+    def __init__(
+        self,
+        db_path: Path,
+        default_timeout: float,
+        min_timeout: float,
+        p95_multiplier: float,
+        min_samples: int,
+        failure_threshold: int,
+        cooldown_seconds: float,
+        history_days: int,
+    ) -> None:
+        self._db_path = db_path
+        self._default_timeout = default_timeout
+        self._min_timeout = min(min_timeout, default_timeout)
+        self._p95_multiplier = p95_multiplier
+        self._min_samples = min_samples
+        self._failure_threshold = failure_threshold
+        self._cooldown_seconds = cooldown_seconds
+        self._history_seconds = history_days * 86400
+        self._lock = threading.Lock()
+        self._hosts: defaultdict[str, _HostState] = defaultdict(_HostState)
+        self._p95: dict[str, float] = {}
+        self._samples: list[tuple[str, float, int, float]] = []
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS host_fetches (
+                    host TEXT NOT NULL,
+                    seconds REAL NOT NULL,
+                    ok INTEGER NOT NULL,
+                    recorded_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_host_fetches_host_recorded_at
+                ON host_fetches(host, recorded_at)
+                """
+            )
+            conn.commit()
+            self._load(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=30)
+
+    def _load(self, conn: sqlite3.Connection) -> None:
+        now = time.time()
+        rows = conn.execute(
+            """
+            SELECT host, seconds, ok, recorded_at
+            FROM host_fetches
+            WHERE recorded_at >= ?
+            ORDER BY host, recorded_at
+            """,
+            (now - self._history_seconds,),
+        )
+        for host, seconds, ok, recorded_at in rows:
+            state = self._hosts[str(host)]
+            if ok:
+                state.latencies.append(float(seconds))
+                state.consecutive_failures = 0
+            else:
+                state.consecutive_failures += 1
+                state.last_failure_at = float(recorded_at)
+
+        for host, state in self._hosts.items():
+            recent = sorted(state.latencies[-_P95_WINDOW:])
+            if len(recent) >= self._min_samples:
+                self._p95[host] = recent[max(1, math.ceil(0.95 * len(recent))) - 1]
+            if state.consecutive_failures >= self._failure_threshold:
+                cooling = now - state.last_failure_at < self._cooldown_seconds
+                state.circuit = OPEN if cooling else HALF_OPEN
+
+    def _timeout(self, host: str) -> float:
+        p95 = self._p95.get(host)
+        if p95 is None:
+            return self._default_timeout
+        return min(self._default_timeout, max(self._min_timeout, p95 * self._p95_multiplier))
+
+    def is_open(self, url: str) -> bool:
+        with self._lock:
+            state = self._hosts.get(host_of(url))
+            return state is not None and state.circuit == OPEN
+
+    def check(self, url: str) -> float | None:
+        # Timeout to use for this fetch, or None when the circuit says skip.
+        host = host_of(url)
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is not None and state.circuit != CLOSED:
+                if state.circuit == OPEN or state.trial_in_flight:
+                    state.skipped += 1
+                    return None
+                state.trial_in_flight = True
+        return self._timeout(host)
+
+    def observe(
+        self,
+        url: str,
+        seconds: float,
+        error: BaseException | None = None,
+        from_cache: bool = False,
+    ) -> None:
+        host = host_of(url)
+        now = time.time()
+        ok = error is None or not is_host_failure(error)
+        with self._lock:
+            state = self._hosts[host]
+            state.trial_in_flight = False
+            if from_cache:
+                # Says nothing about the host; a half-open trial is simply retried.
+                return
+            self._samples.append((host, seconds, int(ok), now))
+            if ok:
+                state.consecutive_failures = 0
+                state.circuit = CLOSED
+                return
+            state.failures += 1
+            state.consecutive_failures += 1
+            state.last_failure_at = now
+            if state.circuit == HALF_OPEN or state.consecutive_failures >= self._failure_threshold:
+                if state.circuit != OPEN:
+                    state.tripped = True
+                    logger.warning(
+                        "Circuit opened | host=%s consecutive_failures=%s",
+                        host,
+                        state.consecutive_failures,
+                    )
+                state.circuit = OPEN
+
+    def decisions(self) -> tuple[HostDecision, ...]:
+        # Only hosts that were treated differently from the defaults.
+        decisions: list[HostDecision] = []
+        with self._lock:
+            for host in sorted(self._hosts):
+                state = self._hosts[host]
+                timeout = self._timeout(host)
+                if timeout == self._default_timeout and state.circuit == CLOSED and not (
+                    state.skipped or state.tripped
+                ):
+                    continue
+                decisions.append(
+                    HostDecision(
+                        host=host,
+                        timeout_seconds=timeout,
+                        p95_seconds=self._p95.get(host, 0.0),
+                        circuit=state.circuit,
+                        skipped=state.skipped,
+                        failures=state.failures,
+                    )
+                )
+        return tuple(decisions)
+
+    def save(self) -> None:
+        with self._lock:
+            samples, self._samples = self._samples, []
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO host_fetches(host, seconds, ok, recorded_at) VALUES (?, ?, ?, ?)",
+                samples,
+            )
+            conn.execute(
+                "DELETE FROM host_fetches WHERE recorded_at < ?",
+                (time.time() - self._history_seconds,),
+            )
+            conn.commit()
+
+
+def format_host_decisions(decisions: tuple[HostDecision, ...]) -> str:
+    # "adapted=<hosts with a shorter timeout> <host>=<circuit>/<skipped>,..."
+    adapted = sum(1 for decision in decisions if decision.p95_seconds > 0)
+    breakers = ",".join(
+        f"{decision.host}={decision.circuit}/{decision.skipped}"
+        for decision in decisions
+        if decision.circuit != CLOSED or decision.skipped
+    )
+    return f"adapted={adapted} {breakers}".strip()
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+import re
+from typing import Iterator
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    _HAVE_LXML = False
+else:
+    _HAVE_LXML = True
+
+logger = logging.getLogger(__name__)
+
+# The lxml backend returns what the html.parser + BeautifulSoup code returns
+# for well-formed pages; it just builds the tree in C. libxml2 repairs broken
+# markup differently (an unclosed <p>, a <div> inside a <p>), and such markup
+# is common, so lxml is only used when HTML_PARSER asks for it.
+BS4 = "html.parser"
+LXML = "lxml"
+
+# Checked in priority order; the first tag per key counts, and an empty
+# content moves on to the next key.
+_PUBLISHED_META = (
+    ("property", "article:published_time"),
+    ("property", "og:published_time"),
+    ("name", "pubdate"),
+    ("name", "publishdate"),
+    ("name", "publication_date"),
+    ("name", "date"),
+    ("name", "dc.date"),
+    ("itemprop", "datePublished"),
+)
+# BeautifulSoup keeps these strings out of get_text().
+_NO_TEXT_TAGS = frozenset(("rp", "rt", "script", "style", "template"))
+_CLASS_XPATH = 'contains(concat(" ", normalize-space(@class), " "), " {} ")'
+
+# libxml2 turns \r into \n; html.parser keeps it. Inside text it travels
+# through libxml2 as a private-use character instead.
+_CR = "\ue000"
+_TEXT_RUN_RE = re.compile(r"(?:^|(?<=>))[^<]+")
+
+_parser = BS4
+
+
+@dataclass(frozen=True)
+class BingItem:
+    title: str
+    url: str
+    snippet: str
+    published_at: str
+
+
+def resolve_html_parser(name: str) -> str:
+    if name == "auto":
+        return BS4
+    if name == LXML and not _HAVE_LXML:
+        logger.warning("HTML_PARSER=lxml but lxml is not installed; using html.parser")
+        return BS4
+    return name
+
+
+def set_html_parser(name: str) -> None:
+    global _parser
+    _parser = resolve_html_parser(name)
+
+
+def get_html_parser() -> str:
+    return _parser
+
+
+def _first_published_at(found: dict[int, str]) -> str:
+    for index in range(len(_PUBLISHED_META)):
+        content = found.get(index, "").strip()
+        if content:
+            return content
+    return ""
+
+
+def _bs4_published_at(soup: BeautifulSoup) -> str:
+    # One pass over <meta> instead of a find() per key.
+    found: dict[int, str] = {}
+    for tag in soup.find_all("meta"):
+        for index, (attr, value) in enumerate(_PUBLISHED_META):
+            if index not in found and tag.get(attr) == value:
+                found[index] = tag.get("content") or ""
+    published_at = _first_published_at(found)
+    if published_at:
+        return published_at
+
+    time_tag = soup.find("time")
+    if time_tag:
+        datetime_attr = (time_tag.get("datetime") or "").strip()
+        if datetime_attr:
+            return datetime_attr
+        return time_tag.get_text(" ", strip=True)
+    return ""
+
+
+def _bs4_article(html: str) -> tuple[str, str]:
+    soup = BeautifulSoup(html, "html.parser")
+    published_at = _bs4_published_at(soup)
+    paragraphs = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
+    return "\n".join(paragraphs).strip(), published_at
+
+
+def _bs4_bing_items(html: str) -> list[BingItem]:
+    soup = BeautifulSoup(html, "html.parser")
+    items: list[BingItem] = []
+    for item in soup.select("li.b_algo"):
+        link = item.select_one("h2 a")
+        if link is None:
+            continue
+        snippet_el = item.select_one("div.b_caption p") or item.select_one("p")
+        date_el = item.select_one("span.news_dt") or item.select_one(".news_dt")
+        items.append(
+            BingItem(
+                title=link.get_text(" ", strip=True),
+                url=(link.get("href") or "").strip(),
+                snippet=snippet_el.get_text(" ", strip=True) if snippet_el else "",
+                published_at=date_el.get_text(" ", strip=True) if date_el else "",
+            )
+        )
+    return items
+
+
+def _mark_cr(match: re.Match[str]) -> str:
+    # Only \r between the first and last non-space character of a run can
+    # survive strip().
+    text = match.group()
+    start = len(text) - len(text.lstrip())
+    end = len(text.rstrip())
+    return text[:start] + text[start:end].replace("\r", _CR) + text[end:]
+
+
+def _lxml_root(html: str) -> etree._Element | None:
+    if _CR in html:
+        # The \r round trip would rewrite the page's own U+E000.
+        return None
+    if "\r" in html:
+        html = _TEXT_RUN_RE.sub(_mark_cr, html)
+    # Bytes with an explicit encoding, so an <?xml encoding?> prolog or a
+    # stale <meta charset> cannot change how the text is read.
+    parser = lxml.html.HTMLParser(encoding="utf-8", huge_tree=True)
+    try:
+        root = lxml.html.document_fromstring(html.encode("utf-8", "replace"), parser=parser)
+    except etree.ParserError:
+        # Nothing to parse; html.parser gives the same empty answer.
+        return None
+    if parser.error_log.filter_from_fatals():
+        # libxml2 gave up part way (nesting past its depth limit) and dropped
+        # the rest of the page.
+        return None
+    return root
+
+
+def _lxml_strings(element: etree._Element) -> Iterator[str]:
+    # Document order as in BeautifulSoup: an element's text, then each
+    # child's strings followed by the child's tail. Comments only keep their
+    # tail. Iterative, because broken pages nest deeper than the recursion
+    # limit.
+    stack: list[tuple[etree._Element, bool]] = [(element, False)]
+    while stack:
+        node, tail_only = stack.pop()
+        if tail_only:
+            if node.tail:
+                yield node.tail
+            continue
+        if not isinstance(node.tag, str) or node.tag in _NO_TEXT_TAGS:
+            continue
+        if node.text:
+            yield node.text
+        for child in reversed(node):
+            stack.append((child, True))
+            stack.append((child, False))
+
+
+def _lxml_text(element: etree._Element) -> str:
+    parts = (part.replace(_CR, "\r").strip() for part in _lxml_strings(element))
+    return " ".join(text for text in parts if text)
+
+
+def _lxml_published_at(root: etree._Element) -> str:
+    found: dict[int, str] = {}
+    for tag in root.iter("meta"):
+        for index, (attr, value) in enumerate(_PUBLISHED_META):
+            if index not in found and tag.get(attr) == value:
+                found[index] = tag.get("content") or ""
+    published_at = _first_published_at(found)
+    if published_at:
+        return published_at
+
+    time_tag = next(root.iter("time"), None)
+    if time_tag is not None:
+        datetime_attr = (time_tag.get("datetime") or "").strip()
+        if datetime_attr:
+            return datetime_attr
+        return _lxml_text(time_tag)
+    return ""
+
+
+def _lxml_article(html: str) -> tuple[str, str]:
+    root = _lxml_root(html)
+    if root is None:
+        return _bs4_article(html)
+    published_at = _lxml_published_at(root)
+    paragraphs = [_lxml_text(p) for p in root.iter("p")]
+    return "\n".join(paragraphs).strip(), published_at
+
+
+def _lxml_first(element: etree._Element, xpath: str) -> etree._Element | None:
+    matches = element.xpath(xpath)
+    return matches[0] if matches else None
+
+
+def _lxml_bing_items(html: str) -> list[BingItem]:
+    root = _lxml_root(html)
+    if root is None:
+        return _bs4_bing_items(html)
+    items: list[BingItem] = []
+    for item in root.xpath(f"//li[{_CLASS_XPATH.format('b_algo')}]"):
+        link = _lxml_first(item, ".//a[ancestor::h2]")
+        if link is None:
+            continue
+        snippet_el = _lxml_first(item, f".//p[ancestor::div[{_CLASS_XPATH.format('b_caption')}]]")
+        if snippet_el is None:
+            snippet_el = _lxml_first(item, ".//p")
+        date_el = _lxml_first(item, f".//span[{_CLASS_XPATH.format('news_dt')}]")
+        if date_el is None:
+            date_el = _lxml_first(item, f".//*[{_CLASS_XPATH.format('news_dt')}]")
+        items.append(
+            BingItem(
+                title=_lxml_text(link),
+                url=(link.get("href") or "").strip(),
+                snippet=_lxml_text(snippet_el) if snippet_el is not None else "",
+                published_at=_lxml_text(date_el) if date_el is not None else "",
+            )
+        )
+    return items
+
+
+def parse_article(html: str, parser: str | None = None) -> tuple[str, str]:
+    # (<p> text joined by newlines, publish date) for the fallback extractor.
+    if (parser or _parser) == LXML:
+        return _lxml_article(html)
+    return _bs4_article(html)
+
+
+def parse_bing_items(html: str, parser: str | None = None) -> list[BingItem]:
+    if (parser or _parser) == LXML:
+        return _lxml_bing_items(html)
+    return _bs4_bing_items(html)
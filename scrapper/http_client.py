@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Mapping
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scrapper.cache import CachedResponse, HttpCache, guard_cache
+from scrapper.tracing import trace
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; daily-digest-bot/1.0)"
+
+
+@dataclass(frozen=True)
+class HttpClientConfig:
+    pool_hosts: int = 32
+    pool_per_host: int = 8
+    connect_retries: int = 2
+    backoff_seconds: float = 0.5
+    user_agent: str = DEFAULT_USER_AGENT
+
+
+@dataclass(frozen=True)
+class HttpResponse:
+    url: str
+    status: int
+    content: bytes
+    content_type: str
+    from_cache: bool = False
+
+
+_lock = threading.Lock()
+_config = HttpClientConfig()
+_session: requests.Session | None = None
+_cache: HttpCache | None = None
+
+
+def _build_session(config: HttpClientConfig) -> requests.Session:
+    # Only connection failures are retried; a slow or erroring server is not
+    # worth hammering for a daily digest.
+    retry = Retry(
+        total=None,
+        connect=config.connect_retries,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=config.backoff_seconds,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config.pool_hosts,
+        pool_maxsize=config.pool_per_host,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.headers["User-Agent"] = config.user_agent
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def configure_http_client(config: HttpClientConfig, cache: HttpCache | None = None) -> None:
+    global _config, _session, _cache
+    with _lock:
+        previous = _session
+        _config = config
+        _session = None
+        _cache = cache
+    if previous is not None:
+        previous.close()
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _build_session(_config)
+        return _session
+
+
+def get_cache() -> HttpCache | None:
+    return _cache
+
+
+def close_http_client() -> None:
+    global _session, _cache
+    with _lock:
+        previous = _session
+        _session = None
+        _cache = None
+    if previous is not None:
+        previous.close()
+
+
+def is_fresh(entry: CachedResponse, ttl_seconds: int | None) -> bool:
+    return ttl_seconds is not None and time.time() - entry.fetched_at < ttl_seconds
+
+
+def _with_params(url: str, params: Mapping[str, object] | None) -> str:
+    return requests.Request("GET", url, params=params).prepare().url or url
+
+
+def _lookup(
+    request_url: str,
+    cache_ttl_seconds: int | None,
+) -> tuple[HttpCache | None, CachedResponse | None]:
+    cache = _cache if cache_ttl_seconds is not None else None
+    if cache is None:
+        return None, None
+    return cache, guard_cache(request_url, lambda: cache.get(request_url))
+
+
+def _from_cache(request_url: str, cached: CachedResponse) -> HttpResponse:
+    return HttpResponse(
+        url=request_url,
+        status=cached.status,
+        content=cached.content,
+        content_type=cached.content_type,
+        from_cache=True,
+    )
+
+
+def _conditional_headers(
+    headers: Mapping[str, str] | None,
+    cached: CachedResponse | None,
+) -> dict[str, str]:
+    request_headers = dict(headers or {})
+    if cached is not None:
+        if cached.etag:
+            request_headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            request_headers["If-Modified-Since"] = cached.last_modified
+    return request_headers
+
+
+def _store(
+    cache: HttpCache | None,
+    request_url: str,
+    status: int,
+    response_headers: Mapping[str, str],
+    content: bytes,
+) -> None:
+    if cache is None or status != 200:
+        return
+    entry = CachedResponse(
+        url=request_url,
+        status=status,
+        content_type=response_headers.get("Content-Type", ""),
+        etag=response_headers.get("ETag", ""),
+        last_modified=response_headers.get("Last-Modified", ""),
+        content=content,
+        fetched_at=time.time(),
+    )
+    guard_cache(request_url, lambda: cache.put(entry))
+
+
+def fetch(
+    url: str,
+    *,
+    timeout: float,
+    params: Mapping[str, object] | None = None,
+    headers: Mapping[str, str] | None = None,
+    cache_ttl_seconds: int | None = None,
+    stage: str = "http",
+) -> HttpResponse:
+    # Freshness is decided by our own TTLs. Search engines and news sites
+    # often send no-cache headers for pages that barely change day to day.
+    request_url = _with_params(url, params)
+    with trace(stage, request_url) as span:
+        cache, cached = _lookup(request_url, cache_ttl_seconds)
+        if cached is not None and is_fresh(cached, cache_ttl_seconds):
+            span.cache_hit = True
+            return _from_cache(request_url, cached)
+
+        response = get_session().get(
+            request_url,
+            headers=_conditional_headers(headers, cached),
+            timeout=timeout,
+        )
+        span.retries = _retry_count(response)
+        if cached is not None and response.status_code == 304:
+            span.cache_hit = True
+            guard_cache(request_url, lambda: cache.mark_revalidated(request_url))
+            return _from_cache(request_url, cached)
+        response.raise_for_status()
+
+        span.bytes = len(response.content)
+        _store(cache, request_url, response.status_code, response.headers, response.content)
+        return HttpResponse(
+            url=response.url or request_url,
+            status=response.status_code,
+            content=response.content,
+            content_type=response.headers.get("Content-Type", ""),
+        )
+
+
+def _retry_count(response: requests.Response) -> int:
+    # urllib3 keeps the retry history on the raw response.
+    retries = getattr(response.raw, "retries", None)
+    return len(getattr(retries, "history", None) or ())
+
+
+def open_async_client() -> httpx.AsyncClient:
+    # Same pool sizing, connect-only retries and User-Agent as the sync session.
+    config = _config
+    transport = httpx.AsyncHTTPTransport(
+        retries=config.connect_retries,
+        limits=httpx.Limits(
+            max_connections=config.pool_hosts * config.pool_per_host,
+            max_keepalive_connections=config.pool_hosts,
+        ),
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        headers={"User-Agent": config.user_agent},
+        follow_redirects=True,
+    )
+
+
+async def fetch_async(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    timeout: float,
+    params: Mapping[str, object] | None = None,
+    headers: Mapping[str, str] | None = None,
+    cache_ttl_seconds: int | None = None,
+    stage: str = "http",
+) -> HttpResponse:
+    request_url = _with_params(url, params)
+    with trace(stage, request_url) as span:
+        cache, cached = _lookup(request_url, cache_ttl_seconds)
+        if cached is not None and is_fresh(cached, cache_ttl_seconds):
+            span.cache_hit = True
+            return _from_cache(request_url, cached)
+
+        response = await client.get(
+            request_url,
+            headers=_conditional_headers(headers, cached),
+            timeout=timeout,
+        )
+        if cached is not None and response.status_code == 304:
+            span.cache_hit = True
+            guard_cache(request_url, lambda: cache.mark_revalidated(request_url))
+            return _from_cache(request_url, cached)
+        response.raise_for_status()
+
+        span.bytes = len(response.content)
+        _store(cache, request_url, response.status_code, response.headers, response.content)
+        return HttpResponse(
+            url=str(response.url) or request_url,
+            status=response.status_code,
+            content=response.content,
+            content_type=response.headers.get("Content-Type", ""),
+        )
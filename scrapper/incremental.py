@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+from scrapper.models import SearchResult
+
+
+def scorer_key(keyword: str, related_keywords: tuple[str, ...]) -> str:
+    # Scores are only comparable while the profile scores the same terms.
+    return "|".join((keyword, *related_keywords))
+
+
+class CrawlMemory:
+    # What earlier runs saw: the search date each query returned for each
+    # URL, and the final score each profile gave the page. A result that
+    # comes back unchanged (same query, URL and search date) and already
+    # scored below FINAL_SCORE_THRESHOLD is not fetched again until it ages
+    # out after INCREMENTAL_MAX_AGE_DAYS. Lookups use the state loaded at
+    # start; what this run sees is written by save().
+    def __init__(self, db_path: Path, max_age_days: int) -> None:
+        self._db_path = db_path
+        self._max_age_seconds = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._seen: dict[tuple[str, str], str] = {}
+        self._scores: dict[tuple[str, str], tuple[str, int]] = {}
+        self._new_seen: dict[tuple[str, str], str] = {}
+        self._new_scores: dict[tuple[str, str], tuple[str, int]] = {}
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS crawl_results (
+                    query TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    published_at TEXT NOT NULL,
+                    seen_at INTEGER NOT NULL,
+                    PRIMARY KEY (query, url)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS crawl_scores (
+                    profile TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    scorer_key TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    judged_at INTEGER NOT NULL,
+                    PRIMARY KEY (profile, url)
+                )
+                """
+            )
+            conn.commit()
+            cutoff = int(time.time()) - self._max_age_seconds
+            for query, url, published_at in conn.execute(
+                "SELECT query, url, published_at FROM crawl_results WHERE seen_at >= ?",
+                (cutoff,),
+            ):
+                self._seen[(str(query), str(url))] = str(published_at)
+            for profile, url, key, score in conn.execute(
+                "SELECT profile, url, scorer_key, score FROM crawl_scores WHERE judged_at >= ?",
+                (cutoff,),
+            ):
+                self._scores[(str(profile), str(url))] = (str(key), int(score))
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=30)
+
+    def unchanged_score(
+        self,
+        profile: str,
+        key: str,
+        canonical_url: str,
+        result: SearchResult,
+    ) -> int | None:
+        # Stored score when neither the search result nor the scoring changed.
+        with self._lock:
+            self._new_seen[(result.query, canonical_url)] = result.published_at
+            if self._seen.get((result.query, canonical_url)) != result.published_at:
+                return None
+            stored = self._scores.get((profile, canonical_url))
+        if stored is None or stored[0] != key:
+            return None
+        return stored[1]
+
+    def record_score(self, profile: str, key: str, canonical_url: str, score: int) -> None:
+        with self._lock:
+            self._new_scores[(profile, canonical_url)] = (key, score)
+
+    def save(self) -> None:
+        with self._lock:
+            seen, self._new_seen = self._new_seen, {}
+            scores, self._new_scores = self._new_scores, {}
+        now = int(time.time())
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO crawl_results(query, url, published_at, seen_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                [(query, url, published_at, now) for (query, url), published_at in seen.items()],
+            )
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO crawl_scores(profile, url, scorer_key, score, judged_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [(profile, url, key, score, now) for (profile, url), (key, score) in scores.items()],
+            )
+            cutoff = now - self._max_age_seconds
+            conn.execute("DELETE FROM crawl_results WHERE seen_at < ?", (cutoff,))
+            conn.execute("DELETE FROM crawl_scores WHERE judged_at < ?", (cutoff,))
+            conn.commit()
@@ -12,6 +12,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Run crawl and summary without sending email or writing sent-history",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue today's interrupted run from its checkpoint instead of starting over",
+    )
     return parser.parse_args()
 
 
@@ -34,33 +39,41 @@ def main() -> int:
     logging.getLogger("htmldate").setLevel(logging.CRITICAL)
 
     from scrapper.config import load_settings
-    from scrapper.pipeline import run_daily_pipeline
+    from scrapper.host_health import format_host_decisions
+    from scrapper.pipeline import run_profiles
+    from scrapper.tracing import format_stage_timings
 
     args = parse_args()
 
     try:
         settings = load_settings()
-        report = run_daily_pipeline(settings, dry_run=args.dry_run)
+        reports = run_profiles(settings, dry_run=args.dry_run, resume=args.resume)
     except Exception as exc:
         logging.exception("Pipeline failed: %s", exc)
         return 1
 
-    logging.info(
-        (
-            "Run completed | dry_run=%s searched=%s selected=%s summarized=%s "
-            "summary_success=%s summary_failed=%s summary_success_rate=%.2f "
-            "summary_failed_reasons=%s sent_email=%s"
-        ),
-        report.dry_run,
-        report.searched_count,
-        report.selected_count,
-        report.summarized_count,
-        report.summary_success_count,
-        report.summary_failed_count,
-        report.summary_success_rate,
-        dict(report.summary_failed_reason_counts),
-        report.sent_email,
-    )
+    for report in reports:
+        logging.info(
+            (
+                "Run completed | dry_run=%s searched=%s selected=%s summarized=%s "
+                "summary_success=%s summary_failed=%s summary_success_rate=%.2f "
+                "summary_failed_reasons=%s sent_email=%s summary_cache_hits=%s profile=%s "
+                "stage_p50_p95=%s hosts=%s"
+            ),
+            report.dry_run,
+            report.searched_count,
+            report.selected_count,
+            report.summarized_count,
+            report.summary_success_count,
+            report.summary_failed_count,
+            report.summary_success_rate,
+            dict(report.summary_failed_reason_counts),
+            report.sent_email,
+            report.summary_cache_hit_count,
+            report.profile,
+            format_stage_timings(report.stage_timings),
+            format_host_decisions(report.host_decisions),
+        )
     return 0
 
 
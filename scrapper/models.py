@@ -19,6 +19,8 @@ class ExtractedContent:
     text: str
     method: str
     published_at: str = ""
+    # (step, seconds) for the fetch and every extractor that ran.
+    timings: tuple[tuple[str, float], ...] = ()
 
 
 @dataclass(frozen=True)
@@ -29,6 +31,7 @@ class ScoredArticle:
     extraction_method: str
     score: int
     published_at: str = ""
+    content_fingerprint: int = 0
 
 
 @dataclass(frozen=True)
@@ -38,6 +41,7 @@ class SummarizedArticle:
     score: int
     summary: str
     published_at: str = ""
+    content_fingerprint: int = 0
 
 
 @dataclass(frozen=True)
@@ -45,6 +49,30 @@ class SummaryResult:
     text: str
     success: bool
     reason: str
+    cached: bool = False
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    stage: str
+    count: int
+    total_seconds: float
+    p50_seconds: float
+    p95_seconds: float
+    bytes: int
+    retries: int
+    cache_hits: int
+    failures: int
+
+
+@dataclass(frozen=True)
+class HostDecision:
+    host: str
+    timeout_seconds: float
+    p95_seconds: float
+    circuit: str
+    skipped: int
+    failures: int
 
 
 @dataclass(frozen=True)
@@ -61,4 +89,8 @@ class RunReport:
     summary_failed_reason_counts: tuple[tuple[str, int], ...]
     sent_email: bool
     dry_run: bool
+    profile: str = ""
+    summary_cache_hit_count: int = 0
+    stage_timings: tuple[StageTiming, ...] = ()
+    host_decisions: tuple[HostDecision, ...] = ()
 
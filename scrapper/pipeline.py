@@ -1,72 +1,343 @@
 from __future__ import annotations
 
+import asyncio
+from dataclasses import replace
 from datetime import datetime
+import heapq
+import itertools
 import logging
-from collections import Counter
+import queue
+import sqlite3
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import closing
+from typing import Callable, Generic, TypeVar, cast
 from zoneinfo import ZoneInfo
 
 from openai import OpenAI
 
-from scrapper.config import Settings
+from scrapper.cache import ExtractionCache, HttpCache, SummaryCache
+from scrapper.checkpoint import RunCheckpoint, run_key
+from scrapper.concurrency import HostLimiter
+from scrapper.config import Settings, base_profile, profile_settings
+from scrapper.corpus import ArticleCorpus, open_corpus
 from scrapper.emailer import send_digest_email
-from scrapper.models import RunReport, ScoredArticle, SearchResult, SummarizedArticle
-from scrapper.ranking import canonicalize_url, is_similar_title, score_relevance
-from scrapper.search import build_queries, search_web
-from scrapper.storage import init_db, load_recent_sent, save_sent_articles
-from scrapper.summarizer import summarize_article
-from scrapper.text_extract import extract_article_text
+from scrapper.fingerprint import SimHashIndex, simhash
+from scrapper.host_health import HostHealth
+from scrapper.html_parse import set_html_parser
+from scrapper.http_client import (
+    HttpClientConfig,
+    close_http_client,
+    configure_http_client,
+    get_cache,
+)
+from scrapper.incremental import CrawlMemory, scorer_key
+from scrapper.models import (
+    ExtractedContent,
+    HostDecision,
+    RunReport,
+    ScoredArticle,
+    SearchResult,
+    SummarizedArticle,
+    SummaryResult,
+)
+from scrapper.ranking import TitleIndex, canonicalize_url, get_scorer
+from scrapper.search import build_queries, iter_search_web
+from scrapper.storage import Storage
+from scrapper.summarizer import SummaryThrottle, summarize_article, summarize_batch
+from scrapper.text_extract import (
+    close_extraction_pool,
+    configure_extraction_pool,
+    extract_article_text,
+    extraction_cache_version,
+    resolve_extractor_chain,
+)
+from scrapper.tracing import Tracer, set_tracer, trace
 
 logger = logging.getLogger(__name__)
 
+FetchResult = tuple[ExtractedContent, int]
+F = TypeVar("F", "Future[FetchResult]", "asyncio.Task[FetchResult]")
 
-def _collect_candidates(settings: Settings) -> tuple[int, int, list[ScoredArticle]]:
-    queries = build_queries(settings.keyword, settings.related_keywords)
-    raw_results = search_web(queries, settings.search_results_per_query)
 
-    by_url: dict[str, SearchResult] = {}
-    for result in raw_results:
-        url = canonicalize_url(result.url)
-        if url and url not in by_url:
-            by_url[url] = result
+def open_storage(settings: Settings, dry_run: bool) -> Storage:
+    storage = Storage(settings.db_path)
+    # Dry runs leave sent history alone, pruning included.
+    if not dry_run:
+        storage.prune(settings.sent_retention_days, settings.sent_archive_enabled)
+    return storage
 
-    pre_ranked: list[tuple[int, str, SearchResult]] = []
-    for canonical_url, result in by_url.items():
-        score = score_relevance(
-            settings.keyword,
-            settings.related_keywords,
-            result.title,
-            result.snippet,
-            "",
+
+def open_article_corpus(settings: Settings) -> ArticleCorpus | None:
+    return open_corpus(settings.db_path) if settings.corpus_enabled else None
+
+
+def close_article_corpus(corpus: ArticleCorpus | None) -> None:
+    if corpus is None:
+        return
+    try:
+        corpus.close()
+    except sqlite3.Error as exc:
+        logger.warning("Article corpus save failed | error=%s", exc)
+
+
+def open_checkpoint(
+    settings: Settings,
+    run_at: datetime,
+    resume: bool,
+    dry_run: bool,
+    profiles: list[Settings],
+) -> RunCheckpoint | None:
+    if not settings.checkpoint_enabled:
+        if resume:
+            logger.warning("Checkpoints are disabled | resume starts a fresh run")
+        return None
+    try:
+        checkpoint = RunCheckpoint(
+            settings.db_path, run_key(run_at.strftime("%Y-%m-%d"), dry_run)
         )
-        if score >= settings.pre_score_threshold:
-            pre_ranked.append((score, canonical_url, result))
+    except sqlite3.Error as exc:
+        logger.warning("Checkpoint unavailable | error=%s", exc)
+        return None
+    if resume:
+        # Without an unfinished run, today's checkpoint is kept so a finished
+        # digest is still not sent twice.
+        unfinished = checkpoint.latest_unfinished([profile.profile for profile in profiles])
+        if unfinished is not None and unfinished != checkpoint.run_date:
+            checkpoint = RunCheckpoint(settings.db_path, unfinished)
+        logger.info("Resuming run | run_date=%s", checkpoint.run_date)
+        checkpoint.prune()
+    else:
+        checkpoint.reset()
+    return checkpoint
 
-    pre_ranked.sort(key=lambda item: item[0], reverse=True)
-    fetch_limit = max(settings.max_items * 5, settings.max_items + 10)
-    pre_ranked = pre_ranked[:fetch_limit]
 
-    sent_urls, sent_titles = load_recent_sent(settings.db_path, settings.dedupe_days)
-    selected_titles: list[str] = list(sent_titles)
-    selected: list[ScoredArticle] = []
+def restore_selection(
+    checkpoint: RunCheckpoint | None,
+    profiles: list[Settings],
+) -> list[tuple[int, int, list[ScoredArticle]]] | None:
+    # Collection is shared by every profile, so it is skipped only when all of
+    # them finished it before.
+    if checkpoint is None:
+        return None
+    restored = [checkpoint.selection(profile.profile) for profile in profiles]
+    if any(selection is None for selection in restored):
+        return None
+    logger.info("Candidate selection restored from checkpoint | run_date=%s", checkpoint.run_date)
+    return cast(list[tuple[int, int, list[ScoredArticle]]], restored)
 
-    for _, canonical_url, result in pre_ranked:
-        if canonical_url in sent_urls:
-            continue
-        if is_similar_title(result.title, selected_titles):
-            continue
 
-        extracted = extract_article_text(result.url, settings.fetch_timeout_seconds)
-        final_score = score_relevance(
-            settings.keyword,
-            settings.related_keywords,
-            result.title,
-            result.snippet,
-            extracted.text,
+def save_selection(
+    checkpoint: RunCheckpoint | None,
+    profiles: list[Settings],
+    collected: list[tuple[int, int, list[ScoredArticle]]],
+) -> None:
+    if checkpoint is None:
+        return
+    for profile, (searched_count, candidates_count, selected) in zip(profiles, collected):
+        checkpoint.save_selection(profile.profile, searched_count, candidates_count, selected)
+
+
+def save_fetch(
+    checkpoint: RunCheckpoint | None,
+    canonical_url: str,
+    extracted: ExtractedContent,
+    fingerprint: int,
+) -> None:
+    # Failures are left out so a resumed run tries those pages again.
+    if checkpoint is None or extracted.method in ("failed", "circuit_open"):
+        return
+    checkpoint.save_fetch(canonical_url, extracted, fingerprint)
+
+
+def open_host_health(settings: Settings) -> HostHealth | None:
+    if not settings.host_health_enabled:
+        return None
+    try:
+        return HostHealth(
+            settings.db_path,
+            default_timeout=settings.fetch_timeout_seconds,
+            min_timeout=settings.adaptive_timeout_min_seconds,
+            p95_multiplier=settings.adaptive_timeout_p95_multiplier,
+            min_samples=settings.adaptive_timeout_min_samples,
+            failure_threshold=settings.circuit_breaker_failures,
+            cooldown_seconds=settings.circuit_breaker_cooldown_minutes * 60,
+            history_days=settings.host_history_days,
         )
-        if final_score < settings.final_score_threshold:
-            continue
+    except sqlite3.Error as exc:
+        logger.warning("Host history unavailable | error=%s", exc)
+        return None
+
+
+def save_host_health(host_health: HostHealth | None) -> None:
+    if host_health is None:
+        return
+    try:
+        host_health.save()
+    except sqlite3.Error as exc:
+        logger.warning("Host history save failed | error=%s", exc)
+
+
+def open_crawl_memory(settings: Settings) -> CrawlMemory | None:
+    if not settings.incremental_crawl:
+        return None
+    try:
+        return CrawlMemory(settings.db_path, settings.incremental_max_age_days)
+    except sqlite3.Error as exc:
+        logger.warning("Crawl memory unavailable | error=%s", exc)
+        return None
+
+
+def save_crawl_memory(memory: CrawlMemory | None) -> None:
+    if memory is None:
+        return
+    try:
+        memory.save()
+    except sqlite3.Error as exc:
+        logger.warning("Crawl memory save failed | error=%s", exc)
+
+
+def open_extraction_cache(
+    settings: Settings,
+    extractor_chain: tuple[str, ...],
+) -> ExtractionCache | None:
+    if not settings.extract_cache_enabled:
+        return None
+    cache = ExtractionCache(
+        settings.http_cache_path,
+        version=extraction_cache_version(extractor_chain, settings.extract_cache_version),
+    )
+    try:
+        cache.prune(settings.http_cache_max_age_days * 86400)
+    except sqlite3.Error as exc:
+        logger.warning("Extraction cache prune failed | error=%s", exc)
+    return cache
+
+
+_SEARCH_DONE = object()
+
+
+class CandidateSelector:
+    # Engine-independent half of candidate collection. Search rows go in
+    # through admit(), the best prescored candidate comes out of next_fetch(),
+    # and fetched pages are judged by consider() in fetch-submission order so
+    # earlier (higher pre-score) candidates win dedupe ties.
+    def __init__(
+        self,
+        settings: Settings,
+        storage: Storage,
+        sent_titles: list[str],
+        sent_fingerprints: list[int],
+        host_health: HostHealth | None = None,
+        corpus: ArticleCorpus | None = None,
+        memory: CrawlMemory | None = None,
+    ) -> None:
+        self.settings = settings
+        self._storage = storage
+        self._host_health = host_health
+        self._corpus = corpus
+        self._memory = memory
+        self._scorer_key = scorer_key(settings.keyword, settings.related_keywords)
+        self._scorer = get_scorer(settings.keyword, settings.related_keywords)
+        self._seen_urls: set[str] = set()
+        self._pending: list[tuple[bool, int, int, str, SearchResult]] = []
+        # Ties on score keep search order, as the stable sort it replaced did.
+        self._admission_order = itertools.count()
+        self._fetch_limit = max(settings.max_items * 5, settings.max_items + 10)
+        self.titles = TitleIndex(sent_titles)
+        self.content_index: SimHashIndex | None = None
+        if settings.content_dedupe_enabled:
+            self.content_index = SimHashIndex(
+                sent_fingerprints,
+                max_distance=settings.content_dedupe_max_distance,
+            )
+        self.selected: list[ScoredArticle] = []
+        self.searched_count = 0
+        self.candidates_count = 0
+        self.submitted_count = 0
+        self.judged_count = 0
+        self.unchanged_count = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.selected) >= self.settings.max_items
+
+    @property
+    def fetch_budget_spent(self) -> bool:
+        return self.submitted_count >= self._fetch_limit
 
-        selected.append(
+    def admit(self, rows: list[SearchResult]) -> None:
+        self.searched_count += len(rows)
+        fresh: list[tuple[str, SearchResult]] = []
+        for result in rows:
+            url = canonicalize_url(result.url)
+            if url and url not in self._seen_urls:
+                self._seen_urls.add(url)
+                fresh.append((url, result))
+        scores = self._scorer.score_many((result.title, result.snippet) for _, result in fresh)
+        passed = [
+            (score, canonical_url, result)
+            for score, (canonical_url, result) in zip(scores, fresh)
+            if score >= self.settings.pre_score_threshold
+        ]
+        self.candidates_count += len(passed)
+        sent_urls = self._storage.sent_urls(
+            (canonical_url for _, canonical_url, _ in passed),
+            self.settings.dedupe_days,
+            self.settings.profile,
+        )
+        for score, canonical_url, result in passed:
+            # Titles only ever get added, so anything similar to sent history
+            # now is skipped without fetching.
+            if canonical_url in sent_urls or self.titles.is_similar(result.title):
+                continue
+            if self._memory is not None:
+                # Unchanged since an earlier run that already judged it too weak.
+                stored = self._memory.unchanged_score(
+                    self.settings.profile, self._scorer_key, canonical_url, result
+                )
+                if stored is not None and stored < self.settings.final_score_threshold:
+                    self.unchanged_count += 1
+                    continue
+            # Hosts behind an open circuit go last, after every healthy one.
+            blocked = self._host_health is not None and self._host_health.is_open(result.url)
+            heapq.heappush(
+                self._pending,
+                (blocked, -score, next(self._admission_order), canonical_url, result),
+            )
+
+    def next_fetch(self) -> tuple[str, SearchResult] | None:
+        if not self._pending or self.fetch_budget_spent:
+            return None
+        _, _, _, canonical_url, result = heapq.heappop(self._pending)
+        self.submitted_count += 1
+        return canonical_url, result
+
+    def consider(
+        self,
+        canonical_url: str,
+        result: SearchResult,
+        extracted: ExtractedContent,
+        fingerprint: int,
+    ) -> None:
+        self.judged_count += 1
+        if self.titles.is_similar(result.title):
+            return
+        final_score = self._scorer.score(result.title, result.snippet, extracted.text)
+        if self._corpus is not None:
+            self._corpus.add(canonical_url, result, extracted, final_score)
+        if self._memory is not None and extracted.method not in ("failed", "circuit_open"):
+            self._memory.record_score(
+                self.settings.profile, self._scorer_key, canonical_url, final_score
+            )
+        if final_score < self.settings.final_score_threshold:
+            return
+        if self.content_index is not None and self.content_index.find(fingerprint) is not None:
+            logger.info("Content duplicate skipped | url=%s", canonical_url)
+            return
+
+        self.selected.append(
             ScoredArticle(
                 search_result=result,
                 canonical_url=canonical_url,
@@ -74,52 +345,554 @@ def _collect_candidates(settings: Settings) -> tuple[int, int, list[ScoredArticl
                 extraction_method=extracted.method,
                 score=final_score,
                 published_at=extracted.published_at or result.published_at,
+                content_fingerprint=fingerprint,
+            )
+        )
+        self.titles.add(result.title)
+        if self.content_index is not None:
+            self.content_index.add(fingerprint)
+
+    def finish(self) -> tuple[int, int, list[ScoredArticle]]:
+        logger.info(
+            (
+                "Candidate stream finished | searched=%s candidates=%s unchanged=%s "
+                "fetched=%s selected=%s"
+            ),
+            self.searched_count,
+            self.candidates_count,
+            self.unchanged_count,
+            self.judged_count,
+            len(self.selected),
+        )
+        selected = sorted(self.selected, key=lambda article: article.score, reverse=True)
+        return self.searched_count, self.candidates_count, selected[: self.settings.max_items]
+
+
+def open_candidate_selector(
+    settings: Settings,
+    storage: Storage,
+    host_health: HostHealth | None = None,
+    corpus: ArticleCorpus | None = None,
+    memory: CrawlMemory | None = None,
+) -> CandidateSelector:
+    sent_titles = storage.recent_titles(settings.dedupe_days, settings.profile)
+    sent_fingerprints: list[int] = []
+    if settings.content_dedupe_enabled:
+        sent_fingerprints = storage.recent_fingerprints(settings.dedupe_days, settings.profile)
+    return CandidateSelector(
+        settings,
+        storage,
+        sent_titles,
+        sent_fingerprints,
+        host_health,
+        corpus,
+        memory,
+    )
+
+
+def content_fingerprint(settings: Settings, text: str) -> int:
+    return simhash(text) if settings.content_dedupe_enabled else 0
+
+
+def crawl_queries(profiles: list[Settings]) -> list[str]:
+    # Union of every profile's queries, first occurrence wins the position.
+    queries: dict[str, None] = {}
+    for profile in profiles:
+        for query in build_queries(profile.keyword, profile.related_keywords):
+            queries.setdefault(query, None)
+    return list(queries)
+
+
+class SharedCrawl(Generic[F]):
+    # Fans one search stream out to every profile's selector and fetches each
+    # canonical URL at most once. Results are judged in submission order, so
+    # each profile still sees its own candidates in its own prescore order.
+    def __init__(
+        self,
+        selectors: list[CandidateSelector],
+        window: int,
+        submit: Callable[[SearchResult], F],
+    ) -> None:
+        self.selectors = selectors
+        self._window = window
+        self._submit = submit
+        self._fetches: dict[str, F] = {}
+        self._inflight: deque[tuple[CandidateSelector, str, SearchResult, F]] = deque()
+
+    @property
+    def finished(self) -> bool:
+        return all(selector.full for selector in self.selectors)
+
+    @property
+    def idle(self) -> bool:
+        return not self._inflight
+
+    @property
+    def starved(self) -> bool:
+        # No profile may fetch anything more, whatever search still returns.
+        return all(selector.full or selector.fetch_budget_spent for selector in self.selectors)
+
+    @property
+    def head(self) -> F:
+        return self._inflight[0][3]
+
+    def admit(self, rows: list[SearchResult]) -> None:
+        for selector in self.selectors:
+            selector.admit(rows)
+
+    def schedule(self) -> None:
+        # Round-robin across profiles so one broad profile cannot take the
+        # whole window.
+        while len(self._inflight) < self._window:
+            scheduled = False
+            for selector in self.selectors:
+                if selector.full:
+                    continue
+                candidate = selector.next_fetch()
+                if candidate is None:
+                    continue
+                canonical_url, result = candidate
+                future = self._fetches.get(canonical_url)
+                if future is None:
+                    future = self._submit(result)
+                    self._fetches[canonical_url] = future
+                self._inflight.append((selector, canonical_url, result, future))
+                scheduled = True
+            if not scheduled:
+                break
+
+    def commit_ready(self) -> None:
+        while self._inflight and self._inflight[0][3].done():
+            selector, canonical_url, result, future = self._inflight.popleft()
+            if selector.full:
+                continue
+            extracted, fingerprint = future.result()
+            selector.consider(canonical_url, result, extracted, fingerprint)
+
+    def cancel(self) -> list[F]:
+        pending = [entry[3] for entry in self._inflight]
+        for future in pending:
+            future.cancel()
+        self._inflight.clear()
+        return pending
+
+
+def _start_search_stream(
+    settings: Settings,
+    queries: list[str],
+    stop: threading.Event,
+    checkpoint: RunCheckpoint | None = None,
+) -> queue.Queue[object]:
+    # Search runs on its own thread and hands over one query's rows at a time
+    # through a bounded queue; _SEARCH_DONE marks the end of the stream.
+    batches: queue.Queue[object] = queue.Queue(maxsize=max(2, settings.search_workers))
+
+    def _offer(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        replayed = checkpoint.search_batches() if checkpoint is not None else {}
+        stream = iter_search_web(
+            [query for query in queries if query not in replayed],
+            settings.search_results_per_query,
+            workers=settings.search_workers,
+            deadline_seconds=settings.search_deadline_seconds,
+            min_interval_seconds=settings.search_min_interval_ms / 1000,
+            cache_ttl_seconds=settings.http_cache_search_ttl_minutes * 60,
+            providers=settings.search_providers,
+            bing_url=settings.bing_search_url,
+        )
+        try:
+            for query in queries:
+                if query in replayed and not _offer(replayed[query]):
+                    return
+            with closing(stream):
+                for query, rows in stream:
+                    if stop.is_set():
+                        return
+                    if checkpoint is not None and rows:
+                        checkpoint.save_search(query, rows)
+                    if not _offer(rows):
+                        return
+        except Exception as exc:
+            logger.warning("Search stream failed | error=%s", exc)
+        finally:
+            _offer(_SEARCH_DONE)
+
+    threading.Thread(target=_produce, name="search-stream", daemon=True).start()
+    return batches
+
+
+def _collect_candidates(
+    settings: Settings,
+    selectors: list[CandidateSelector],
+    host_health: HostHealth | None = None,
+    checkpoint: RunCheckpoint | None = None,
+) -> None:
+    # search -> canonicalize -> prescore -> fetch -> final score run as one
+    # stream: fetching starts on the best candidates seen so far while later
+    # queries are still running, and everything stops once every profile
+    # has max_items.
+    queries = crawl_queries([selector.settings for selector in selectors])
+    host_limiter = HostLimiter(settings.fetch_per_host_limit)
+    extractor_chain = resolve_extractor_chain(settings.extractor_chain)
+    extraction_cache = open_extraction_cache(settings, extractor_chain)
+
+    def _fetch(url: str) -> tuple[ExtractedContent, int]:
+        canonical_url = canonicalize_url(url)
+        if checkpoint is not None:
+            restored = checkpoint.fetched(canonical_url)
+            if restored is not None:
+                return restored
+        with host_limiter.hold(url):
+            extracted = extract_article_text(
+                url,
+                settings.fetch_timeout_seconds,
+                extractor_chain=extractor_chain,
+                cache_ttl_seconds=settings.http_cache_article_ttl_hours * 3600,
+                extraction_cache=extraction_cache,
+                host_health=host_health,
             )
+        fingerprint = content_fingerprint(settings, extracted.text)
+        save_fetch(checkpoint, canonical_url, extracted, fingerprint)
+        return extracted, fingerprint
+
+    search_done = False
+    stop = threading.Event()
+    batches = _start_search_stream(settings, queries, stop, checkpoint)
+    executor = ThreadPoolExecutor(max_workers=settings.fetch_workers, thread_name_prefix="fetch")
+    crawl = SharedCrawl(
+        selectors,
+        settings.fetch_workers * 2,
+        lambda result: executor.submit(_fetch, result.url),
+    )
+    try:
+        while not crawl.finished:
+            idle = crawl.idle
+            while not search_done:
+                try:
+                    item = batches.get(timeout=0.2) if idle else batches.get_nowait()
+                except queue.Empty:
+                    if idle:
+                        continue
+                    break
+                if item is _SEARCH_DONE:
+                    search_done = True
+                    break
+                crawl.admit(cast(list[SearchResult], item))
+                idle = False
+
+            crawl.schedule()
+            if crawl.idle:
+                if search_done or crawl.starved:
+                    break
+                continue
+
+            wait([crawl.head], timeout=None if search_done else 0.05)
+            crawl.commit_ready()
+    finally:
+        stop.set()
+        crawl.cancel()
+        # Queued fetches are dropped, but running ones still use the HTTP
+        # session, caches and checkpoint that the caller closes next.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def restored_summaries(
+    checkpoint: RunCheckpoint | None,
+    profile: str,
+    selected: list[ScoredArticle],
+) -> list[SummaryResult | None]:
+    restored = checkpoint.summaries(profile) if checkpoint is not None else {}
+    return [restored.get(article.canonical_url) for article in selected]
+
+
+def save_summaries(
+    checkpoint: RunCheckpoint | None,
+    profile: str,
+    selected: list[ScoredArticle],
+    indexes: list[int],
+    summaries: list[SummaryResult | None],
+    results: list[SummaryResult | None],
+) -> None:
+    # Fills results[index] from the batch answers and checkpoints them.
+    for index, result in zip(indexes, summaries):
+        results[index] = result
+        if checkpoint is not None and result is not None:
+            checkpoint.save_summary(profile, selected[index].canonical_url, result)
+
+
+def open_summary_cache(settings: Settings) -> SummaryCache | None:
+    if not settings.summary_cache_enabled:
+        return None
+    cache = SummaryCache(
+        settings.http_cache_path,
+        max_age_seconds=settings.summary_cache_ttl_days * 86400,
+    )
+    try:
+        cache.prune()
+    except sqlite3.Error as exc:
+        logger.warning("Summary cache prune failed | error=%s", exc)
+    return cache
+
+
+def openai_client_kwargs(settings: Settings) -> dict[str, object]:
+    # Retries are handled by SummaryThrottle so the SDK's own retry is disabled.
+    client_kwargs: dict[str, object] = {"api_key": settings.openai_api_key, "max_retries": 0}
+    if settings.openai_base_url:
+        client_kwargs["base_url"] = settings.openai_base_url
+    return client_kwargs
+
+
+def summary_throttle(settings: Settings) -> SummaryThrottle:
+    return SummaryThrottle(
+        requests_per_minute=settings.summary_requests_per_minute,
+        tokens_per_minute=settings.summary_tokens_per_minute,
+        max_retries=settings.summary_max_retries,
+    )
+
+
+def _summarize_selected(
+    settings: Settings,
+    selected: list[ScoredArticle],
+    throttle: SummaryThrottle,
+    checkpoint: RunCheckpoint | None = None,
+) -> list[SummaryResult]:
+    client = OpenAI(**openai_client_kwargs(settings))
+    summary_cache = open_summary_cache(settings)
+
+    def _summarize(article: ScoredArticle) -> SummaryResult:
+        result = summarize_article(
+            client,
+            settings.openai_model,
+            settings.keyword,
+            article,
+            cache=summary_cache,
+            throttle=throttle,
+            related_keywords=settings.related_keywords,
+            excerpt_tokens=settings.summary_excerpt_tokens,
+        )
+        if checkpoint is not None:
+            checkpoint.save_summary(settings.profile, article.canonical_url, result)
+        return result
+
+    results = restored_summaries(checkpoint, settings.profile, selected)
+    pending = [index for index, result in enumerate(results) if result is None]
+    if settings.summary_mode == "batch" and pending:
+        batch_results = summarize_batch(
+            client,
+            settings.openai_model,
+            settings.keyword,
+            [selected[index] for index in pending],
+            cache=summary_cache,
+            deadline_seconds=settings.summary_batch_deadline_minutes * 60,
+            poll_seconds=settings.summary_batch_poll_seconds,
+            related_keywords=settings.related_keywords,
+            excerpt_tokens=settings.summary_excerpt_tokens,
         )
-        selected_titles.append(result.title)
+        save_summaries(checkpoint, settings.profile, selected, pending, batch_results, results)
+
+    # Anything the batch did not answer goes through the per-article path.
+    pending = [index for index, result in enumerate(results) if result is None]
+    if pending:
+        workers = min(settings.summary_workers, len(pending))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary") as executor:
+            # map() yields in submission order, which keeps the ranking order.
+            fallback = executor.map(_summarize, [selected[index] for index in pending])
+            for index, result in zip(pending, fallback):
+                results[index] = result
+    return [result for result in results if result is not None]
+
+
+def configure_http(settings: Settings) -> None:
+    set_html_parser(settings.html_parser)
+    if settings.extraction_executor == "process":
+        configure_extraction_pool(settings.extraction_workers, settings.html_parser)
+    cache = None
+    if settings.http_cache_enabled:
+        cache = HttpCache(
+            settings.http_cache_path,
+            max_age_seconds=settings.http_cache_max_age_days * 86400,
+            max_bytes=settings.http_cache_max_mb * 1024 * 1024,
+        )
+    configure_http_client(
+        HttpClientConfig(
+            pool_hosts=settings.http_pool_hosts,
+            pool_per_host=settings.http_pool_per_host,
+            connect_retries=settings.http_connect_retries,
+            backoff_seconds=settings.http_backoff_ms / 1000,
+        ),
+        cache=cache,
+    )
+
+
+def release_http() -> None:
+    cache = get_cache()
+    if cache is not None:
+        try:
+            evicted = cache.evict()
+            if evicted:
+                logger.info("HTTP cache eviction | removed=%s", evicted)
+        except sqlite3.Error as exc:
+            logger.warning("HTTP cache eviction failed | error=%s", exc)
+    close_http_client()
+    close_extraction_pool()
 
-    selected.sort(key=lambda article: article.score, reverse=True)
-    return len(raw_results), len(pre_ranked), selected[: settings.max_items]
 
+def open_tracer(settings: Settings, run_at: datetime) -> Tracer:
+    path = None
+    if settings.trace_enabled:
+        path = settings.trace_dir / f"trace-{run_at.strftime('%Y%m%d-%H%M%S')}.jsonl"
+    tracer = Tracer(path)
+    set_tracer(tracer)
+    return tracer
+
+
+def close_tracer(tracer: Tracer, reports: list[RunReport]) -> list[RunReport]:
+    # Stage timings cover the whole run, including every profile's summaries
+    # and email, so they are attached once everything has finished.
+    set_tracer(None)
+    tracer.close()
+    stage_timings = tracer.stage_timings()
+    return [replace(report, stage_timings=stage_timings) for report in reports]
+
+
+def run_profiles(
+    settings: Settings,
+    dry_run: bool = False,
+    resume: bool = False,
+) -> list[RunReport]:
+    # One crawl serves every profile: queries are merged and each URL is
+    # fetched and extracted once, then scoring, dedupe history, summaries and
+    # email run per profile.
+    if settings.pipeline_engine == "async":
+        from scrapper.async_pipeline import run_profiles_async
+
+        return asyncio.run(run_profiles_async(settings, dry_run=dry_run, resume=resume))
 
-def run_daily_pipeline(settings: Settings, dry_run: bool = False) -> RunReport:
     run_at = datetime.now(ZoneInfo(settings.timezone))
-    init_db(settings.db_path)
+    storage = open_storage(settings, dry_run)
+    corpus = open_article_corpus(settings)
+    profiles = [profile_settings(settings, profile) for profile in settings.profiles]
+    checkpoint = open_checkpoint(settings, run_at, resume, dry_run, profiles)
 
-    searched_count, candidates_count, selected = _collect_candidates(settings)
+    tracer = open_tracer(settings, run_at)
+    reports: list[RunReport] = []
+    try:
+        host_decisions: tuple[HostDecision, ...] = ()
+        collected = restore_selection(checkpoint, profiles)
+        if collected is None:
+            host_health = open_host_health(settings)
+            memory = open_crawl_memory(settings)
+            selectors = [
+                open_candidate_selector(profile, storage, host_health, corpus, memory)
+                for profile in profiles
+            ]
+            configure_http(settings)
+            try:
+                with trace("run.collect"):
+                    _collect_candidates(settings, selectors, host_health, checkpoint)
+            finally:
+                release_http()
+                save_host_health(host_health)
+                save_crawl_memory(memory)
+            host_decisions = host_health.decisions() if host_health is not None else ()
+            collected = [selector.finish() for selector in selectors]
+            save_selection(checkpoint, profiles, collected)
 
+        throttle = summary_throttle(settings)
+        for profile, (searched_count, candidates_count, selected) in zip(profiles, collected):
+            summary_results: list[SummaryResult] = []
+            if selected:
+                with trace("run.summarize", profile.profile):
+                    summary_results = _summarize_selected(profile, selected, throttle, checkpoint)
+                if corpus is not None:
+                    corpus.save_summaries(selected, summary_results)
+            reports.append(
+                finish_run(
+                    profile,
+                    storage,
+                    run_at,
+                    dry_run,
+                    searched_count,
+                    candidates_count,
+                    selected,
+                    summary_results,
+                    host_decisions,
+                    checkpoint,
+                )
+            )
+    finally:
+        storage.close()
+        close_article_corpus(corpus)
+        reports = close_tracer(tracer, reports)
+    return reports
+
+
+def run_daily_pipeline(
+    settings: Settings,
+    dry_run: bool = False,
+    resume: bool = False,
+) -> RunReport:
+    # Single-profile run for the top-level KEYWORD / recipients only.
+    single = replace(settings, profiles=(base_profile(settings),))
+    return run_profiles(single, dry_run=dry_run, resume=resume)[0]
+
+
+def finish_run(
+    settings: Settings,
+    storage: Storage,
+    run_at: datetime,
+    dry_run: bool,
+    searched_count: int,
+    candidates_count: int,
+    selected: list[ScoredArticle],
+    summary_results: list[SummaryResult],
+    host_decisions: tuple[HostDecision, ...] = (),
+    checkpoint: RunCheckpoint | None = None,
+) -> RunReport:
     summarized: list[SummarizedArticle] = []
     summary_success_count = 0
     summary_failed_count = 0
     summary_failed_urls: list[str] = []
     summary_failed_reason_counter: Counter[str] = Counter()
-    if selected:
-        client_kwargs = {"api_key": settings.openai_api_key}
-        if settings.openai_base_url:
-            client_kwargs["base_url"] = settings.openai_base_url
-        client = OpenAI(**client_kwargs)
-        for article in selected:
-            summary_result = summarize_article(client, settings.openai_model, settings.keyword, article)
-            if summary_result.success:
-                summary_success_count += 1
-            else:
-                summary_failed_count += 1
-                summary_failed_urls.append(article.canonical_url)
-                summary_failed_reason_counter[summary_result.reason] += 1
-            summarized.append(
-                SummarizedArticle(
-                    title=article.search_result.title,
-                    url=article.canonical_url,
-                    score=article.score,
-                    summary=summary_result.text,
-                    published_at=article.published_at,
-                )
+    summary_cache_hit_count = 0
+    for article, summary_result in zip(selected, summary_results):
+        if summary_result.cached:
+            summary_cache_hit_count += 1
+        if summary_result.success:
+            summary_success_count += 1
+        else:
+            summary_failed_count += 1
+            summary_failed_urls.append(article.canonical_url)
+            summary_failed_reason_counter[summary_result.reason] += 1
+        summarized.append(
+            SummarizedArticle(
+                title=article.search_result.title,
+                url=article.canonical_url,
+                score=article.score,
+                summary=summary_result.text,
+                published_at=article.published_at,
+                content_fingerprint=article.content_fingerprint,
             )
+        )
 
     sent_email = False
     if not dry_run:
-        send_digest_email(settings, run_at, summarized)
-        save_sent_articles(settings.db_path, summarized)
+        if checkpoint is not None and checkpoint.sent(settings.profile):
+            # Delivered before the interruption; sending again would duplicate it.
+            logger.info("Digest already sent for this run | profile=%s", settings.profile)
+        else:
+            send_digest_email(settings, run_at, summarized)
+            storage.save_sent_articles(summarized, settings.profile)
+            if checkpoint is not None:
+                checkpoint.mark_sent(settings.profile)
         sent_email = True
 
     summary_success_rate = (
@@ -128,9 +901,10 @@ def run_daily_pipeline(settings: Settings, dry_run: bool = False) -> RunReport:
     if summary_failed_count > 0:
         logger.warning(
             (
-                "Summary quality check | failed=%s success=%s rate=%.2f "
+                "Summary quality check | profile=%s failed=%s success=%s rate=%.2f "
                 "failed_reasons=%s failed_urls=%s"
             ),
+            settings.profile,
             summary_failed_count,
             summary_success_count,
             summary_success_rate,
@@ -151,4 +925,7 @@ def run_daily_pipeline(settings: Settings, dry_run: bool = False) -> RunReport:
         summary_failed_reason_counts=tuple(summary_failed_reason_counter.items()),
         sent_email=sent_email,
         dry_run=dry_run,
+        profile=settings.profile,
+        summary_cache_hit_count=summary_cache_hit_count,
+        host_decisions=host_decisions,
     )
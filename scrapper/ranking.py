@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+from collections import Counter, defaultdict
+from functools import lru_cache
+import math
+import re
+from typing import Iterable
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
 TRACKING_PARAMS = {
     "fbclid",
@@ -28,6 +33,84 @@ def canonicalize_url(raw_url: str) -> str:
         return raw_url.strip()
 
 
+CORE_PHRASE_WEIGHT = 100
+CORE_TOKEN_WEIGHT = 15
+RELATED_KEYWORD_WEIGHT = 8
+HOUSING_TERMS = ("분양", "청약", "공고", "입주자모집")
+HOUSING_TERM_WEIGHT = 6
+
+
+class RelevanceScorer:
+    # Every weighted term is folded into one lookahead regex, longest
+    # alternative first. At each position the regex reports the longest term
+    # starting there, and any other term starting there is a prefix of it,
+    # so a single scan yields exact per-term occurrence counts.
+    def __init__(self, core_keyword: str, related_keywords: tuple[str, ...]) -> None:
+        core = core_keyword.lower().strip()
+        entries: list[tuple[str, int]] = []
+        if core:
+            entries.append((core, CORE_PHRASE_WEIGHT))
+        entries.extend((token, CORE_TOKEN_WEIGHT) for token in core.split() if token)
+        for keyword in related_keywords:
+            lowered = keyword.lower().strip()
+            if lowered:
+                entries.append((lowered, RELATED_KEYWORD_WEIGHT))
+        entries.extend((term, HOUSING_TERM_WEIGHT) for term in HOUSING_TERMS)
+
+        # Repeated keywords score once per occurrence in the settings, as before.
+        self._weights: dict[str, int] = {}
+        for term, weight in entries:
+            self._weights[term] = self._weights.get(term, 0) + weight
+
+        terms = sorted(self._weights, key=len, reverse=True)
+        self._max_length = len(terms[0]) if terms else 0
+        self._prefixes = {
+            term: tuple(other for other in terms if term.startswith(other)) for term in terms
+        }
+        alternation = "|".join(re.escape(term) for term in terms)
+        self._pattern = re.compile(f"(?=({alternation}))") if terms else None
+
+    def _scan(self, text: str, counts: Counter[str], span: tuple[int, int] | None = None) -> None:
+        if self._pattern is None:
+            return
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            for term in self._prefixes[match.group(1)]:
+                # Junction scans only keep terms that cover the joining space.
+                if span is not None and not (start <= span[0] < start + len(term)):
+                    continue
+                counts[term] += 1
+
+    def hit_counts(self, title: str, snippet: str, body: str = "") -> Counter[str]:
+        # Title and snippet are short, so they are joined as before; the body
+        # is scanned on its own plus a small window around the joining space.
+        counts: Counter[str] = Counter()
+        head = f"{title} {snippet}".lower()
+        self._scan(head, counts)
+        lowered_body = body.lower() if body else ""
+        if lowered_body:
+            self._scan(lowered_body, counts)
+        if self._max_length > 1:
+            tail = head[-(self._max_length - 1) :]
+            junction = f"{tail} {lowered_body[: self._max_length - 1]}"
+            self._scan(junction, counts, span=(len(tail), len(tail) + 1))
+        return counts
+
+    def score_hits(self, counts: Counter[str]) -> int:
+        return sum(weight for term, weight in self._weights.items() if counts.get(term))
+
+    def score(self, title: str, snippet: str, body: str = "") -> int:
+        return self.score_hits(self.hit_counts(title, snippet, body))
+
+    def score_many(self, rows: Iterable[tuple[str, str]]) -> list[int]:
+        return [self.score(title, snippet) for title, snippet in rows]
+
+
+@lru_cache(maxsize=32)
+def get_scorer(core_keyword: str, related_keywords: tuple[str, ...]) -> RelevanceScorer:
+    return RelevanceScorer(core_keyword, related_keywords)
+
+
 def score_relevance(
     core_keyword: str,
     related_keywords: tuple[str, ...],
@@ -35,38 +118,64 @@ def score_relevance(
     snippet: str,
     body: str,
 ) -> int:
-    merged = " ".join((title, snippet, body)).lower()
-    score = 0
+    return get_scorer(core_keyword, tuple(related_keywords)).score(title, snippet, body)
 
-    core = core_keyword.lower().strip()
-    if core and core in merged:
-        score += 100
 
-    core_tokens = tuple(token for token in core.split() if token)
-    token_hits = sum(1 for token in core_tokens if token in merged)
-    score += token_hits * 15
+def _normalize_title(title: str) -> str:
+    return title.strip().lower()
 
-    for keyword in related_keywords:
-        lowered = keyword.lower().strip()
-        if lowered and lowered in merged:
-            score += 8
 
-    for term in ("분양", "청약", "공고", "입주자모집"):
-        if term in merged:
-            score += 6
+class TitleIndex:
+    # A title is similar when fuzz.ratio against any indexed title reaches the
+    # threshold. Titles are normalized once and bucketed by length. fuzz.ratio
+    # is 200 * LCS / (len_a + len_b) and LCS <= min(len_a, len_b), so only
+    # buckets within the length bounds below can reach the threshold; those
+    # are scanned in C via extractOne.
+    def __init__(self, titles: Iterable[str] = (), threshold: int = 90) -> None:
+        self._threshold = threshold
+        self._by_length: defaultdict[int, list[str]] = defaultdict(list)
+        self._size = 0
+        for title in titles:
+            self.add(title)
 
-    return score
+    def __len__(self) -> int:
+        return self._size
 
+    def add(self, title: str) -> None:
+        normalized = _normalize_title(title)
+        if normalized:
+            self._by_length[len(normalized)].append(normalized)
+            self._size += 1
 
-def is_similar_title(title: str, existing_titles: list[str], threshold: int = 90) -> bool:
-    source = title.strip().lower()
-    if not source:
-        return False
-    for current in existing_titles:
-        target = current.strip().lower()
-        if not target:
-            continue
-        if fuzz.ratio(source, target) >= threshold:
+    def _length_bounds(self, length: int) -> tuple[int, int]:
+        threshold = self._threshold
+        # One extra character of slack on both sides absorbs float rounding.
+        lower = math.floor(threshold * length / (200 - threshold)) - 1
+        upper = math.ceil(length * (200 - threshold) / threshold) + 1
+        return max(1, lower), upper
+
+    def is_similar(self, title: str) -> bool:
+        source = _normalize_title(title)
+        if not source or not self._size:
+            return False
+        if self._threshold <= 0:
             return True
-    return False
 
+        lower, upper = self._length_bounds(len(source))
+        for length, bucket in self._by_length.items():
+            if length < lower or length > upper:
+                continue
+            match = process.extractOne(
+                source,
+                bucket,
+                scorer=fuzz.ratio,
+                processor=None,
+                score_cutoff=self._threshold,
+            )
+            if match is not None:
+                return True
+        return False
+
+
+def is_similar_title(title: str, existing_titles: list[str], threshold: int = 90) -> bool:
+    return TitleIndex(existing_titles, threshold).is_similar(title)
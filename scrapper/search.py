@@ -1,18 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import asdict
+import json
 import logging
-from typing import Iterable
+import threading
+import time
+from typing import AsyncIterator, Iterable, Iterator
+from urllib.parse import urlencode
 import warnings
 
-import requests
-from bs4 import BeautifulSoup
 from duckduckgo_search import DDGS
+import httpx
 
+from scrapper.cache import CachedResponse, guard_cache
+from scrapper.config import DEFAULT_BING_SEARCH_URL, SEARCH_PROVIDERS
+from scrapper.concurrency import RateLimiter
+from scrapper.html_parse import parse_bing_items
+from scrapper.http_client import fetch, fetch_async, get_cache, is_fresh
 from scrapper.models import SearchResult
+from scrapper.tracing import trace
 
 logger = logging.getLogger(__name__)
 _DDGS_RENAME_WARNING = "This package (`duckduckgo_search`) has been renamed to `ddgs`"
+# warnings.warn is patched process-wide while DDGS is constructed.
+_DDGS_CREATE_LOCK = threading.Lock()
 
 
 def build_queries(core_keyword: str, related_keywords: tuple[str, ...]) -> list[str]:
@@ -27,31 +41,76 @@ def build_queries(core_keyword: str, related_keywords: tuple[str, ...]) -> list[
 
 
 def _create_ddgs() -> DDGS:
-    original_warn = warnings.warn
+    with _DDGS_CREATE_LOCK:
+        original_warn = warnings.warn
 
-    def _filtered_warn(message, *args, **kwargs):  # type: ignore[no-untyped-def]
-        if _DDGS_RENAME_WARNING in str(message):
-            return
-        return original_warn(message, *args, **kwargs)
+        def _filtered_warn(message, *args, **kwargs):  # type: ignore[no-untyped-def]
+            if _DDGS_RENAME_WARNING in str(message):
+                return
+            return original_warn(message, *args, **kwargs)
 
-    warnings.warn = _filtered_warn  # type: ignore[assignment]
-    try:
-        return DDGS()
-    finally:
-        warnings.warn = original_warn  # type: ignore[assignment]
+        warnings.warn = _filtered_warn  # type: ignore[assignment]
+        try:
+            return DDGS()
+        finally:
+            warnings.warn = original_warn  # type: ignore[assignment]
 
 
-def _search_bing(query: str, max_results: int) -> list[SearchResult]:
-    if max_results <= 0:
-        return []
+_BING_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/122.0.0.0 Safari/537.36"
+    )
+}
+
+
+def _bing_params(query: str, first: int) -> dict[str, object]:
+    return {"q": query, "setlang": "ko", "first": first}
+
+
+def _parse_bing_page(
+    content: bytes,
+    query: str,
+    results: list[SearchResult],
+    seen_urls: set[str],
+    max_results: int,
+) -> bool:
+    # Appends new rows to results; False means paging should stop.
+    items = parse_bing_items(content.decode("utf-8", errors="replace"))
+    if not items:
+        return False
+
+    before_count = len(results)
+    for item in items:
+        if not item.title or not item.url or item.url in seen_urls:
+            continue
 
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/122.0.0.0 Safari/537.36"
+        seen_urls.add(item.url)
+        results.append(
+            SearchResult(
+                query=query,
+                title=item.title,
+                url=item.url,
+                snippet=item.snippet,
+                source="bing",
+                published_at=item.published_at,
+            )
         )
-    }
+        if len(results) >= max_results:
+            break
+
+    # No useful new rows -> stop paging.
+    return len(results) > before_count
+
+
+def _search_bing(
+    query: str,
+    max_results: int,
+    rate_limiter: RateLimiter | None = None,
+    cache_ttl_seconds: int | None = None,
+    bing_url: str = DEFAULT_BING_SEARCH_URL,
+) -> list[SearchResult]:
     results: list[SearchResult] = []
     seen_urls: set[str] = set()
 
@@ -59,101 +118,317 @@ def _search_bing(query: str, max_results: int) -> list[SearchResult]:
     for first in range(1, max_results + 1, 10):
         if len(results) >= max_results:
             break
-
-        params = {"q": query, "setlang": "ko", "first": first}
-        before_count = len(results)
+        if rate_limiter is not None:
+            rate_limiter.wait()
         try:
-            response = requests.get(
-                "https://www.bing.com/search",
-                params=params,
-                headers=headers,
+            response = fetch(
+                bing_url,
+                params=_bing_params(query, first),
+                headers=_BING_HEADERS,
                 timeout=15,
+                cache_ttl_seconds=cache_ttl_seconds,
+                stage="search.bing",
             )
-            response.raise_for_status()
         except Exception as exc:
             logger.warning("Search failed | query=%s page_first=%s error=%s", query, first, exc)
             break
+        if not _parse_bing_page(response.content, query, results, seen_urls, max_results):
+            break
+
+    return results
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        items = soup.select("li.b_algo")
-        if not items:
+
+async def _search_bing_async(
+    client: httpx.AsyncClient,
+    query: str,
+    max_results: int,
+    rate_limiter: RateLimiter,
+    cache_ttl_seconds: int | None = None,
+    bing_url: str = DEFAULT_BING_SEARCH_URL,
+) -> list[SearchResult]:
+    results: list[SearchResult] = []
+    seen_urls: set[str] = set()
+
+    for first in range(1, max_results + 1, 10):
+        if len(results) >= max_results:
+            break
+        await rate_limiter.wait_async()
+        try:
+            response = await fetch_async(
+                client,
+                bing_url,
+                params=_bing_params(query, first),
+                headers=_BING_HEADERS,
+                timeout=15,
+                cache_ttl_seconds=cache_ttl_seconds,
+                stage="search.bing",
+            )
+        except Exception as exc:
+            logger.warning("Search failed | query=%s page_first=%s error=%s", query, first, exc)
+            break
+        if not _parse_bing_page(response.content, query, results, seen_urls, max_results):
             break
 
-        for item in items:
-            link = item.select_one("h2 a")
-            if link is None:
-                continue
+    return results
 
-            title = link.get_text(" ", strip=True)
-            url = (link.get("href") or "").strip()
-            snippet_el = item.select_one("div.b_caption p") or item.select_one("p")
-            snippet = snippet_el.get_text(" ", strip=True) if snippet_el else ""
-            date_el = item.select_one("span.news_dt") or item.select_one(".news_dt")
-            published_at = date_el.get_text(" ", strip=True) if date_el else ""
 
-            if not title or not url or url in seen_urls:
+def _search_ddgs(query: str, max_results: int) -> list[SearchResult]:
+    rows: list[SearchResult] = []
+    ddgs = _create_ddgs()
+    with ddgs:
+        ddgs_rows = ddgs.text(
+            query,
+            region="kr-kr",
+            safesearch="off",
+            max_results=max_results,
+        )
+        for row in ddgs_rows:
+            title = str(row.get("title", "")).strip()
+            url = str(row.get("href", "")).strip()
+            snippet = str(row.get("body", "")).strip()
+            if not title or not url:
                 continue
-
-            seen_urls.add(url)
-            results.append(
+            rows.append(
                 SearchResult(
                     query=query,
                     title=title,
                     url=url,
                     snippet=snippet,
-                    source="bing",
-                    published_at=published_at,
+                    source="duckduckgo",
+                    published_at=str(row.get("date", "")).strip(),
                 )
             )
-            if len(results) >= max_results:
-                break
+    return rows
 
-        # No useful new rows -> stop paging.
-        if len(results) == before_count:
-            break
 
-    return results
+def _search_ddgs_cached(
+    query: str,
+    max_results: int,
+    rate_limiter: RateLimiter,
+    cache_ttl_seconds: int | None,
+) -> list[SearchResult]:
+    # DDGS has no HTTP surface we control, so its parsed rows are stored in
+    # the HTTP cache under a synthetic key instead.
+    cache = get_cache() if cache_ttl_seconds is not None else None
+    key = "ddgs://text?" + urlencode({"q": query, "max_results": max_results})
+    with trace("search.ddgs", query) as span:
+        if cache is not None:
+            cached = guard_cache(key, lambda: cache.get(key))
+            if cached is not None and is_fresh(cached, cache_ttl_seconds):
+                span.cache_hit = True
+                return [SearchResult(**row) for row in json.loads(cached.content)]
 
+        rate_limiter.wait()
+        rows = _search_ddgs(query, max_results)
+        if cache is not None and rows:
+            entry = CachedResponse(
+                url=key,
+                status=200,
+                content_type="application/json",
+                etag="",
+                last_modified="",
+                content=json.dumps([asdict(row) for row in rows], ensure_ascii=False).encode(),
+                fetched_at=time.time(),
+            )
+            guard_cache(key, lambda: cache.put(entry))
+        return rows
 
-def search_web(queries: Iterable[str], max_results_per_query: int) -> list[SearchResult]:
-    results: list[SearchResult] = []
-    try:
-        ddgs = _create_ddgs()
-        with ddgs:
-            for query in queries:
-                rows: list[SearchResult] = []
-                ddgs_rows = ddgs.text(
+
+def _search_query(
+    query: str,
+    max_results: int,
+    limiters: dict[str, RateLimiter],
+    cache_ttl_seconds: int | None = None,
+    providers: tuple[str, ...] = SEARCH_PROVIDERS,
+    bing_url: str = DEFAULT_BING_SEARCH_URL,
+) -> list[SearchResult]:
+    # Providers are tried in order; the first one returning rows wins.
+    with trace("search", query):
+        for provider in providers:
+            rows: list[SearchResult] = []
+            if provider == "duckduckgo":
+                try:
+                    rows = _search_ddgs_cached(
+                        query,
+                        max_results,
+                        limiters["duckduckgo"],
+                        cache_ttl_seconds,
+                    )
+                except Exception as exc:
+                    logger.warning("DDGS search failed | query=%s error=%s", query, exc)
+            else:
+                rows = _search_bing(
                     query,
-                    region="kr-kr",
-                    safesearch="off",
-                    max_results=max_results_per_query,
+                    max_results,
+                    rate_limiter=limiters["bing"],
+                    cache_ttl_seconds=cache_ttl_seconds,
+                    bing_url=bing_url,
                 )
-                for row in ddgs_rows:
-                    title = str(row.get("title", "")).strip()
-                    url = str(row.get("href", "")).strip()
-                    snippet = str(row.get("body", "")).strip()
-                    if not title or not url:
-                        continue
-                    rows.append(
-                        SearchResult(
-                            query=query,
-                            title=title,
-                            url=url,
-                            snippet=snippet,
-                            source="duckduckgo",
-                            published_at=str(row.get("date", "")).strip(),
-                        )
+            if rows:
+                return rows
+        return []
+
+
+async def _search_query_async(
+    client: httpx.AsyncClient,
+    query: str,
+    max_results: int,
+    limiters: dict[str, RateLimiter],
+    cache_ttl_seconds: int | None = None,
+    providers: tuple[str, ...] = SEARCH_PROVIDERS,
+    bing_url: str = DEFAULT_BING_SEARCH_URL,
+) -> list[SearchResult]:
+    # DDGS only has a blocking client, so it runs on a worker thread.
+    with trace("search", query):
+        for provider in providers:
+            rows: list[SearchResult] = []
+            if provider == "duckduckgo":
+                try:
+                    rows = await asyncio.to_thread(
+                        _search_ddgs_cached,
+                        query,
+                        max_results,
+                        limiters["duckduckgo"],
+                        cache_ttl_seconds,
                     )
-                if not rows:
-                    rows = _search_bing(query, max_results_per_query)
-                results.extend(rows)
-            return results
-    except Exception as exc:
-        logger.warning("DDGS session failed | fallback to requests | error=%s", exc)
-
-    for query in queries:
-        rows = _search_bing(query, max_results_per_query)
-        results.extend(rows)
+                except Exception as exc:
+                    logger.warning("DDGS search failed | query=%s error=%s", query, exc)
+            else:
+                rows = await _search_bing_async(
+                    client,
+                    query,
+                    max_results,
+                    limiters["bing"],
+                    cache_ttl_seconds=cache_ttl_seconds,
+                    bing_url=bing_url,
+                )
+            if rows:
+                return rows
+        return []
 
-    return results
 
+def _search_limiters(min_interval_seconds: float) -> dict[str, RateLimiter]:
+    return {
+        "duckduckgo": RateLimiter(min_interval_seconds),
+        "bing": RateLimiter(min_interval_seconds),
+    }
+
+
+def iter_search_web(
+    queries: Iterable[str],
+    max_results_per_query: int,
+    workers: int = 1,
+    deadline_seconds: float | None = None,
+    min_interval_seconds: float = 0.0,
+    cache_ttl_seconds: int | None = None,
+    providers: tuple[str, ...] = SEARCH_PROVIDERS,
+    bing_url: str = DEFAULT_BING_SEARCH_URL,
+) -> Iterator[tuple[str, list[SearchResult]]]:
+    # Yields each query's rows as soon as it and every earlier query are done,
+    # so consumers can start work early while keeping query order.
+    query_list = list(queries)
+    limiters = _search_limiters(min_interval_seconds)
+    deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+
+    executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="search")
+    try:
+        futures = [
+            executor.submit(
+                _search_query,
+                query,
+                max_results_per_query,
+                limiters,
+                cache_ttl_seconds,
+                providers,
+                bing_url,
+            )
+            for query in query_list
+        ]
+        for query, future in zip(query_list, futures):
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                rows = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                logger.warning("Search deadline exceeded | query=%s", query)
+                rows = []
+            except Exception as exc:
+                logger.warning("Search failed | query=%s error=%s", query, exc)
+                rows = []
+            yield query, rows
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def iter_search_async(
+    client: httpx.AsyncClient,
+    queries: Iterable[str],
+    max_results_per_query: int,
+    workers: int = 1,
+    deadline_seconds: float | None = None,
+    min_interval_seconds: float = 0.0,
+    cache_ttl_seconds: int | None = None,
+    providers: tuple[str, ...] = SEARCH_PROVIDERS,
+    bing_url: str = DEFAULT_BING_SEARCH_URL,
+) -> AsyncIterator[tuple[str, list[SearchResult]]]:
+    # Same contract as iter_search_web: query order, shared deadline.
+    query_list = list(queries)
+    limiters = _search_limiters(min_interval_seconds)
+    semaphore = asyncio.Semaphore(max(1, workers))
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + deadline_seconds if deadline_seconds else None
+
+    async def _run(query: str) -> list[SearchResult]:
+        async with semaphore:
+            return await _search_query_async(
+                client,
+                query,
+                max_results_per_query,
+                limiters,
+                cache_ttl_seconds,
+                providers,
+                bing_url,
+            )
+
+    tasks = [asyncio.create_task(_run(query)) for query in query_list]
+    try:
+        for query, task in zip(query_list, tasks):
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                rows = await asyncio.wait_for(task, timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Search deadline exceeded | query=%s", query)
+                rows = []
+            except Exception as exc:
+                logger.warning("Search failed | query=%s error=%s", query, exc)
+                rows = []
+            yield query, rows
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def search_web(
+    queries: Iterable[str],
+    max_results_per_query: int,
+    workers: int = 1,
+    deadline_seconds: float | None = None,
+    min_interval_seconds: float = 0.0,
+    cache_ttl_seconds: int | None = None,
+    providers: tuple[str, ...] = SEARCH_PROVIDERS,
+    bing_url: str = DEFAULT_BING_SEARCH_URL,
+) -> list[SearchResult]:
+    # Merged in query order so downstream first-wins URL dedupe is stable.
+    results: list[SearchResult] = []
+    for _, rows in iter_search_web(
+        queries,
+        max_results_per_query,
+        workers=workers,
+        deadline_seconds=deadline_seconds,
+        min_interval_seconds=min_interval_seconds,
+        cache_ttl_seconds=cache_ttl_seconds,
+        providers=providers,
+        bing_url=bing_url,
+    ):
+        results.extend(rows)
+    return results
@@ -1,67 +1,212 @@
 from __future__ import annotations
 
-import sqlite3
-from datetime import datetime, timedelta, timezone
+from collections.abc import Iterable
+import logging
 from pathlib import Path
+import sqlite3
+import threading
+import time
 
+from scrapper.config import DEFAULT_PROFILE
+from scrapper.fingerprint import from_signed, to_signed
 from scrapper.models import SummarizedArticle
 
+logger = logging.getLogger(__name__)
 
-def init_db(db_path: Path) -> None:
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(db_path) as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS sent_articles (
-                url TEXT PRIMARY KEY,
-                title TEXT NOT NULL,
-                sent_at_utc TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_sent_articles_sent_at
-            ON sent_articles(sent_at_utc)
-            """
+_COLUMNS = ("profile", "url", "title", "sent_at", "content_fingerprint")
+# Well under SQLITE_MAX_VARIABLE_NUMBER on every SQLite build still in use.
+_URL_BATCH = 500
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=67108864",
+)
+
+
+def _create_sent_articles(conn: sqlite3.Connection, table: str = "sent_articles") -> None:
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            profile TEXT NOT NULL,
+            url TEXT NOT NULL,
+            title TEXT NOT NULL,
+            sent_at INTEGER NOT NULL,
+            content_fingerprint INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (profile, url)
         )
-        conn.commit()
+        """
+    )
 
 
-def load_recent_sent(db_path: Path, window_days: int) -> tuple[set[str], list[str]]:
-    cutoff = datetime.now(timezone.utc) - timedelta(days=window_days)
-    cutoff_iso = cutoff.isoformat()
+def _migrate(conn: sqlite3.Connection) -> None:
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(sent_articles)")}
+    if not columns or set(_COLUMNS) <= columns:
+        return
+    # Older layouts: no profile (history belongs to the default profile), no
+    # content_fingerprint, and sent_at_utc as ISO text instead of epoch
+    # seconds. The primary key may change, so the table is rebuilt.
+    profile = "profile" if "profile" in columns else "?"
+    fingerprint = "content_fingerprint" if "content_fingerprint" in columns else "0"
+    conn.execute("ALTER TABLE sent_articles RENAME TO sent_articles_legacy")
+    _create_sent_articles(conn)
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO sent_articles(profile, url, title, sent_at, content_fingerprint)
+        SELECT
+            {profile},
+            url,
+            title,
+            COALESCE(CAST(strftime('%s', sent_at_utc) AS INTEGER), 0),
+            {fingerprint}
+        FROM sent_articles_legacy
+        ORDER BY sent_at_utc
+        """,
+        () if profile == "profile" else (DEFAULT_PROFILE,),
+    )
+    conn.execute("DROP TABLE sent_articles_legacy")
+    logger.info("Sent history migrated to epoch timestamps")
 
-    with sqlite3.connect(db_path) as conn:
-        rows = conn.execute(
-            """
-            SELECT url, title
-            FROM sent_articles
-            WHERE sent_at_utc >= ?
-            """,
-            (cutoff_iso,),
-        ).fetchall()
 
-    urls = {str(row[0]) for row in rows if row[0]}
-    titles = [str(row[1]) for row in rows if row[1]]
-    return urls, titles
+def connect(db_path: Path) -> sqlite3.Connection:
+    # Long-lived, tuned connection shared by the caller's threads; callers
+    # serialize statements themselves.
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
 
 
-def save_sent_articles(db_path: Path, articles: list[SummarizedArticle]) -> None:
-    if not articles:
-        return
-    sent_at_utc = datetime.now(timezone.utc).isoformat()
-
-    with sqlite3.connect(db_path) as conn:
-        conn.executemany(
-            """
-            INSERT INTO sent_articles(url, title, sent_at_utc)
-            VALUES (?, ?, ?)
-            ON CONFLICT(url) DO UPDATE SET
-                title = excluded.title,
-                sent_at_utc = excluded.sent_at_utc
-            """,
-            [(article.url, article.title, sent_at_utc) for article in articles],
-        )
-        conn.commit()
+def _cutoff(window_days: int) -> int:
+    return int(time.time()) - window_days * 86400
+
+
+class Storage:
+    # Sent history behind one long-lived WAL connection. Pipelines open it
+    # once per run and share it across profiles and threads; every statement
+    # runs under the lock.
+    def __init__(self, db_path: Path) -> None:
+        self._lock = threading.Lock()
+        self._conn = connect(db_path)
+        with self._conn:
+            _migrate(self._conn)
+            _create_sent_articles(self._conn)
+            _create_sent_articles(self._conn, "sent_articles_archive")
+            self._conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_sent_articles_profile_sent_at
+                ON sent_articles(profile, sent_at)
+                """
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
+
+    def sent_urls(
+        self,
+        urls: Iterable[str],
+        window_days: int,
+        profile: str = DEFAULT_PROFILE,
+    ) -> set[str]:
+        # Membership of just these URLs, so the history never has to be
+        # loaded into memory.
+        candidates = list(dict.fromkeys(url for url in urls if url))
+        cutoff = _cutoff(window_days)
+        sent: set[str] = set()
+        with self._lock:
+            for start in range(0, len(candidates), _URL_BATCH):
+                batch = candidates[start : start + _URL_BATCH]
+                rows = self._conn.execute(
+                    f"""
+                    SELECT url
+                    FROM sent_articles
+                    WHERE profile = ? AND sent_at >= ? AND url IN ({",".join("?" * len(batch))})
+                    """,
+                    (profile, cutoff, *batch),
+                )
+                sent.update(str(row[0]) for row in rows)
+        return sent
+
+    def recent_titles(self, window_days: int, profile: str = DEFAULT_PROFILE) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT title
+                FROM sent_articles
+                WHERE profile = ? AND sent_at >= ? AND title != ''
+                """,
+                (profile, _cutoff(window_days)),
+            ).fetchall()
+        return [str(row[0]) for row in rows]
+
+    def recent_fingerprints(self, window_days: int, profile: str = DEFAULT_PROFILE) -> list[int]:
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT content_fingerprint
+                FROM sent_articles
+                WHERE profile = ? AND sent_at >= ? AND content_fingerprint != 0
+                """,
+                (profile, _cutoff(window_days)),
+            ).fetchall()
+        return [from_signed(int(row[0])) for row in rows]
+
+    def save_sent_articles(
+        self,
+        articles: list[SummarizedArticle],
+        profile: str = DEFAULT_PROFILE,
+    ) -> None:
+        if not articles:
+            return
+        sent_at = int(time.time())
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO sent_articles(profile, url, title, sent_at, content_fingerprint)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(profile, url) DO UPDATE SET
+                    title = excluded.title,
+                    sent_at = excluded.sent_at,
+                    content_fingerprint = excluded.content_fingerprint
+                """,
+                [
+                    (
+                        profile,
+                        article.url,
+                        article.title,
+                        sent_at,
+                        to_signed(article.content_fingerprint),
+                    )
+                    for article in articles
+                ],
+            )
 
+    def prune(self, retention_days: int, archive: bool = True) -> int:
+        # Rows past retention leave the hot table (every profile at once), so
+        # the window queries stay on a small index. Archived rows are never
+        # read by the pipeline.
+        cutoff = _cutoff(retention_days)
+        with self._lock, self._conn:
+            if archive:
+                self._conn.execute(
+                    """
+                    INSERT OR REPLACE INTO sent_articles_archive(
+                        profile, url, title, sent_at, content_fingerprint
+                    )
+                    SELECT profile, url, title, sent_at, content_fingerprint
+                    FROM sent_articles
+                    WHERE sent_at < ?
+                    """,
+                    (cutoff,),
+                )
+            pruned = self._conn.execute(
+                "DELETE FROM sent_articles WHERE sent_at < ?",
+                (cutoff,),
+            ).rowcount
+        if pruned:
+            logger.info("Sent history pruned | rows=%s archived=%s", pruned, archive)
+        return pruned
@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
+import random
+import re
+import time
 
-from openai import OpenAI
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI, OpenAI, RateLimitError
 
+from scrapper.cache import SummaryCache, guard_cache
+from scrapper.concurrency import MinuteBudget
 from scrapper.models import ScoredArticle, SummaryResult
+from scrapper.ranking import score_relevance
+from scrapper.tracing import Span, trace
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever SYSTEM_PROMPT or the user prompt template changes so cached
+# summaries produced by the old prompt are not reused.
+PROMPT_VERSION = "1"
+
 SYSTEM_PROMPT = """
 당신은 한국 부동산/공공분양 정보를 정리하는 리서치 어시스턴트다.
 과장하지 말고, 기사 본문에 근거한 사실 위주로 요약하라.
@@ -15,6 +29,155 @@ SYSTEM_PROMPT = """
 """.strip()
 
 
+# Rough allowance for the structured Korean answer when budgeting tokens.
+EXPECTED_OUTPUT_TOKENS = 800
+
+# Legacy fixed-size cut, used when no token budget is configured.
+BODY_EXCERPT_CHARS = 9000
+_BOILERPLATE_RE = re.compile(
+    r"(무단\s*전재|재배포\s*금지|저작권자|copyright|ⓒ|©|all rights reserved|"
+    r"구독하기|좋아요|댓글|관련\s*기사|많이\s*본\s*뉴스|로그인|광고문의|제보하기)",
+    re.IGNORECASE,
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+BATCH_ENDPOINT = "/v1/responses"
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+BATCH_CANCEL_GRACE_SECONDS = 60
+BATCH_CANCEL_POLL_SECONDS = 5.0
+
+
+class SummaryThrottle:
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = 0,
+        backoff_seconds: float = 1.0,
+    ) -> None:
+        self._requests = MinuteBudget(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = MinuteBudget(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+
+    def acquire(self, estimated_tokens: int) -> None:
+        if self._requests is not None:
+            self._requests.acquire(1)
+        if self._tokens is not None:
+            self._tokens.acquire(estimated_tokens)
+
+    async def acquire_async(self, estimated_tokens: int) -> None:
+        if self._requests is not None:
+            await self._requests.acquire_async(1)
+        if self._tokens is not None:
+            await self._tokens.acquire_async(estimated_tokens)
+
+    def backoff(self, attempt: int, exc: Exception) -> float:
+        retry_after = _retry_after_seconds(exc)
+        if retry_after is not None:
+            return retry_after
+        # Full jitter keeps parallel workers from retrying in lockstep.
+        return random.uniform(0, self.backoff_seconds * (2**attempt))
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 ASCII characters per token; Hangul is close to one token per syllable.
+    ascii_chars = sum(1 for char in text if char.isascii())
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    raw = headers.get("retry-after")
+    try:
+        return min(float(raw), 60.0) if raw else None
+    except ValueError:
+        return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+def _request_input(user_prompt: str) -> list[dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _estimate_request_tokens(user_prompt: str) -> int:
+    estimated = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(user_prompt)
+    return estimated + EXPECTED_OUTPUT_TOKENS
+
+
+def _should_retry(throttle: SummaryThrottle | None, attempt: int, exc: Exception) -> bool:
+    return throttle is not None and attempt < throttle.max_retries and _is_retryable(exc)
+
+
+def _log_retry(model: str, attempt: int, delay: float, exc: Exception) -> None:
+    logger.info(
+        "Summary request retry | model=%s attempt=%s delay=%.1fs error=%s",
+        model,
+        attempt,
+        delay,
+        exc,
+    )
+
+
+def _create_response(
+    client: OpenAI,
+    model: str,
+    user_prompt: str,
+    throttle: SummaryThrottle | None,
+    span: Span,
+) -> object:
+    estimated = _estimate_request_tokens(user_prompt)
+    attempt = 0
+    while True:
+        if throttle is not None:
+            throttle.acquire(estimated)
+        span.retries = attempt
+        try:
+            return client.responses.create(model=model, input=_request_input(user_prompt))
+        except Exception as exc:
+            if not _should_retry(throttle, attempt, exc):
+                raise
+            delay = throttle.backoff(attempt, exc)
+            attempt += 1
+            _log_retry(model, attempt, delay, exc)
+            time.sleep(delay)
+
+
+async def _create_response_async(
+    client: AsyncOpenAI,
+    model: str,
+    user_prompt: str,
+    throttle: SummaryThrottle | None,
+    span: Span,
+) -> object:
+    estimated = _estimate_request_tokens(user_prompt)
+    attempt = 0
+    while True:
+        if throttle is not None:
+            await throttle.acquire_async(estimated)
+        span.retries = attempt
+        try:
+            return await client.responses.create(model=model, input=_request_input(user_prompt))
+        except Exception as exc:
+            if not _should_retry(throttle, attempt, exc):
+                raise
+            delay = throttle.backoff(attempt, exc)
+            attempt += 1
+            _log_retry(model, attempt, delay, exc)
+            await asyncio.sleep(delay)
+
+
 def _extract_response_text(response: object) -> str:
     output_text = getattr(response, "output_text", None)
     if isinstance(output_text, str) and output_text.strip():
@@ -37,15 +200,57 @@ def _extract_response_text(response: object) -> str:
     return ""
 
 
-def summarize_article(
-    client: OpenAI,
-    model: str,
-    core_keyword: str,
+def _is_boilerplate(paragraph: str) -> bool:
+    # Short lines carrying copyright/sharing/navigation markers are page chrome.
+    # Length alone says nothing: "분양가: 3억" is a key fact.
+    return len(paragraph) < 200 and _BOILERPLATE_RE.search(paragraph) is not None
+
+
+def build_body_excerpt(
     article: ScoredArticle,
-) -> SummaryResult:
-    body_excerpt = article.extracted_text[:9000] if article.extracted_text else ""
+    core_keyword: str = "",
+    related_keywords: tuple[str, ...] = (),
+    token_budget: int = 0,
+) -> str:
+    text = article.extracted_text or ""
+    if token_budget <= 0:
+        return text[:BODY_EXCERPT_CHARS]
+
+    paragraphs: list[str] = []
+    seen: set[str] = set()
+    for raw in text.splitlines():
+        paragraph = _WHITESPACE_RE.sub(" ", raw).strip()
+        if not paragraph or paragraph in seen or _is_boilerplate(paragraph):
+            continue
+        seen.add(paragraph)
+        paragraphs.append(paragraph)
+    if not paragraphs:
+        return ""
+
+    # Same keyword weights as ranking, so paragraphs that made the article
+    # relevant are packed first; ties keep the lede ahead of later text.
+    ranked = sorted(
+        range(len(paragraphs)),
+        key=lambda index: (
+            -score_relevance(core_keyword, related_keywords, "", "", paragraphs[index]),
+            index,
+        ),
+    )
+    chosen: list[int] = []
+    remaining = token_budget
+    for index in ranked:
+        cost = estimate_tokens(paragraphs[index])
+        if cost <= remaining:
+            chosen.append(index)
+            remaining -= cost
+    if not chosen:
+        top = paragraphs[ranked[0]]
+        return top[: max(1, token_budget)]
+    return "\n".join(paragraphs[index] for index in sorted(chosen))
 
-    user_prompt = f"""
+
+def build_user_prompt(core_keyword: str, article: ScoredArticle, body_excerpt: str) -> str:
+    return f"""
 [핵심 키워드]
 {core_keyword}
 
@@ -66,35 +271,76 @@ def summarize_article(
 모든 응답은 한국어로 작성.
 """.strip()
 
-    try:
-        response = client.responses.create(
-            model=model,
-            input=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-        )
-        content = _extract_response_text(response)
-        if content:
-            return SummaryResult(text=content, success=True, reason="ok")
-        logger.warning(
-            "Summary generation empty output | url=%s model=%s",
-            article.canonical_url,
-            model,
-        )
-        return SummaryResult(
-            text="요약 생성 실패. 응답이 비어 원문 확인이 필요합니다.",
-            success=False,
-            reason="empty_output",
-        )
-    except Exception as exc:
-        logger.warning(
-            "Summary generation failed | url=%s model=%s error=%s",
-            article.canonical_url,
-            model,
-            exc,
-        )
 
+def summary_cache_key(
+    model: str,
+    core_keyword: str,
+    article: ScoredArticle,
+    body_excerpt: str,
+) -> str:
+    digest = hashlib.sha256()
+    for part in (
+        model,
+        PROMPT_VERSION,
+        core_keyword,
+        article.search_result.title,
+        article.search_result.snippet,
+        body_excerpt,
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _prepare_summary(
+    model: str,
+    core_keyword: str,
+    article: ScoredArticle,
+    cache: SummaryCache | None,
+    related_keywords: tuple[str, ...],
+    excerpt_tokens: int,
+) -> tuple[str, str, SummaryResult | None]:
+    # Returns (cache_key, user_prompt, cached result if any).
+    body_excerpt = build_body_excerpt(article, core_keyword, related_keywords, excerpt_tokens)
+    cache_key = ""
+    if cache is not None:
+        cache_key = summary_cache_key(model, core_keyword, article, body_excerpt)
+        cached_text = guard_cache(cache_key, lambda: cache.get(cache_key))
+        if cached_text:
+            return cache_key, "", SummaryResult(
+                text=cached_text,
+                success=True,
+                reason="ok",
+                cached=True,
+            )
+    return cache_key, build_user_prompt(core_keyword, article, body_excerpt), None
+
+
+def _summary_from_response(
+    model: str,
+    article: ScoredArticle,
+    cache: SummaryCache | None,
+    cache_key: str,
+    response: object,
+) -> SummaryResult:
+    content = _extract_response_text(response)
+    if content:
+        if cache is not None:
+            guard_cache(cache_key, lambda: cache.put(cache_key, model, content))
+        return SummaryResult(text=content, success=True, reason="ok")
+    logger.warning(
+        "Summary generation empty output | url=%s model=%s",
+        article.canonical_url,
+        model,
+    )
+    return SummaryResult(
+        text="요약 생성 실패. 응답이 비어 원문 확인이 필요합니다.",
+        success=False,
+        reason="empty_output",
+    )
+
+
+def fallback_summary(article: ScoredArticle, reason: str = "api_error") -> SummaryResult:
     snippet = article.search_result.snippet.strip()
     body_preview = article.extracted_text.strip()[:400]
     fallback = body_preview if body_preview else snippet
@@ -103,6 +349,254 @@ def summarize_article(
     return SummaryResult(
         text=f"요약 생성 실패. 원문 확인 필요.\n핵심 발췌: {fallback}",
         success=False,
-        reason="api_error",
+        reason=reason,
     )
 
+
+def summarize_article(
+    client: OpenAI,
+    model: str,
+    core_keyword: str,
+    article: ScoredArticle,
+    cache: SummaryCache | None = None,
+    throttle: SummaryThrottle | None = None,
+    related_keywords: tuple[str, ...] = (),
+    excerpt_tokens: int = 0,
+) -> SummaryResult:
+    with trace("summary", article.canonical_url) as span:
+        cache_key, user_prompt, cached = _prepare_summary(
+            model, core_keyword, article, cache, related_keywords, excerpt_tokens
+        )
+        if cached is not None:
+            span.cache_hit = True
+            return cached
+
+        try:
+            response = _create_response(client, model, user_prompt, throttle, span)
+            result = _summary_from_response(model, article, cache, cache_key, response)
+            span.ok = result.success
+            return result
+        except Exception as exc:
+            logger.warning(
+                "Summary generation failed | url=%s model=%s error=%s",
+                article.canonical_url,
+                model,
+                exc,
+            )
+        span.ok = False
+        return fallback_summary(article)
+
+
+async def summarize_article_async(
+    client: AsyncOpenAI,
+    model: str,
+    core_keyword: str,
+    article: ScoredArticle,
+    cache: SummaryCache | None = None,
+    throttle: SummaryThrottle | None = None,
+    related_keywords: tuple[str, ...] = (),
+    excerpt_tokens: int = 0,
+) -> SummaryResult:
+    with trace("summary", article.canonical_url) as span:
+        cache_key, user_prompt, cached = _prepare_summary(
+            model, core_keyword, article, cache, related_keywords, excerpt_tokens
+        )
+        if cached is not None:
+            span.cache_hit = True
+            return cached
+
+        try:
+            response = await _create_response_async(client, model, user_prompt, throttle, span)
+            result = _summary_from_response(model, article, cache, cache_key, response)
+            span.ok = result.success
+            return result
+        except Exception as exc:
+            logger.warning(
+                "Summary generation failed | url=%s model=%s error=%s",
+                article.canonical_url,
+                model,
+                exc,
+            )
+        span.ok = False
+        return fallback_summary(article)
+
+
+def _extract_body_text(body: object) -> str:
+    # Batch output holds the raw Responses JSON, which has no output_text helper.
+    if not isinstance(body, dict):
+        return ""
+    output_text = body.get("output_text")
+    if isinstance(output_text, str) and output_text.strip():
+        return output_text.strip()
+    chunks: list[str] = []
+    for item in body.get("output") or []:
+        if not isinstance(item, dict):
+            continue
+        for part in item.get("content") or []:
+            text = part.get("text") if isinstance(part, dict) else None
+            if isinstance(text, str) and text.strip():
+                chunks.append(text.strip())
+    return "\n".join(chunks)
+
+
+def _wait_for_batch(
+    client: OpenAI,
+    batch_id: str,
+    deadline_seconds: float,
+    poll_seconds: float,
+) -> object:
+    deadline = time.monotonic() + deadline_seconds
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        status = getattr(batch, "status", "")
+        if status in BATCH_TERMINAL_STATUSES:
+            return batch
+        if time.monotonic() >= deadline:
+            logger.warning("Summary batch deadline exceeded | batch=%s status=%s", batch_id, status)
+            return _cancel_batch(client, batch, poll_seconds)
+        time.sleep(min(poll_seconds, max(0.0, deadline - time.monotonic())))
+
+
+def _cancel_batch(client: OpenAI, batch: object, poll_seconds: float) -> object:
+    # Answers finished before the cancel are still billed and still returned,
+    # but the output file only appears once "cancelling" becomes "cancelled".
+    batch_id = getattr(batch, "id", "")
+    try:
+        batch = client.batches.cancel(batch_id)
+    except Exception as exc:
+        logger.warning("Summary batch cancel failed | batch=%s error=%s", batch_id, exc)
+        return batch
+    grace = time.monotonic() + BATCH_CANCEL_GRACE_SECONDS
+    while getattr(batch, "status", "") not in BATCH_TERMINAL_STATUSES:
+        if time.monotonic() >= grace:
+            logger.warning("Summary batch still cancelling | batch=%s", batch_id)
+            break
+        remaining = max(0.0, grace - time.monotonic())
+        time.sleep(min(poll_seconds, BATCH_CANCEL_POLL_SECONDS, remaining))
+        batch = client.batches.retrieve(batch_id)
+    return batch
+
+
+def _log_batch_errors(client: OpenAI, batch: object) -> None:
+    error_file_id = getattr(batch, "error_file_id", None)
+    if not error_file_id:
+        return
+    try:
+        rows = [
+            json.loads(line)
+            for line in client.files.content(error_file_id).text.splitlines()
+            if line.strip()
+        ]
+    except Exception as exc:
+        logger.warning(
+            "Summary batch error file unreadable | batch=%s error=%s",
+            getattr(batch, "id", ""),
+            exc,
+        )
+        return
+    if rows:
+        logger.warning(
+            "Summary batch requests failed | batch=%s failed=%s first=%s",
+            getattr(batch, "id", ""),
+            len(rows),
+            rows[0].get("error") or (rows[0].get("response") or {}).get("body"),
+        )
+
+
+def _read_batch_output(client: OpenAI, batch: object) -> dict[str, str]:
+    _log_batch_errors(client, batch)
+    output_file_id = getattr(batch, "output_file_id", None)
+    outputs: dict[str, str] = {}
+    if not output_file_id:
+        return outputs
+    for line in client.files.content(output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        response = row.get("response") or {}
+        if row.get("error") or response.get("status_code") != 200:
+            continue
+        text = _extract_body_text(response.get("body"))
+        if text:
+            outputs[str(row.get("custom_id", ""))] = text
+    return outputs
+
+
+def summarize_batch(
+    client: OpenAI,
+    model: str,
+    core_keyword: str,
+    articles: list[ScoredArticle],
+    cache: SummaryCache | None = None,
+    deadline_seconds: float = 3600,
+    poll_seconds: float = 30,
+    related_keywords: tuple[str, ...] = (),
+    excerpt_tokens: int = 0,
+) -> list[SummaryResult | None]:
+    # None marks articles the batch did not answer; callers fall back to
+    # summarize_article for those.
+    results: list[SummaryResult | None] = [None] * len(articles)
+    pending: dict[str, tuple[int, str]] = {}
+    lines: list[str] = []
+    for index, article in enumerate(articles):
+        body_excerpt = build_body_excerpt(article, core_keyword, related_keywords, excerpt_tokens)
+        cache_key = ""
+        if cache is not None:
+            cache_key = summary_cache_key(model, core_keyword, article, body_excerpt)
+            cached_text = guard_cache(cache_key, lambda: cache.get(cache_key))
+            if cached_text:
+                results[index] = SummaryResult(
+                    text=cached_text,
+                    success=True,
+                    reason="ok",
+                    cached=True,
+                )
+                continue
+        custom_id = f"article-{index}"
+        pending[custom_id] = (index, cache_key)
+        request = {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": model,
+                "input": _request_input(build_user_prompt(core_keyword, article, body_excerpt)),
+            },
+        }
+        lines.append(json.dumps(request, ensure_ascii=False))
+
+    if not lines:
+        return results
+
+    with trace("summary.batch", model) as span:
+        try:
+            payload = ("\n".join(lines) + "\n").encode("utf-8")
+            span.bytes = len(payload)
+            input_file = client.files.create(file=("summaries.jsonl", payload), purpose="batch")
+            batch = client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window="24h",
+            )
+            logger.info("Summary batch submitted | batch=%s requests=%s", batch.id, len(lines))
+            batch = _wait_for_batch(client, batch.id, deadline_seconds, poll_seconds)
+            outputs = _read_batch_output(client, batch)
+        except Exception as exc:
+            logger.warning("Summary batch failed | model=%s error=%s", model, exc)
+            span.ok = False
+            return results
+
+    for custom_id, (index, cache_key) in pending.items():
+        content = outputs.get(custom_id)
+        if not content:
+            continue
+        if cache is not None:
+            guard_cache(cache_key, lambda: cache.put(cache_key, model, content))
+        results[index] = SummaryResult(text=content, success=True, reason="ok")
+    logger.info(
+        "Summary batch finished | status=%s answered=%s missing=%s",
+        getattr(batch, "status", ""),
+        len(outputs),
+        len(pending) - len(outputs),
+    )
+    return results
@@ -1,83 +1,448 @@
 from __future__ import annotations
 
-from bs4 import BeautifulSoup
-import requests
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
+from functools import cached_property
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import re
+import signal
+import sys
+import threading
+import time
+from typing import Callable
+
+import httpx
 import trafilatura
 
+from scrapper.cache import ExtractionCache, guard_cache
+from scrapper.config import DEFAULT_EXTRACTOR_CHAIN
+from scrapper.host_health import HostHealth
+from scrapper.html_parse import get_html_parser, parse_article, set_html_parser
+from scrapper.http_client import HttpResponse, fetch, fetch_async
 from scrapper.models import ExtractedContent
+from scrapper.ranking import canonicalize_url
+from scrapper.tracing import Span, get_tracer, trace
+
+logger = logging.getLogger(__name__)
+
+MIN_TEXT_LENGTH = 80
+
+_CHARSET_HEADER_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+_CHARSET_META_RE = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+# Korean sites routinely label CP949 pages as EUC-KR.
+_CHARSET_ALIASES = {"euc-kr": "cp949", "euc_kr": "cp949", "ks_c_5601-1987": "cp949"}
+# Latin-1 decodes any byte string, so a header claiming it is tried last.
+_WEAK_CHARSETS = {"iso-8859-1", "latin-1", "latin1", "us-ascii", "ascii"}
+# ProcessPoolExecutor's limit on Windows.
+_WINDOWS_MAX_WORKERS = 61
+_WARM_UP_HTML = "<html><head><title>warm</title></head><body><p>warm up</p></body></html>"
+_WARM_UP_TIMEOUT_SECONDS = 120
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+Extractor = Callable[[str, str], ExtractedContent | None]
+
+
+@dataclass(frozen=True)
+class FetchedPage:
+    # Kept as the response bytes; decoding waits until a page is extracted
+    # in this process, since cache hits and pooled extraction never need it.
+    url: str
+    content: bytes
+    content_type: str
+    content_hash: str
+    from_cache: bool = False
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+    @cached_property
+    def _decoded(self) -> tuple[str, str]:
+        return _decode_html(self.content, self.content_type)
 
+    @property
+    def html(self) -> str:
+        return self._decoded[0]
 
-def _extract_published_at_from_soup(soup: BeautifulSoup) -> str:
-    meta_keys = (
-        ("property", "article:published_time"),
-        ("property", "og:published_time"),
-        ("name", "pubdate"),
-        ("name", "publishdate"),
-        ("name", "publication_date"),
-        ("name", "date"),
-        ("name", "dc.date"),
-        ("itemprop", "datePublished"),
+    @property
+    def encoding(self) -> str:
+        return self._decoded[1]
+
+
+def _normalize_charset(name: str) -> str:
+    lowered = name.strip().lower()
+    return _CHARSET_ALIASES.get(lowered, lowered)
+
+
+def _decode_html(content: bytes, content_type: str) -> tuple[str, str]:
+    candidates: list[str] = []
+    weak: list[str] = []
+    header_match = _CHARSET_HEADER_RE.search(content_type or "")
+    meta_match = _CHARSET_META_RE.search(content[:4096])
+    declared = (
+        header_match.group(1) if header_match else "",
+        meta_match.group(1).decode("ascii", "ignore") if meta_match else "",
     )
-    for attr, value in meta_keys:
-        tag = soup.find("meta", attrs={attr: value})
-        if tag:
-            content = (tag.get("content") or "").strip()
-            if content:
-                return content
-
-    time_tag = soup.find("time")
-    if time_tag:
-        datetime_attr = (time_tag.get("datetime") or "").strip()
-        if datetime_attr:
-            return datetime_attr
-        time_text = time_tag.get_text(" ", strip=True)
-        if time_text:
-            return time_text
-
-    return ""
-
-
-def extract_article_text(url: str, timeout_seconds: int) -> ExtractedContent:
-    try:
-        downloaded = trafilatura.fetch_url(url)
-        if downloaded:
-            extracted_doc = trafilatura.bare_extraction(
-                downloaded,
-                include_comments=False,
-                include_tables=False,
-                url=url,
+    for name in declared:
+        if not name:
+            continue
+        charset = _normalize_charset(name)
+        (weak if charset in _WEAK_CHARSETS else candidates).append(charset)
+    candidates.extend(("utf-8", "cp949"))
+    candidates.extend(weak)
+
+    for encoding in dict.fromkeys(candidates):
+        try:
+            return content.decode(encoding), encoding
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return content.decode("utf-8", errors="replace"), "utf-8"
+
+
+def _page_from_response(response: HttpResponse) -> FetchedPage:
+    return FetchedPage(
+        url=response.url,
+        content=response.content,
+        content_type=response.content_type,
+        content_hash=hashlib.sha256(response.content).hexdigest(),
+        from_cache=response.from_cache,
+    )
+
+
+def fetch_page(
+    url: str,
+    timeout_seconds: float,
+    cache_ttl_seconds: int | None = None,
+) -> FetchedPage:
+    response = fetch(
+        url,
+        timeout=timeout_seconds,
+        cache_ttl_seconds=cache_ttl_seconds,
+        stage="fetch",
+    )
+    return _page_from_response(response)
+
+
+async def fetch_page_async(
+    client: httpx.AsyncClient,
+    url: str,
+    timeout_seconds: float,
+    cache_ttl_seconds: int | None = None,
+) -> FetchedPage:
+    response = await fetch_async(
+        client,
+        url,
+        timeout=timeout_seconds,
+        cache_ttl_seconds=cache_ttl_seconds,
+        stage="fetch",
+    )
+    return _page_from_response(response)
+
+
+def _extract_with_trafilatura(url: str, html: str) -> ExtractedContent | None:
+    extracted_doc = trafilatura.bare_extraction(
+        html,
+        include_comments=False,
+        include_tables=False,
+        url=url,
+    )
+    if not extracted_doc:
+        return None
+    text = (extracted_doc.text or "").strip()
+    published_at = (extracted_doc.date or "").strip()
+    return ExtractedContent(text=text, method="trafilatura", published_at=published_at)
+
+
+def _extract_with_bs4(url: str, html: str) -> ExtractedContent | None:
+    # Named for the original BeautifulSoup path; HTML_PARSER picks the backend.
+    text, published_at = parse_article(html)
+    return ExtractedContent(text=text, method="bs4", published_at=published_at)
+
+
+EXTRACTORS: dict[str, Extractor] = {
+    "trafilatura": _extract_with_trafilatura,
+    "bs4": _extract_with_bs4,
+}
+
+
+def resolve_extractor_chain(names: tuple[str, ...]) -> tuple[str, ...]:
+    unknown = [name for name in names if name not in EXTRACTORS]
+    if unknown:
+        raise ValueError(
+            f"Unknown extractor(s): {', '.join(unknown)}. Available: {', '.join(EXTRACTORS)}"
+        )
+    return names
+
+
+def extraction_cache_version(extractor_chain: tuple[str, ...], user_version: str) -> str:
+    # Cached results are only valid for the same chain, library versions and
+    # HTML backend (the two differ on some broken markup).
+    trafilatura_version = getattr(trafilatura, "__version__", "unknown")
+    return (
+        f"{user_version}|{','.join(extractor_chain)}|trafilatura={trafilatura_version}"
+        f"|parser={get_html_parser()}"
+    )
+
+
+def extract_from_html(
+    url: str,
+    html: str,
+    extractor_chain: tuple[str, ...] = DEFAULT_EXTRACTOR_CHAIN,
+    timings: list[tuple[str, float]] | None = None,
+) -> ExtractedContent:
+    timings = timings if timings is not None else []
+    for name in extractor_chain:
+        extractor = EXTRACTORS.get(name)
+        if extractor is None:
+            continue
+        started = time.perf_counter()
+        with trace(f"extract.{name}", url) as span:
+            try:
+                extracted = extractor(url, html)
+            except Exception as exc:
+                logger.debug("Extractor failed | url=%s extractor=%s error=%s", url, name, exc)
+                extracted = None
+            span.ok = extracted is not None and len(extracted.text) > MIN_TEXT_LENGTH
+        timings.append((name, time.perf_counter() - started))
+        if extracted is not None and len(extracted.text) > MIN_TEXT_LENGTH:
+            return ExtractedContent(
+                text=extracted.text,
+                method=extracted.method,
+                published_at=extracted.published_at,
+                timings=tuple(timings),
             )
-            if extracted_doc:
-                text = (extracted_doc.text or "").strip()
-                published_at = (extracted_doc.date or "").strip()
-                if len(text) > 80:
-                    return ExtractedContent(
-                        text=text,
-                        method="trafilatura",
-                        published_at=published_at,
-                    )
+
+    return ExtractedContent(text="", method="failed", timings=tuple(timings))
+
+
+def _init_extraction_worker(html_parser: str, ready: multiprocessing.Queue[int]) -> None:
+    # Runs once per worker: the imports above are paid here, and one tiny
+    # page runs trafilatura's first-use setup before real pages arrive.
+    # Ctrl+C is left to the parent, which shuts the pool down.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    set_html_parser(html_parser)
+    logging.getLogger("trafilatura").setLevel(logging.CRITICAL)
+    logging.getLogger("htmldate").setLevel(logging.CRITICAL)
+    try:
+        trafilatura.bare_extraction(_WARM_UP_HTML)
     except Exception:
         pass
+    ready.put(os.getpid())
+
 
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def _extract_in_worker(
+    url: str,
+    content: bytes,
+    content_type: str,
+    extractor_chain: tuple[str, ...],
+) -> ExtractedContent:
+    html, _ = _decode_html(content, content_type)
+    return extract_from_html(url, html, extractor_chain)
+
+
+def _wait_for_workers(
+    ready: multiprocessing.Queue[int],
+    workers: int,
+    started: list[Future[int]],
+) -> bool:
+    # A worker reports once its initializer is done; a failed initializer
+    # breaks the pool, which shows up on the start-up futures instead.
+    deadline = time.monotonic() + _WARM_UP_TIMEOUT_SECONDS
+    warmed = 0
+    while warmed < workers:
+        try:
+            ready.get(timeout=0.2)
+            warmed += 1
+        except queue.Empty:
+            if any(future.done() and future.exception() for future in started):
+                return False
+            if time.monotonic() >= deadline:
+                logger.warning(
+                    "Extraction pool still warming up | ready=%s workers=%s", warmed, workers
+                )
+                break
+    return True
+
+
+def configure_extraction_pool(workers: int, html_parser: str) -> None:
+    # HTML -> ExtractedContent in worker processes, so trafilatura's pure
+    # Python work runs on every core instead of queueing on the GIL. Workers
+    # are spawned (fork is unsafe with the fetch threads running) and every
+    # one is warm before this returns, so no page waits on a cold worker.
+    global _pool
+    close_extraction_pool()
+    if not workers:
+        workers = os.cpu_count() or 1
+        if workers < 2:
+            # No second core to win; worker processes would only add IPC.
+            return
+    if sys.platform == "win32":
+        workers = min(workers, _WINDOWS_MAX_WORKERS)
     try:
-        response = requests.get(
-            url,
-            timeout=timeout_seconds,
-            headers={"User-Agent": "Mozilla/5.0 (compatible; daily-digest-bot/1.0)"},
+        context = multiprocessing.get_context("spawn")
+        ready: multiprocessing.Queue[int] = context.Queue()
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_extraction_worker,
+            initargs=(html_parser, ready),
         )
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        published_at = _extract_published_at_from_soup(soup)
-        paragraphs = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
-        text = "\n".join(paragraphs).strip()
-        if len(text) > 80:
+        # Workers start on demand; one task each makes the pool start all.
+        started = [pool.submit(_worker_ready) for _ in range(workers)]
+    except (OSError, NotImplementedError, ImportError) as exc:
+        logger.warning("Extraction pool unavailable, extracting in-process | error=%s", exc)
+        return
+    with trace("extract.pool.warm_up"):
+        warmed = _wait_for_workers(ready, workers, started)
+    ready.close()
+    if not warmed:
+        logger.warning("Extraction pool failed to start, extracting in-process")
+        pool.shutdown(wait=False, cancel_futures=True)
+        return
+    with _pool_lock:
+        _pool = pool
+    logger.info("Extraction pool started | workers=%s", workers)
+
+
+def close_extraction_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _disable_extraction_pool(pool: ProcessPoolExecutor, exc: BaseException) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not pool:
+            return
+        _pool = None
+    logger.warning("Extraction pool failed, extracting in-process | error=%s", exc)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _record_worker_spans(url: str, extracted: ExtractedContent) -> None:
+    # Workers have no tracer; their per-extractor timings come back with the
+    # result and are recorded here as the inline path would have.
+    tracer = get_tracer()
+    if tracer is None:
+        return
+    for name, seconds in extracted.timings:
+        tracer.record(Span(stage=f"extract.{name}", key=url, ok=name == extracted.method), seconds)
+
+
+def _extract_html(
+    url: str,
+    page: FetchedPage,
+    extractor_chain: tuple[str, ...],
+    timings: list[tuple[str, float]],
+) -> ExtractedContent:
+    pool = _pool
+    if pool is not None:
+        try:
+            with trace("extract.pool", url):
+                # The response bytes go over as-is and the worker decodes
+                # them; bytes pickle as one buffer copy.
+                future = pool.submit(
+                    _extract_in_worker, url, page.content, page.content_type, extractor_chain
+                )
+                extracted = future.result()
+        except (BrokenProcessPool, CancelledError, RuntimeError) as exc:
+            # A dead worker breaks the whole pool (or it was closed under
+            # us); the rest of the run extracts in-process.
+            _disable_extraction_pool(pool, exc)
+        except Exception as exc:
+            logger.debug("Pooled extraction failed | url=%s error=%s", url, exc)
+        else:
+            _record_worker_spans(url, extracted)
+            timings.extend(extracted.timings)
+            return replace(extracted, timings=tuple(timings))
+    return extract_from_html(url, page.html, extractor_chain, timings)
+
+
+def extract_page(
+    url: str,
+    page: FetchedPage,
+    extractor_chain: tuple[str, ...] = DEFAULT_EXTRACTOR_CHAIN,
+    extraction_cache: ExtractionCache | None = None,
+    timings: list[tuple[str, float]] | None = None,
+) -> ExtractedContent:
+    timings = timings if timings is not None else []
+    canonical_url = canonicalize_url(url)
+    if extraction_cache is not None:
+        started = time.perf_counter()
+        with trace("extract_cache", url) as span:
+            cached = guard_cache(
+                url,
+                lambda: extraction_cache.get(canonical_url, page.content_hash),
+            )
+            span.cache_hit = cached is not None
+        timings.append(("extract_cache", time.perf_counter() - started))
+        if cached is not None:
             return ExtractedContent(
-                text=text,
-                method="requests+bs4",
-                published_at=published_at,
+                text=cached.text,
+                method=cached.method,
+                published_at=cached.published_at,
+                timings=tuple(timings),
             )
-    except Exception:
-        pass
 
-    return ExtractedContent(text="", method="failed")
+    extracted = _extract_html(url, page, extractor_chain, timings)
+    if extraction_cache is not None:
+        guard_cache(
+            url,
+            lambda: extraction_cache.put(canonical_url, page.content_hash, extracted),
+        )
+    if logger.isEnabledFor(logging.DEBUG):
+        # page.encoding decodes the page when a worker extracted it.
+        logger.debug(
+            "Extracted | url=%s method=%s bytes=%s encoding=%s cached=%s timings=%s",
+            url,
+            extracted.method,
+            page.size,
+            page.encoding,
+            page.from_cache,
+            {name: round(seconds, 3) for name, seconds in extracted.timings},
+        )
+    return extracted
+
 
+def extract_article_text(
+    url: str,
+    timeout_seconds: float,
+    extractor_chain: tuple[str, ...] = DEFAULT_EXTRACTOR_CHAIN,
+    cache_ttl_seconds: int | None = None,
+    extraction_cache: ExtractionCache | None = None,
+    host_health: HostHealth | None = None,
+) -> ExtractedContent:
+    if host_health is not None:
+        host_timeout = host_health.check(url)
+        if host_timeout is None:
+            return ExtractedContent(text="", method="circuit_open")
+        timeout_seconds = host_timeout
+
+    timings: list[tuple[str, float]] = []
+    started = time.perf_counter()
+    try:
+        page = fetch_page(url, timeout_seconds, cache_ttl_seconds=cache_ttl_seconds)
+    except Exception as exc:
+        timings.append(("fetch", time.perf_counter() - started))
+        if host_health is not None:
+            host_health.observe(url, timings[-1][1], error=exc)
+        logger.debug("Fetch failed | url=%s error=%s", url, exc)
+        return ExtractedContent(text="", method="failed", timings=tuple(timings))
+    timings.append(("fetch", time.perf_counter() - started))
+    if host_health is not None:
+        host_health.observe(url, timings[-1][1], from_cache=page.from_cache)
+    return extract_page(url, page, extractor_chain, extraction_cache, timings)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+import json
+import logging
+import math
+from pathlib import Path
+import threading
+import time
+from typing import IO, Iterator
+
+from scrapper.models import StageTiming
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    stage: str
+    key: str = ""
+    bytes: int = 0
+    retries: int = 0
+    cache_hit: bool = False
+    ok: bool = True
+
+
+class Tracer:
+    # Collects one event per span. Events are appended to a JSON-lines file as
+    # they happen, so a run that dies half way still leaves its trace behind.
+    def __init__(self, path: Path | None = None) -> None:
+        self._lock = threading.Lock()
+        self._spans: dict[str, list[tuple[float, Span]]] = defaultdict(list)
+        self._file: IO[str] | None = None
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = path.open("a", encoding="utf-8")
+            except OSError as exc:
+                logger.warning("Trace file unavailable | path=%s error=%s", path, exc)
+
+    def record(self, span: Span, seconds: float) -> None:
+        line = ""
+        if self._file is not None:
+            event = {"ts": round(time.time(), 3), "seconds": round(seconds, 4), **asdict(span)}
+            line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._spans[span.stage].append((seconds, span))
+            if self._file is not None:
+                self._file.write(line)
+
+    def stage_timings(self) -> tuple[StageTiming, ...]:
+        with self._lock:
+            snapshot = {stage: list(spans) for stage, spans in self._spans.items()}
+        timings: list[StageTiming] = []
+        for stage in sorted(snapshot):
+            spans = snapshot[stage]
+            seconds = sorted(elapsed for elapsed, _ in spans)
+            timings.append(
+                StageTiming(
+                    stage=stage,
+                    count=len(spans),
+                    total_seconds=sum(seconds),
+                    p50_seconds=_percentile(seconds, 50),
+                    p95_seconds=_percentile(seconds, 95),
+                    bytes=sum(span.bytes for _, span in spans),
+                    retries=sum(span.retries for _, span in spans),
+                    cache_hits=sum(1 for _, span in spans if span.cache_hit),
+                    failures=sum(1 for _, span in spans if not span.ok),
+                )
+            )
+        return tuple(timings)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _percentile(sorted_values: list[float], percent: int) -> float:
+    # Nearest-rank, which never invents a value that was not observed.
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+_tracer: Tracer | None = None
+
+
+def set_tracer(tracer: Tracer | None) -> None:
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Tracer | None:
+    return _tracer
+
+
+@contextmanager
+def trace(stage: str, key: str = "") -> Iterator[Span]:
+    # Cheap no-op recorder when no tracer is installed.
+    span = Span(stage=stage, key=key)
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException:
+        span.ok = False
+        raise
+    finally:
+        tracer = _tracer
+        if tracer is not None:
+            tracer.record(span, time.perf_counter() - started)
+
+
+def format_stage_timings(timings: tuple[StageTiming, ...]) -> str:
+    return ",".join(
+        f"{timing.stage}={timing.p50_seconds:.2f}/{timing.p95_seconds:.2f}" for timing in timings
+    )
@@ -1,5 +1,6 @@
 param(
     [switch]$DryRun,
+    [switch]$Resume,
     [string]$LogDir = "logs"
 )
 
@@ -13,6 +14,9 @@ $args = @("-m", "scrapper.main")
 if ($DryRun) {
     $args += "--dry-run"
 }
+if ($Resume) {
+    $args += "--resume"
+}
 
 $resolvedLogDir = if ([System.IO.Path]::IsPathRooted($LogDir)) {
     $LogDir
@@ -92,18 +96,19 @@ if ($exitCode -ne 0 -or $errorHits.Count -gt 0) {
     Write-Host "Log check: no obvious issue."
 }
 
-$runCompletedLine = Select-String -Path $logPath -Pattern "Run completed |" -SimpleMatch | Select-Object -Last 1
-if ($runCompletedLine) {
+$runCompletedLines = Select-String -Path $logPath -Pattern "Run completed |" -SimpleMatch
+foreach ($runCompletedLine in $runCompletedLines) {
     $line = $runCompletedLine.Line
+    $profileName = if ($line -match "profile=(\S+)") { $matches[1] } else { "default" }
     if ($line -match "summary_failed=(\d+)") {
         $failedCount = [int]$matches[1]
         if ($failedCount -gt 0) {
-            Write-Host ("Summary quality: degraded (summary_failed={0})" -f $failedCount)
+            Write-Host ("Summary quality [{0}]: degraded (summary_failed={1})" -f $profileName, $failedCount)
             if ($line -match "summary_failed_reasons=(.+) sent_email=") {
-                Write-Host ("Summary failed reasons: {0}" -f $matches[1])
+                Write-Host ("Summary failed reasons [{0}]: {1}" -f $profileName, $matches[1])
             }
         } else {
-            Write-Host "Summary quality: OK (summary_failed=0)"
+            Write-Host ("Summary quality [{0}]: OK (summary_failed=0)" -f $profileName)
         }
     }
 }
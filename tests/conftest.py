@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from scrapper.config import Settings, load_settings
+
+
+@pytest.fixture
+def settings(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Settings:
+    # Values set here win over a local .env, which load_dotenv never overrides.
+    for name, value in {
+        "OPENAI_API_KEY": "test",
+        "RECIPIENT_EMAILS": "test@example.com",
+        "SMTP_USERNAME": "test@example.com",
+        "SMTP_APP_PASSWORD": "test",
+        "PROFILES_PATH": "",
+        "SUMMARY_CACHE_ENABLED": "false",
+        "SUMMARY_REQUESTS_PER_MINUTE": "0",
+        "SUMMARY_TOKENS_PER_MINUTE": "0",
+        "HOST_HEALTH_ENABLED": "false",
+        "DB_PATH": str(tmp_path / "scrapper.db"),
+    }.items():
+        monkeypatch.setenv(name, value)
+    return load_settings()
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from scrapper.config import Settings
+from scrapper.models import SearchResult
+from scrapper.pipeline import open_candidate_selector
+from scrapper.storage import Storage
+
+
+def test_equal_prescores_are_fetched_in_search_order(settings: Settings) -> None:
+    storage = Storage(settings.db_path)
+    try:
+        selector = open_candidate_selector(settings, storage)
+        # Same title and snippet keywords, so every row gets the same pre-score;
+        # URLs run against search order when compared as strings.
+        rows = [
+            SearchResult(
+                query="sh 공사 마곡 분양",
+                title=f"SH공사 마곡 분양 공고 {name}",
+                url=f"https://news.example/{name}",
+                snippet="마곡 분양 청약 일정",
+                source="bing",
+            )
+            for name in ("zeta", "mu", "alpha")
+        ]
+        selector.admit(rows[:2])
+        selector.admit(rows[2:])
+
+        order = []
+        while (candidate := selector.next_fetch()) is not None:
+            order.append(candidate[1].url)
+    finally:
+        storage.close()
+
+    assert order == [row.url for row in rows]
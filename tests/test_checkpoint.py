@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import datetime
+import hashlib
+
+from scrapper.async_pipeline import _extract
+from scrapper.checkpoint import RunCheckpoint
+from scrapper.config import Settings
+from scrapper.pipeline import open_checkpoint
+from scrapper.text_extract import FetchedPage
+
+ARTICLE_HTML = (
+    "<html><head><title>마곡 분양</title></head><body><article>"
+    + "".join(f"<p>마곡지구 공공분양 입주자모집 공고 {index}번째 문단입니다.</p>" for index in range(12))
+    + "</article></body></html>"
+)
+
+
+def _page(url: str, html: str) -> FetchedPage:
+    content = html.encode("utf-8")
+    return FetchedPage(
+        url=url,
+        content=content,
+        content_type="text/html; charset=utf-8",
+        content_hash=hashlib.sha256(content).hexdigest(),
+    )
+
+
+def test_async_extract_checkpoints_only_successes(settings: Settings) -> None:
+    checkpoint = RunCheckpoint(settings.db_path, "2026-01-01")
+    chain = settings.extractor_chain
+    empty = "https://news.example/empty"
+    full = "https://news.example/full"
+
+    failed, _ = _extract(settings, empty, _page(empty, ""), chain, None, [], checkpoint)
+    extracted, _ = _extract(settings, full, _page(full, ARTICLE_HTML), chain, None, [], checkpoint)
+
+    assert failed.method == "failed"
+    assert checkpoint.fetched(empty) is None
+    assert extracted.method != "failed"
+    assert checkpoint.fetched(full) is not None
+
+
+def test_dry_run_leaves_real_checkpoint_alone(settings: Settings) -> None:
+    real = RunCheckpoint(settings.db_path, "2026-01-01")
+    real.mark_sent(settings.profile)
+
+    dry = open_checkpoint(settings, datetime(2026, 1, 1, 9), False, True, [settings])
+
+    assert dry is not None and dry.run_date != real.run_date
+    assert real.sent(settings.profile)
+
+
+def test_resume_picks_up_run_from_before_midnight(settings: Settings) -> None:
+    yesterday = RunCheckpoint(settings.db_path, "2026-01-01")
+    yesterday.save_selection(settings.profile, 10, 5, [])
+
+    resumed = open_checkpoint(settings, datetime(2026, 1, 2, 0, 5), True, False, [settings])
+
+    assert resumed is not None and resumed.run_date == "2026-01-01"
+    assert resumed.selection(settings.profile) == (10, 5, [])
+
+
+def test_resume_after_finished_run_keeps_sent_marks(settings: Settings) -> None:
+    today = RunCheckpoint(settings.db_path, "2026-01-02")
+    today.mark_sent(settings.profile)
+
+    resumed = open_checkpoint(settings, datetime(2026, 1, 2, 9), True, False, [settings])
+
+    assert resumed is not None and resumed.run_date == "2026-01-02"
+    assert resumed.sent(settings.profile)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from bench.stand_in import FIXTURES_DIR, Corpus
+from scrapper.config import DEFAULT_RELATED_KEYWORDS
+from scrapper.html_parse import (
+    BS4,
+    LXML,
+    parse_article,
+    parse_bing_items,
+    resolve_html_parser,
+    set_html_parser,
+)
+from scrapper.search import build_queries
+from scrapper.text_extract import _decode_html
+
+needs_lxml = pytest.mark.skipif(resolve_html_parser(LXML) != LXML, reason="lxml not installed")
+
+SAVED_PAGES = Path(__file__).resolve().parent / "fixtures" / "html"
+
+# Markup both parsers read the same way.
+PARITY_MARKUP = {
+    "comment_script": (
+        "<p>앞<!-- 주석 -->뒤<script>var x = '<p>';</script>끝<style>p{}</style></p>"
+    ),
+    "entities": "<p>&nbsp;공급&amp;분양&#12288;<br>청약&lt;안내&gt;&nbsp;</p>",
+    "crlf": "<html>\r\n<body>\r\n<p>줄\r\n바꿈</p>\r\n<p>\t탭 </p></body></html>",
+    "meta_priority": (
+        '<head><meta name="date" content="2024-01-02">'
+        '<meta property="article:published_time" content="  ">'
+        '<meta property="og:published_time" content="2024-01-03T09:00:00+09:00">'
+        '<meta property="og:published_time" content="2024-01-04"></head><body><p>본문</p></body>'
+    ),
+    "time_tag": "<body><time>2024년 3월 5일</time><time datetime='x'>y</time><p>a</p></body>",
+    "xml_prolog": '<?xml version="1.0" encoding="euc-kr"?><html><body><p>선언</p></body></html>',
+    "deep": "<div>" * 3000 + "<p>깊은 문단</p>" + "</div>" * 3000,
+    "empty": "",
+    "ruby": "<p><ruby>漢<rp>(</rp><rt>한</rt><rp>)</rp></ruby>자</p>",
+    "bing_nested": (
+        '<ol><li class="b_algo x"><h2><a href=" https://a.example/1 ">제목 <b>굵게</b></a></h2>'
+        '<p>대체 요약</p><div class="b_caption"><p>요약</p><span class="news_dt">3일 전</span>'
+        '</div></li><li class="b_algo"><div><h2>링크 없음</h2></div></li>'
+        '<li class="b_algo"><h2><a>주소 없음</a></h2><p>x</p><em class="news_dt">어제</em></li></ol>'
+    ),
+}
+
+# Broken markup where libxml2 builds a different tree than html.parser; the
+# default parser has to read it the way html.parser always has.
+BROKEN_MARKUP = {
+    "unclosed_p": "<p>첫 문단<p>둘째 문단",
+    "block_in_p": "<p>앞<div>블록</div>뒤</p>",
+    "template": "<template><p>숨김</p></template><p>본문</p>",
+    "cdata": "<p>a<![CDATA[x]]>b</p>",
+    "raw_text_markup": (
+        "<textarea><p>입력</p></textarea><title><p>제목</p></title><p>본문</p>"
+    ),
+    "duplicate_attribute": "<meta name='date' content='2024-01-01' content='2024-02-02'><p>x</p>",
+    "legacy_entity": "<p>&copy2020 &ampx</p>",
+    "nul": "<p>a\x00b</p>",
+    "cr_in_attribute": "<meta name='date' content='2024\r\n01'><p>x</p>",
+    "unicode_space_in_class": "<li class='b_algo\xa0x'><h2><a href='u'>t</a></h2></li>",
+    "nested_links": "<li class='b_algo'><h2><a href='1'>x<a href='2'>y</a></a></h2></li>",
+}
+
+
+def _parsed(html: str, parser: str) -> tuple[object, object]:
+    return parse_article(html, parser), parse_bing_items(html, parser)
+
+
+def _saved_pages() -> list[object]:
+    pages = []
+    for path in sorted(SAVED_PAGES.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        pages.append(pytest.param(html, id=path.name))
+        # Windows-built sites serve CRLF; text keeps \r under html.parser.
+        pages.append(pytest.param(html.replace("\n", "\r\n"), id=f"{path.name}:crlf"))
+    return pages
+
+
+def _stand_in_pages() -> list[tuple[str, str]]:
+    queries = build_queries("sh 공사 마곡 분양", DEFAULT_RELATED_KEYWORDS)
+    corpus = Corpus(60, queries, "http://127.0.0.1:1")
+    pages = []
+    for article_id in range(corpus.size):
+        content, charset = corpus.article_page(article_id)
+        html, _ = _decode_html(content, f"text/html; charset={charset}")
+        pages.append((f"news/{article_id}", html))
+    for query in queries:
+        pages.append((f"search/{query}", corpus.search_page(query, 1).decode("utf-8")))
+    return pages
+
+
+@needs_lxml
+@pytest.mark.parametrize("html", _saved_pages())
+def test_saved_pages_match(html: str) -> None:
+    assert _parsed(html, LXML) == _parsed(html, BS4)
+
+
+@needs_lxml
+@pytest.mark.parametrize("name", sorted(PARITY_MARKUP))
+def test_markup_matches(name: str) -> None:
+    html = PARITY_MARKUP[name]
+    assert _parsed(html, LXML) == _parsed(html, BS4)
+
+
+@needs_lxml
+def test_stand_in_pages_match() -> None:
+    mismatches = [
+        name for name, html in _stand_in_pages() if _parsed(html, LXML) != _parsed(html, BS4)
+    ]
+    assert mismatches == []
+
+
+@needs_lxml
+def test_bench_fixtures_match() -> None:
+    for path in sorted(FIXTURES_DIR.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        assert _parsed(html, LXML) == _parsed(html, BS4), path.name
+
+
+def test_auto_keeps_html_parser() -> None:
+    assert resolve_html_parser("auto") == BS4
+
+
+@pytest.mark.parametrize("name", sorted(BROKEN_MARKUP))
+def test_default_parser_keeps_html_parser_output_on_broken_markup(name: str) -> None:
+    html = BROKEN_MARKUP[name]
+    set_html_parser("auto")
+    assert (parse_article(html), parse_bing_items(html)) == _parsed(html, BS4)
+
+
+@needs_lxml
+def test_published_at_prefers_first_non_empty_meta() -> None:
+    html = PARITY_MARKUP["meta_priority"]
+    assert parse_article(html, LXML)[1] == "2024-01-03T09:00:00+09:00"
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import random
+
+from rapidfuzz import fuzz
+import pytest
+
+from scrapper.ranking import RelevanceScorer, TitleIndex
+
+
+def _linear_score_relevance(
+    core_keyword: str,
+    related_keywords: tuple[str, ...],
+    title: str,
+    snippet: str,
+    body: str,
+) -> int:
+    # The per-term loop RelevanceScorer replaced.
+    merged = " ".join((title, snippet, body)).lower()
+    score = 0
+
+    core = core_keyword.lower().strip()
+    if core and core in merged:
+        score += 100
+
+    core_tokens = tuple(token for token in core.split() if token)
+    token_hits = sum(1 for token in core_tokens if token in merged)
+    score += token_hits * 15
+
+    for keyword in related_keywords:
+        lowered = keyword.lower().strip()
+        if lowered and lowered in merged:
+            score += 8
+
+    for term in ("분양", "청약", "공고", "입주자모집"):
+        if term in merged:
+            score += 6
+
+    return score
+
+
+KEYWORD_SETS = [
+    ("마곡 분양", ()),
+    # Overlapping terms, and terms that are prefixes of one another.
+    ("마곡 분양", ("분양권", "분", "마곡지구", "곡 분")),
+    # Weights add up when a term repeats across the core and related keywords.
+    ("마곡 분양", ("마곡", "마곡", "분양", " 분양 ")),
+    ("Seoul Housing", ("HOUSING", "seoul h", "ing", "Ousing Lottery")),
+    ("  ", ("", " ")),
+    ("입주자", ("입주자모집 공고", "모집")),
+]
+
+FRAGMENTS = [
+    "마곡",
+    "마곡지구",
+    "분양",
+    "분양권",
+    "분",
+    "양",
+    "청약",
+    "공고",
+    "입주자",
+    "모집",
+    "Seoul",
+    "SEOUL",
+    "housing",
+    "Housing",
+    "h",
+    "ing",
+    "lottery",
+    " ",
+    " ",
+    "",
+]
+
+
+def _text(rng: random.Random) -> str:
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 6)))
+
+
+@pytest.mark.parametrize(
+    ("title", "snippet", "body"),
+    [
+        ("", "", ""),
+        ("마곡 분양 일정", "", ""),
+        # Terms that only appear across the title/snippet and body junction.
+        ("서울 마곡", "", "분양 일정"),
+        ("", "마곡", "분양"),
+        ("공", "", "고 게시"),
+        ("입주자", "모집", ""),
+        ("입주자", "", "모집"),
+        ("SEOUL", "", "HOUSING lottery"),
+        ("Seoul HOUSING", "ousing LOTTERY", ""),
+        ("마곡마곡마곡", "분양분양권", "분분 양"),
+    ],
+)
+@pytest.mark.parametrize(("core", "related"), KEYWORD_SETS)
+def test_scorer_matches_per_term_loop(
+    core: str, related: tuple[str, ...], title: str, snippet: str, body: str
+) -> None:
+    expected = _linear_score_relevance(core, related, title, snippet, body)
+
+    assert RelevanceScorer(core, related).score(title, snippet, body) == expected
+
+
+@pytest.mark.parametrize(("core", "related"), KEYWORD_SETS)
+def test_scorer_matches_per_term_loop_on_random_text(core: str, related: tuple[str, ...]) -> None:
+    rng = random.Random(core + "|".join(related))
+    scorer = RelevanceScorer(core, related)
+
+    for _ in range(2000):
+        title, snippet, body = _text(rng), _text(rng), _text(rng)
+        expected = _linear_score_relevance(core, related, title, snippet, body)
+        assert scorer.score(title, snippet, body) == expected, (title, snippet, body)
+
+
+def _linear_is_similar_title(title: str, existing_titles: list[str], threshold: int) -> bool:
+    # The pairwise scan TitleIndex replaced.
+    source = title.strip().lower()
+    if not source:
+        return False
+    for current in existing_titles:
+        target = current.strip().lower()
+        if not target:
+            continue
+        if fuzz.ratio(source, target) >= threshold:
+            return True
+    return False
+
+
+THRESHOLDS = [0, 1, 50, 89, 90, 91, 99, 100]
+
+
+def _near_copies(source: str, lengths: range, rng: random.Random) -> list[str]:
+    # Source truncated or padded to each length, so the ratio sits near the bound.
+    copies: list[str] = []
+    for length in lengths:
+        if length <= len(source):
+            copies.append(source[:length])
+        else:
+            copies.append(source + "".join(rng.choice("ab") for _ in range(length - len(source))))
+    return copies
+
+
+@pytest.mark.parametrize("threshold", [50, 75, 89, 90, 91, 99, 100])
+def test_title_index_matches_linear_scan_at_length_bounds(threshold: int) -> None:
+    rng = random.Random(threshold)
+    for length in range(1, 41):
+        source = "".join(rng.choice("abc") for _ in range(length))
+        lower, upper = TitleIndex(threshold=threshold)._length_bounds(length)
+        for existing in _near_copies(source, range(max(1, lower - 2), upper + 3), rng):
+            expected = _linear_is_similar_title(source, [existing], threshold)
+            assert TitleIndex([existing], threshold).is_similar(source) == expected, (
+                source,
+                existing,
+            )
+
+
+@pytest.mark.parametrize("threshold", THRESHOLDS)
+@pytest.mark.parametrize(
+    ("title", "existing"),
+    [
+        ("", []),
+        ("", ["", "a"]),
+        ("   ", ["   "]),
+        ("a", []),
+        ("a", [""]),
+        ("a", ["  ", "\t"]),
+        ("a", ["A"]),
+        ("a", ["b"]),
+        ("a", ["ab"]),
+        ("ab", ["a", "b", "ba"]),
+        (" 마곡 ", ["마곡", "마"]),
+        ("마곡지구 공공분양 일정", ["  마곡지구 공공분양 일정 ", "마곡지구 공공분양"]),
+        ("Seoul Housing Lottery", ["seoul housing lottery!", "SEOUL HOUSING"]),
+    ],
+)
+def test_title_index_matches_linear_scan_for_short_titles(
+    threshold: int, title: str, existing: list[str]
+) -> None:
+    expected = _linear_is_similar_title(title, existing, threshold)
+
+    assert TitleIndex(existing, threshold).is_similar(title) == expected
+
+
+def test_title_index_matches_linear_scan_on_random_titles() -> None:
+    rng = random.Random(11)
+    for _ in range(300):
+        threshold = rng.choice(THRESHOLDS)
+        existing = [
+            "".join(rng.choice("abc ") for _ in range(rng.randint(0, 12)))
+            for _ in range(rng.randint(0, 8))
+        ]
+        index = TitleIndex(existing, threshold)
+        for _ in range(10):
+            title = "".join(rng.choice("abcAB ") for _ in range(rng.randint(0, 12)))
+            expected = _linear_is_similar_title(title, existing, threshold)
+            assert index.is_similar(title) == expected, (title, existing, threshold)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from dataclasses import replace
+import threading
+from typing import Iterator
+
+from openai import OpenAI
+import pytest
+
+from bench.stand_in import BatchStore, open_server
+from scrapper.config import Settings
+from scrapper.models import ScoredArticle, SearchResult
+from scrapper.pipeline import _summarize_selected, summary_throttle
+from scrapper.summarizer import summarize_batch
+
+MODEL = "gpt-4.1-mini"
+
+
+def _article(index: int) -> ScoredArticle:
+    url = f"https://news.example/{index}"
+    return ScoredArticle(
+        search_result=SearchResult(
+            query="마곡 분양",
+            title=f"마곡지구 공공분양 {index}단지 일정",
+            url=url,
+            snippet="마곡 공급 계획",
+            source="bing",
+        ),
+        canonical_url=url,
+        extracted_text=(
+            "서울주택도시공사는 마곡지구 분양 물량을 공개했다.\n청약 접수는 다음 달 시작된다."
+        ),
+        extraction_method="trafilatura",
+        score=50,
+    )
+
+
+@pytest.fixture
+def stand_in() -> Iterator[tuple[BatchStore, str]]:
+    store = BatchStore()
+    server, base_url = open_server(10, [], batches=store)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield store, base_url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _client(base_url: str) -> OpenAI:
+    return OpenAI(api_key="test", base_url=f"{base_url}/v1", max_retries=0)
+
+
+def test_completed_batch_answers_every_article(stand_in: tuple[BatchStore, str]) -> None:
+    store, base_url = stand_in
+    store.finish_after = 2
+    articles = [_article(index) for index in range(3)]
+
+    results = summarize_batch(
+        _client(base_url), MODEL, "마곡 분양", articles, deadline_seconds=5, poll_seconds=0.01
+    )
+
+    assert all(result is not None and result.success for result in results)
+    assert [batch["status"] for batch in store.batches.values()] == ["completed"]
+
+
+def test_failed_requests_are_left_for_the_fallback(stand_in: tuple[BatchStore, str]) -> None:
+    store, base_url = stand_in
+    store.failing = frozenset({"article-1"})
+    articles = [_article(index) for index in range(3)]
+
+    results = summarize_batch(
+        _client(base_url), MODEL, "마곡 분양", articles, deadline_seconds=5, poll_seconds=0.01
+    )
+
+    assert results[1] is None
+    assert results[0] is not None and results[0].success
+    assert results[2] is not None and results[2].success
+
+
+def test_timed_out_batch_keeps_finished_answers(stand_in: tuple[BatchStore, str]) -> None:
+    store, base_url = stand_in
+    store.finish_after = None
+    store.cancel_polls = 2
+    store.answered_on_cancel = 1
+    articles = [_article(index) for index in range(3)]
+
+    results = summarize_batch(
+        _client(base_url), MODEL, "마곡 분양", articles, deadline_seconds=0, poll_seconds=0.01
+    )
+
+    assert [batch["status"] for batch in store.batches.values()] == ["cancelled"]
+    assert results[0] is not None and results[0].success
+    assert results[1:] == [None, None]
+
+
+def test_timed_out_batch_falls_back_to_per_article_path(
+    stand_in: tuple[BatchStore, str],
+    settings: Settings,
+) -> None:
+    store, base_url = stand_in
+    store.finish_after = None
+    store.answered_on_cancel = 1
+    # The env helpers keep both at one minute or more; the stand-in is instant.
+    settings = replace(
+        settings,
+        openai_base_url=f"{base_url}/v1",
+        summary_mode="batch",
+        summary_batch_deadline_minutes=0,
+        summary_batch_poll_seconds=0,
+    )
+    articles = [_article(index) for index in range(3)]
+
+    results = _summarize_selected(settings, articles, summary_throttle(settings))
+
+    assert [batch["status"] for batch in store.batches.values()] == ["cancelled"]
+    assert len(results) == 3
+    assert all(result.success and result.reason == "ok" for result in results)
+
+
+def test_unreadable_error_file_keeps_good_answers(
+    stand_in: tuple[BatchStore, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    store, base_url = stand_in
+    store.failing = frozenset({"article-1"})
+    content = store.content
+
+    def _garbled_error_file(file_id: str) -> bytes | None:
+        if any(batch["error_file_id"] == file_id for batch in store.batches.values()):
+            return b"{not json\n"
+        return content(file_id)
+
+    monkeypatch.setattr(store, "content", _garbled_error_file)
+    articles = [_article(index) for index in range(3)]
+
+    results = summarize_batch(
+        _client(base_url), MODEL, "마곡 분양", articles, deadline_seconds=5, poll_seconds=0.01
+    )
+
+    assert results[1] is None
+    assert results[0] is not None and results[0].success
+    assert results[2] is not None and results[2].success
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from scrapper.models import ScoredArticle, SearchResult
+from scrapper.summarizer import build_body_excerpt
+
+
+def _article(text: str) -> ScoredArticle:
+    url = "https://news.example/1"
+    return ScoredArticle(
+        search_result=SearchResult(
+            query="마곡 분양", title="마곡 분양", url=url, snippet="", source="bing"
+        ),
+        canonical_url=url,
+        extracted_text=text,
+        extraction_method="trafilatura",
+        score=50,
+    )
+
+
+def test_short_fact_lines_are_kept() -> None:
+    text = "\n".join(
+        (
+            "마곡지구 공공분양 입주자모집 공고가 나왔다.",
+            "분양가: 3억",
+            "청약 3월 5일",
+            "ⓒ 서울경제일보 무단전재 및 재배포 금지",
+        )
+    )
+
+    excerpt = build_body_excerpt(_article(text), "마곡 분양", (), token_budget=1000)
+
+    assert excerpt.splitlines() == [
+        "마곡지구 공공분양 입주자모집 공고가 나왔다.",
+        "분양가: 3억",
+        "청약 3월 5일",
+    ]
+
+
+def test_only_exact_duplicates_are_dropped() -> None:
+    text = "청약 3월 5일\n청약  3월 5일\n청약 3월 6일"
+
+    excerpt = build_body_excerpt(_article(text), "마곡 분양", (), token_budget=1000)
+
+    assert excerpt.splitlines() == ["청약 3월 5일", "청약 3월 6일"]